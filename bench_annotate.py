@@ -0,0 +1,61 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+# Runs the CLI in a fresh process and reports its peak memory, workers included.
+RUNNER = """
+import json, resource, sys, time
+from spacy_rup.__main__ import main
+start = time.perf_counter()
+main(sys.argv[1:])
+elapsed = time.perf_counter() - start
+rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+print(json.dumps({"seconds": elapsed, "max_rss_kb": rss}))
+"""
+
+
+def run_cli(input_path, output_dir, model, n_process, batch_size, shard_size):
+    argv = [
+        "annotate", str(input_path), "-o", str(output_dir), "--model", model,
+        "--n-process", str(n_process), "--batch-size", str(batch_size),
+        "--shard-size", str(shard_size), "--report-every", "0",
+    ]
+    env = dict(os.environ, PYTHONWARNINGS="ignore")
+    result = subprocess.run(
+        [sys.executable, "-c", RUNNER, *argv], capture_output=True, text=True, check=True, env=env
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput and peak memory of python -m spacy_rup annotate.")
+    parser.add_argument("--data", default=str(Path("data") / "unsplit" / "corpus.rup"))
+    parser.add_argument("--model", default="pos,ner")
+    parser.add_argument("--copies", default="1,4", help="Input sizes, in copies of --data")
+    parser.add_argument("--n-process", default="1,2")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--shard-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    print(f"Corpus: {args.data} ({len(lines)} lines), model {args.model}, {os.cpu_count()} CPUs")
+    print(f"  {'docs':>7} {'n_process':>9} {'docs/sec':>9} {'peak RSS MB':>12} {'shards':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for copies in (int(n) for n in args.copies.split(",")):
+            input_path = Path(tmp) / f"input-{copies}.txt"
+            input_path.write_text("".join(lines * copies), encoding="utf-8")
+            for n_process in (int(n) for n in args.n_process.split(",")):
+                output_dir = Path(tmp) / f"out-{copies}-{n_process}"
+                stats = run_cli(input_path, output_dir, args.model, n_process, args.batch_size, args.shard_size)
+                n_docs = len(lines) * copies
+                n_shards = len(list(output_dir.glob("*.spacy")))
+                print(
+                    f"  {n_docs:7d} {n_process:9d} {n_docs / stats['seconds']:9.0f} "
+                    f"{stats['max_rss_kb'] / 1024:12.1f} {n_shards:7d}"
+                )
@@ -0,0 +1,106 @@
+import argparse
+import difflib
+import time
+from pathlib import Path
+
+from spacy_rup import Aromanian
+from spacy_rup.clitics import split_clitics
+from spacy_rup.tokenizer_exceptions import _load_contraction_variants
+
+
+CONTRACTIONS = [(orth, list(pieces)) for orth, pieces in _load_contraction_variants()]
+
+
+def exceptions_nlp():
+    """Current approach: every contraction listed as a tokenizer special case."""
+    return Aromanian()
+
+
+def splitter_nlp(keep_exceptions=False):
+    """Clitic splitter component, optionally without the contraction special cases."""
+    nlp = Aromanian()
+    if not keep_exceptions:
+        listed = {orth for orth, _ in CONTRACTIONS}
+        nlp.tokenizer.rules = {k: v for k, v in nlp.tokenizer.rules.items() if k not in listed}
+    nlp.add_pipe("aromanian_clitic_splitter", first=True)
+    return nlp
+
+
+SETUPS = [
+    ("exceptions", exceptions_nlp),
+    ("splitter", splitter_nlp),
+    ("exceptions+splitter", lambda: splitter_nlp(keep_exceptions=True)),
+]
+
+
+def check_listed_forms(nlp):
+    """Return the listed contractions that nlp splits differently from the exceptions."""
+    return [
+        (orth, [token.text for token in nlp(orth)], pieces)
+        for orth, pieces in CONTRACTIONS
+        if [token.text for token in nlp(orth)] != pieces
+    ]
+
+
+def bench_throughput(make_nlp, texts, repeat=3):
+    best = None
+    n_tokens = 0
+    for _ in range(repeat):
+        # Fresh tokenizer and word cache each round.
+        nlp = make_nlp()
+        split_clitics.cache_clear()
+        start = time.perf_counter()
+        n_tokens = sum(len(doc) for doc in nlp.pipe(texts))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return n_tokens, n_tokens / best
+
+
+def count_differences(texts):
+    """Lines and tokens where the splitter changes the exception-based output."""
+    reference = exceptions_nlp()
+    nlp = splitter_nlp()
+    lines = 0
+    examples = []
+    for text in texts:
+        before = [token.text for token in reference(text)]
+        after = [token.text for token in nlp(text)]
+        if before != after:
+            lines += 1
+            if len(examples) < 5:
+                examples.append((before, after))
+    return lines, examples
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the clitic splitter with per-string contraction exceptions.")
+    parser.add_argument("--data-dir", default=str(Path("data") / "unsplit"))
+    parser.add_argument("--corpora", default="corpus.rup,corpus.rup_cun,corpus.rup_std")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Listed contraction forms: {len(CONTRACTIONS)}")
+    for label, make_nlp in SETUPS[1:]:
+        mismatches = check_listed_forms(make_nlp())
+        print(f"  {label:<20} mismatches: {len(mismatches)}")
+        for orth, got, expected in mismatches[:5]:
+            print(f"    {orth}: {got} != {expected}")
+
+    for name in args.corpora.split(","):
+        path = Path(args.data_dir) / name
+        if not path.exists():
+            print(f"\n{name}: missing {path}")
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+        print(f"\n{name} ({len(texts)} lines)")
+        for label, make_nlp in SETUPS:
+            n_tokens, speed = bench_throughput(make_nlp, texts, repeat=args.repeat)
+            print(f"  {label:<20} {speed:10.0f} tokens/s ({n_tokens} tokens, best of {args.repeat})")
+        lines, examples = count_differences(texts)
+        print(f"  Lines resplit by the splitter (productive forms): {lines}")
+        for before, after in examples:
+            matcher = difflib.SequenceMatcher(None, before, after, autojunk=False)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag != "equal":
+                    print(f"    {' '.join(before[i1:i2])!r} -> {' '.join(after[j1:j2])!r}")
@@ -0,0 +1,150 @@
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import spacy
+
+import spacy_rup  # noqa: F401  (registers the rup language)
+from enrich_pos_model import add_pos_rules
+from train_combined_model import train_combined_model
+from train_ner_model import make_ner_examples, read_ner_data, train_ner_model
+from train_pos_model import make_pos_examples, read_pos_data, split_held_out, train_pos_model
+
+
+RESOURCES = Path("spacy_rup") / "resources"
+
+
+def load_measured(path):
+    """Load a pipeline and return it with the memory its weights and vocab take."""
+    tracemalloc.start()
+    nlp = spacy.load(path)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return nlp, current
+
+
+def disk_size(path):
+    return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+
+
+def run_separate(pos_nlp, ner_nlp, texts, batch_size):
+    tags, ents = [], []
+    for doc in pos_nlp.pipe(texts, batch_size=batch_size):
+        tags.append([token.tag_ for token in doc])
+    for doc in ner_nlp.pipe(texts, batch_size=batch_size):
+        ents.append([(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents])
+    return tags, ents
+
+
+def run_combined(nlp, texts, batch_size):
+    tags, ents = [], []
+    for doc in nlp.pipe(texts, batch_size=batch_size):
+        tags.append([token.tag_ for token in doc])
+        ents.append([(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents])
+    return tags, ents
+
+
+def held_out_models(eval_dir, held_out):
+    """pos_model, ner_model and combined_model trained without the held-out sentences."""
+    eval_dir = Path(eval_dir)
+    for name, train in (("pos_model", train_pos_model), ("ner_model", train_ner_model), ("combined_model", train_combined_model)):
+        if not (eval_dir / name / "config.cfg").exists():
+            random.seed(0)
+            spacy.util.fix_random_seed(0)
+            train(eval_dir / name, held_out)
+    pos_nlp = spacy.load(eval_dir / "pos_model")
+    if "aromanian_pos_lookup" not in pos_nlp.pipe_names:
+        add_pos_rules(pos_nlp.add_pipe("aromanian_pos_lookup"))
+    return pos_nlp, spacy.load(eval_dir / "ner_model"), spacy.load(eval_dir / "combined_model")
+
+
+def accuracy(pos_nlp, ner_nlp, pos_data, ner_data):
+    """Tag accuracy of `pos_nlp` and entity P/R/F of `ner_nlp` on gold sentences."""
+    tag_scores = pos_nlp.evaluate(make_pos_examples(pos_nlp, pos_data))
+    ner_scores = ner_nlp.evaluate(make_ner_examples(ner_nlp, ner_data))
+    return tag_scores["tag_acc"], ner_scores["ents_p"], ner_scores["ents_r"], ner_scores["ents_f"]
+
+
+def best_time(run, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.process_time()
+        result = run()
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the combined pipeline with pos_model + ner_model back to back.")
+    parser.add_argument("--data", default=str(Path("data") / "unsplit" / "corpus.rup"))
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--held-out", type=float, default=0.1, help="Fraction of the training sentences to evaluate on")
+    parser.add_argument("--eval-dir", default=None, help="Keep the held-out models here (default: train them in a temporary directory)")
+    args = parser.parse_args()
+
+    combined_path = RESOURCES / "combined_model"
+    if not combined_path.exists():
+        raise SystemExit(f"{combined_path} not found; run python train_combined_model.py first")
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+    print(f"Corpus: {args.data} ({len(texts)} docs)")
+
+    spacy.load(RESOURCES / "pos_model")  # Import and registry costs are not model memory
+    pos_nlp, pos_memory = load_measured(RESOURCES / "pos_model")
+    # The same rules as the combined pipeline, so both sides do the same work.
+    if "aromanian_pos_lookup" not in pos_nlp.pipe_names:
+        add_pos_rules(pos_nlp.add_pipe("aromanian_pos_lookup"))
+    ner_nlp, ner_memory = load_measured(RESOURCES / "ner_model")
+    combined_nlp, combined_memory = load_measured(combined_path)
+    print(f"  Pipelines: pos_model {pos_nlp.pipe_names} + ner_model {ner_nlp.pipe_names}, combined {combined_nlp.pipe_names}")
+
+    separate_time, (separate_tags, separate_ents) = best_time(
+        lambda: run_separate(pos_nlp, ner_nlp, texts, args.batch_size), args.repeat
+    )
+    combined_time, (combined_tags, combined_ents) = best_time(
+        lambda: run_combined(combined_nlp, texts, args.batch_size), args.repeat
+    )
+    # Accuracy: all three models trained again without the held-out sentences,
+    # which the shipped models have seen.
+    _, pos_dev = split_held_out(read_pos_data(Path("data") / "train.rup.conll"), args.held_out)
+    _, ner_dev = split_held_out(read_ner_data(Path("data") / "train.rup.ner.json"), args.held_out)
+    with tempfile.TemporaryDirectory() as tmp:
+        eval_pos, eval_ner, eval_combined = held_out_models(args.eval_dir or tmp, args.held_out)
+        separate_scores = accuracy(eval_pos, eval_ner, pos_dev, ner_dev)
+        combined_scores = accuracy(eval_combined, eval_combined, pos_dev, ner_dev)
+
+    separate_disk = disk_size(RESOURCES / "pos_model") + disk_size(RESOURCES / "ner_model")
+    print(f"Held out: {len(pos_dev)} tagged and {len(ner_dev)} NER sentences (every {round(1 / args.held_out)}th)")
+    print(
+        f"  {'':<22} {'CPU ms/doc':>10} {'docs/s':>8} {'memory MB':>10} {'disk MB':>8} "
+        f"{'tag acc':>8} {'NER P':>6} {'NER R':>6} {'NER F':>6}"
+    )
+    rows = (
+        ("pos_model + ner_model", separate_time, pos_memory + ner_memory, separate_disk, separate_scores),
+        ("combined_model", combined_time, combined_memory, disk_size(combined_path), combined_scores),
+    )
+    for name, seconds, memory, disk, (tag_acc, ents_p, ents_r, ents_f) in rows:
+        print(
+            f"  {name:<22} {seconds / len(texts) * 1000:10.3f} {len(texts) / seconds:8.0f} "
+            f"{memory / 1e6:10.1f} {disk / 1e6:8.1f} {tag_acc:8.1%} {ents_p:6.1%} {ents_r:6.1%} {ents_f:6.1%}"
+        )
+    print(f"  CPU per doc: {combined_time / separate_time:.0%} of back to back")
+
+    # Agreement of the shipped models on the unannotated corpus
+    # pos_model and ner_model keep their own saved tokenizers; compare docs tokenized alike.
+    pairs = [(a, b) for a, b in zip(separate_tags, combined_tags) if len(a) == len(b)]
+    n_tokens = sum(len(a) for a, _ in pairs)
+    same_tags = sum(x == y for a, b in pairs for x, y in zip(a, b))
+    gold_ents = {(i, ent) for i, ents in enumerate(separate_ents) for ent in ents}
+    found_ents = {(i, ent) for i, ents in enumerate(combined_ents) for ent in ents}
+    overlap = len(gold_ents & found_ents)
+    print(
+        f"  Agreement of the shipped models on {args.data}: tags {same_tags / n_tokens:.1%} ({len(pairs)} docs), "
+        f"entities {overlap} shared of {len(gold_ents)} / {len(found_ents)}"
+    )
@@ -0,0 +1,72 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import spacy_rup
+from spacy_rup.doc_cache import DocCache
+
+
+def traffic(lines, n, skew, seed=0):
+    """`n` texts drawn from `lines` with Zipf-like weights: a few texts repeat a lot."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** skew for rank in range(len(lines))]
+    return rng.choices(lines, weights=weights, k=n)
+
+
+def annotations(docs):
+    return [[(t.tag_, t.pos_, t.lemma_, t.ent_iob_, t.ent_type_) for t in doc] for doc in docs]
+
+
+def timed_pipe(pipe, texts, batch_size):
+    start = time.perf_counter()
+    docs = list(pipe(texts, batch_size=batch_size))
+    return docs, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Docs/sec and hit ratios of DocCache on traffic with repeated texts.")
+    parser.add_argument("--data", default=str(Path("data") / "unsplit" / "corpus.rup"))
+    parser.add_argument("--components", default="tagger,aromanian_pos_lookup,ner,aromanian_lemmatizer")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent of the text frequencies")
+    parser.add_argument("--cache-size", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    texts = traffic(lines, args.requests, args.skew)
+    nlp = spacy_rup.load(components=args.components.split(","))
+    list(nlp.pipe(lines[:100]))  # warm up
+    print(
+        f"Traffic: {len(texts)} texts, {len(set(texts))} distinct, from {args.data}; "
+        f"pipeline {nlp.pipe_names}, memory tier {args.cache_size} entries"
+    )
+
+    reference, seconds = timed_pipe(nlp.pipe, texts, args.batch_size)
+    reference = annotations(reference)
+    print(f"  {'setup':<28} {'docs/sec':>9} {'hit ratio':>9} {'memory':>7} {'disk':>6}  same output")
+    print(f"  {'nlp.pipe':<28} {len(texts) / seconds:9.0f} {'':>9} {'':>7} {'':>6}  yes")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setups = [
+            ("memory", dict(max_entries=args.cache_size)),
+            ("memory + sqlite, cold", dict(max_entries=args.cache_size, path=os.path.join(tmp, "cache.sqlite"))),
+            ("sqlite only, warm", dict(max_entries=0, path=os.path.join(tmp, "cache.sqlite"))),
+            ("memory + directory, cold", dict(max_entries=args.cache_size, path=os.path.join(tmp, "docs"))),
+            ("directory only, warm", dict(max_entries=0, path=os.path.join(tmp, "docs"))),
+        ]
+        for name, kwargs in setups:
+            # A new DocCache stands for a new process: the disk tier is all it inherits.
+            cache = DocCache(nlp, **kwargs)
+            docs, seconds = timed_pipe(cache.pipe, texts, args.batch_size)
+            stats = cache.stats()
+            same = "yes" if annotations(docs) == reference else "NO"
+            print(
+                f"  {name:<28} {len(texts) / seconds:9.0f} {stats['hit_ratio']:9.1%} "
+                f"{stats['memory_hits']:7d} {stats['disk_hits']:6d}  {same}"
+            )
+            cache.close()
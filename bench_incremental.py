@@ -0,0 +1,94 @@
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+
+import spacy_rup
+from spacy_rup.incremental import IncrementalAnnotator
+
+WORD = re.compile(r"\w+")
+
+
+def document(lines, per_paragraph):
+    """The corpus as one text: `per_paragraph` lines per paragraph, blank lines between paragraphs."""
+    paragraphs = [" ".join(lines[i:i + per_paragraph]) for i in range(0, len(lines), per_paragraph)]
+    return "\n\n".join(paragraphs)
+
+
+def edit_one_word(text, rng):
+    """Replace one word of `text` with another word of it."""
+    words = [match.span() for match in WORD.finditer(text)]
+    start, end = rng.choice(words)
+    other_start, other_end = rng.choice(words)
+    return text[:start] + text[other_start:other_end] + text[end:]
+
+
+def agreement(doc, reference):
+    """Share of tokens with the same tag and entity label as `reference` (same tokenization)."""
+    same = sum(a.tag_ == b.tag_ and a.ent_iob_ == b.ent_iob_ and a.ent_type_ == b.ent_type_ for a, b in zip(doc, reference))
+    return same / len(reference) if len(reference) else 1.0
+
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+
+def bench(nlp, lines, per_paragraph, n_edits):
+    text = document(lines, per_paragraph)
+    start = time.perf_counter()
+    reference = nlp(text)
+    full_seconds = time.perf_counter() - start
+
+    annotator = IncrementalAnnotator(nlp)
+    doc = annotator.annotate(text)
+    assert doc.text == text and [t.text for t in doc] == [t.text for t in reference]
+    print(
+        f"Document: {len(lines)} lines, {len(text)} characters, {len(reference)} tokens, "
+        f"{len(list(doc.sents))} sentences; nlp(text) {full_seconds * 1000:.0f} ms; "
+        f"tag/entity agreement with nlp(text) {agreement(doc, reference):.2%}"
+    )
+
+    rng = random.Random(0)
+    updates, docs, changed_docs, annotated = [], [], [], 0
+    steps = {"split": [], "annotate": [], "splice": []}
+    for _ in range(n_edits):
+        text = edit_one_word(text, rng)
+        start = time.perf_counter()
+        changed = annotator.update(text)
+        updates.append(time.perf_counter() - start)
+        stats = annotator.last_update
+        annotated += stats["annotated"]
+        for name, seconds in stats["seconds"].items():
+            steps[name].append(seconds)
+        start = time.perf_counter()
+        annotator.to_doc(*changed)
+        changed_docs.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        doc = annotator.to_doc()
+        docs.append(time.perf_counter() - start)
+        assert doc.text == text
+    assert [t.text for t in doc] == [t.text for t in nlp.make_doc(text)]
+    breakdown = ", ".join(f"{name} {median(seconds) * 1000:.2f}" for name, seconds in steps.items())
+    print(f"  update, median             {median(updates) * 1000:8.2f} ms  ({annotated / n_edits:.1f} sentences annotated; ms: {breakdown})")
+    print(f"  to_doc of the changed part {median(changed_docs) * 1000:8.2f} ms")
+    print(f"  to_doc of the whole text   {median(docs) * 1000:8.2f} ms")
+    print(f"  update + whole Doc: {full_seconds / (median(updates) + median(docs)):.0f}x faster than nlp(text)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-annotation latency of IncrementalAnnotator after one-word edits.")
+    parser.add_argument("--data", default=str(Path("data") / "unsplit" / "corpus.rup"))
+    parser.add_argument("--components", default="tagger,aromanian_pos_lookup,ner,aromanian_lemmatizer")
+    parser.add_argument("--lines", default="300,1200,0", help="Corpus lines per document, one run each (0: all)")
+    parser.add_argument("--per-paragraph", type=int, default=5)
+    parser.add_argument("--edits", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    nlp = spacy_rup.load(components=args.components.split(","))
+    list(nlp.pipe(lines[:100]))  # warm up
+    print(f"Pipeline {nlp.pipe_names}")
+    for n_lines in map(int, args.lines.split(",")):
+        bench(nlp, lines[:n_lines] if n_lines else lines, args.per_paragraph, args.edits)
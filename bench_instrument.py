@@ -0,0 +1,62 @@
+import argparse
+import time
+from pathlib import Path
+
+import spacy_rup
+from spacy_rup.instrumentation import uninstrument
+from spacy_rup.stream import annotate_records
+
+
+def run(nlp, texts, batch_size, repeat):
+    """Best seconds of `repeat` stream-style passes over `texts`."""
+    records = [{"text": text} for text in texts]
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        annotate_records(nlp, records, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-component metrics of a rup pipeline and the cost of collecting them.")
+    parser.add_argument("--data", default=str(Path("data") / "unsplit" / "corpus.rup"))
+    parser.add_argument("--components", default="aromanian_senter,tagger,aromanian_pos_lookup,ner,aromanian_lemmatizer")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--prometheus", action="store_true", help="Print the Prometheus text as well")
+    args = parser.parse_args()
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+    nlp = spacy_rup.load(components=args.components.split(","))
+    n_tokens = sum(len(doc) for doc in nlp.tokenizer.pipe(texts))
+    print(f"Corpus: {args.data} ({len(texts)} docs, {n_tokens} tokens), pipeline {nlp.pipe_names}")
+
+    run(nlp, texts[:200], args.batch_size, 1)  # warm up
+    # Alternate, so that drift in machine load hits both sides alike.
+    plain = instrumented = float("inf")
+    for _ in range(args.repeat):
+        plain = min(plain, run(nlp, texts, args.batch_size, 1))
+        spacy_rup.instrument(nlp)
+        instrumented = min(instrumented, run(nlp, texts, args.batch_size, 1))
+        uninstrument(nlp)
+    metrics = spacy_rup.instrument(nlp)
+    print(f"  plain {plain * 1000:.0f} ms, instrumented {instrumented * 1000:.0f} ms: overhead {instrumented / plain - 1:+.1%}")
+
+    metrics.reset()
+    run(nlp, texts, args.batch_size, 1)
+    snapshot = metrics.snapshot()
+    total = sum(stats["seconds"] for stats in snapshot.values())
+    print(f"  {'stage':<22} {'docs':>6} {'ms':>8} {'share':>6} {'tokens/s':>10}  histogram (<=1ms, <=10ms, <=100ms, slower)")
+    for stage, stats in snapshot.items():
+        counts = list(stats["histogram"].values())
+        groups = [sum(counts[:4]), sum(counts[4:7]), sum(counts[7:10]), sum(counts[10:])]
+        print(
+            f"  {stage:<22} {stats['docs']:6d} {stats['seconds'] * 1000:8.1f} {stats['seconds'] / total:6.1%} "
+            f"{stats['tokens_per_second']:10.0f}  {groups}"
+        )
+    if args.prometheus:
+        print(metrics.to_prometheus())
+    uninstrument(nlp)
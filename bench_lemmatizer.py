@@ -0,0 +1,65 @@
+import argparse
+import time
+from pathlib import Path
+
+import spacy
+import spacy_rup
+from spacy_rup.lemmatizer import lemmatize
+
+
+def per_token_lemmatize(doc):
+    """Reference implementation: one `token.lemma_` assignment per token."""
+    for token in doc:
+        if token.lemma != 0:
+            continue
+        token.lemma_ = lemmatize(token.text, token.pos_ if token.pos_ else None)
+    return doc
+
+
+def timed(label, func, n_docs, n_tokens):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<32} {elapsed:8.3f}s  {n_docs / elapsed:10.0f} docs/s  {n_tokens / elapsed:10.0f} tokens/s")
+    return elapsed
+
+
+def bench_lemmatizer(data_path, batch_size=128, n_process=1, repeat=5):
+    with open(data_path, "r", encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()] * repeat
+
+    nlp = spacy.blank("rup")
+    lemmatizer = nlp.add_pipe("aromanian_lemmatizer")
+
+    def fresh_docs():
+        return [nlp.make_doc(text) for text in texts]
+
+    n_tokens = sum(len(doc) for doc in fresh_docs())
+    print(f"Corpus: {data_path} ({len(texts)} docs, {n_tokens} tokens)")
+
+    docs = fresh_docs()
+    timed("per-token assignment", lambda: [per_token_lemmatize(doc) for doc in docs], len(texts), n_tokens)
+
+    docs = fresh_docs()
+    timed("__call__ per doc", lambda: [lemmatizer(doc) for doc in docs], len(texts), n_tokens)
+
+    docs = fresh_docs()
+    timed(f"pipe(batch_size={batch_size})", lambda: list(lemmatizer.pipe(docs, batch_size=batch_size)), len(texts), n_tokens)
+
+    timed(
+        f"nlp.pipe(n_process={n_process})",
+        lambda: list(nlp.pipe(texts, batch_size=batch_size, n_process=n_process)),
+        len(texts),
+        n_tokens,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the aromanian_lemmatizer component.")
+    parser.add_argument("--data", default=str(Path("data") / "Tales.train.rup"))
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--n-process", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5, help="Repeat the corpus to get stable timings")
+    args = parser.parse_args()
+
+    bench_lemmatizer(args.data, batch_size=args.batch_size, n_process=args.n_process, repeat=args.repeat)
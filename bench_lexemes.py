@@ -0,0 +1,72 @@
+import argparse
+import time
+from pathlib import Path
+
+from spacy.attrs import IS_STOP, LIKE_NUM, NORM
+from spacy.vocab import create_vocab
+
+from spacy_rup import Aromanian
+from spacy_rup.lexeme_table import load_lexeme_tables
+
+
+def make_nlp(with_tables):
+    nlp = Aromanian()
+    if not with_tables:
+        # The plain attribute getters, as spaCy builds them for the language.
+        nlp.vocab.lex_attr_getters = create_vocab("rup", Aromanian.Defaults).lex_attr_getters
+    return nlp
+
+
+def bench_first_pass(texts, with_tables, repeat=3):
+    """Tokenize the corpus with an empty vocab, so every word type creates a lexeme."""
+    best = None
+    for _ in range(repeat):
+        nlp = make_nlp(with_tables)
+        start = time.perf_counter()
+        n_tokens = sum(len(doc) for doc in nlp.tokenizer.pipe(texts))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return n_tokens, len(nlp.vocab), best
+
+
+def bench_getters(words, with_tables, repeat=3):
+    """Time only the LIKE_NUM, IS_STOP and NORM getters over all word types."""
+    getters = make_nlp(with_tables).vocab.lex_attr_getters
+    funcs = [getters[LIKE_NUM], getters[IS_STOP], getters[NORM]]
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for func in funcs:
+            for word in words:
+                func(word)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the precomputed lexeme tables against the attribute getters.")
+    parser.add_argument("--data", default=str(Path("data") / "Tales.test.rup"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tables = load_lexeme_tables()
+    load_time = time.perf_counter() - start
+    if tables is None:
+        raise SystemExit("No up-to-date lexeme tables; run python build_lexemes.py first")
+    print(f"Lexeme tables: {len(tables)} word types, loaded in {load_time * 1000:.1f} ms")
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+    words = sorted({token.text for doc in Aromanian().tokenizer.pipe(texts) for token in doc})
+    covered = sum(1 for word in words if word in tables.like_num)
+    print(f"Corpus: {args.data} ({len(texts)} lines, {len(words)} word types, {covered / len(words):.1%} in tables)")
+
+    for label, with_tables in (("getters", False), ("tables", True)):
+        n_tokens, n_lexemes, elapsed = bench_first_pass(texts, with_tables, repeat=args.repeat)
+        getters_time = bench_getters(words, with_tables, repeat=args.repeat)
+        print(
+            f"  {label:<8} first pass {n_tokens / elapsed:10.0f} tokens/s ({n_lexemes} lexemes created), "
+            f"LIKE_NUM+IS_STOP+NORM {getters_time / len(words) * 1e6:6.2f} us/type"
+        )
@@ -0,0 +1,53 @@
+import argparse
+import time
+
+import spacy
+
+import spacy_rup
+from spacy_rup.loader import clear_cache, resource_path
+
+
+def best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def load_fresh(**kwargs):
+    clear_cache()
+    return spacy_rup.load(**kwargs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load times of spacy_rup.load() configurations against spacy.load().")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Import and registry costs are paid once, outside the measurements.
+    spacy.load(resource_path("combined_model"))
+
+    configurations = [
+        ("spacy.load(pos_model) + (ner_model)", lambda: (spacy.load(resource_path("pos_model")), spacy.load(resource_path("ner_model")))),
+        ("load()", lambda: load_fresh()),
+        ("spacy.load(combined_model)", lambda: spacy.load(resource_path("combined_model"))),
+        ("load(model=combined_model)", lambda: load_fresh(model="combined_model")),
+        ("load(components=[tagger])", lambda: load_fresh(components=["tagger"])),
+        ("load(components=[ner])", lambda: load_fresh(components=["ner"])),
+        ("load(tagger, pos_lookup, senter)", lambda: load_fresh(components=["tagger", "aromanian_pos_lookup", "aromanian_senter"])),
+        ("load(model=pos_model)", lambda: load_fresh(model="pos_model")),
+    ]
+    print(f"{'':<38} {'ms':>8}")
+    for label, func in configurations:
+        print(f"{label:<38} {best_of(func, args.repeat) * 1000:8.1f}")
+
+    clear_cache()
+    nlp = spacy_rup.load(components=["tagger"])
+    cached = best_of(lambda: spacy_rup.load(components=["tagger"]), 1000)
+    print(f"{'load(), cached':<38} {cached * 1000:8.4f}")
+    print("Timings of load(components=[tagger]): " + ", ".join(
+        f"{name} {seconds * 1000:.1f} ms" for name, seconds in spacy_rup.load_timings(nlp).items()
+    ))
@@ -0,0 +1,60 @@
+import argparse
+import time
+from collections import Counter
+from pathlib import Path
+
+from spacy_rup import Aromanian
+from spacy_rup.numbers import parse_number
+
+
+def read_texts(data_dir, pattern):
+    texts = []
+    for path in sorted(Path(data_dir).glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            texts.extend(line.strip() for line in f if line.strip())
+    return texts
+
+
+def bench_numbers(texts, repeat=3):
+    nlp = Aromanian()
+    docs = list(nlp.pipe(texts))
+    tokens = [token for doc in docs for token in doc]
+    words = [token.text for token in tokens]
+    types = sorted(set(words))
+
+    # Grammar cost per word type, with an empty cache.
+    best = None
+    for _ in range(repeat):
+        parse_number.cache_clear()
+        start = time.perf_counter()
+        for word in types:
+            parse_number(word)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  Grammar, cold:          {best / len(types) * 1e6:8.2f} us/type ({len(types)} types)")
+
+    # Extension access per token, cache warm.
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        values = [token._.num_value for token in tokens]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  token._.num_value, warm:{len(tokens) / best:10.0f} tokens/s ({len(tokens)} tokens)")
+
+    numbers = Counter(word.lower() for word, value in zip(words, values) if value is not None)
+    n_like_num = sum(1 for token in tokens if token.like_num)
+    print(f"  Tokens with a value:    {sum(numbers.values()):8d} ({len(numbers)} forms), like_num: {n_like_num}")
+    print("  Most frequent: " + ", ".join(f"{form}={parse_number(form)}" for form, _ in numbers.most_common(12)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the number-word grammar behind token._.num_value.")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for orthography in ("rup", "rup_cun", "rup_std"):
+        texts = read_texts(args.data_dir, f"Tales.*.{orthography}")
+        print(f"Tales.*.{orthography} ({len(texts)} lines)")
+        bench_numbers(texts, repeat=args.repeat)
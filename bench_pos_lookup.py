@@ -0,0 +1,67 @@
+import argparse
+import time
+from pathlib import Path
+
+import spacy
+
+from enrich_pos_model import add_pos_rules
+
+
+def make_nlp(model, component):
+    """`model` with the word-list POS rules in `component`, right after the tagger."""
+    nlp = spacy.load(model, exclude=["attribute_ruler", "aromanian_pos_lookup"])
+    add_pos_rules(nlp.add_pipe(component, after="tagger"))
+    return nlp
+
+
+def tagged_docs(nlp, texts):
+    """Docs through every component up to (not including) the rules."""
+    before = nlp.pipe_names[: nlp.pipe_names.index("tagger") + 1]
+    with nlp.select_pipes(enable=before):
+        return list(nlp.pipe(texts))
+
+
+def bench(nlp, component, texts, repeat=3):
+    rules = nlp.get_pipe(component)
+    best = None
+    for _ in range(repeat):
+        docs = tagged_docs(nlp, texts)
+        start = time.perf_counter()
+        for doc in docs:
+            rules(doc)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return docs, best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark aromanian_pos_lookup against the attribute_ruler.")
+    parser.add_argument("--model", default=str(Path("spacy_rup") / "resources" / "pos_model"))
+    parser.add_argument("--data", default=str(Path("data") / "unsplit" / "corpus.rup"))
+    parser.add_argument("--limit", type=int, default=0, help="Lines to use (0: all)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+    if args.limit:
+        texts = texts[: args.limit]
+
+    results = {}
+    for component in ("attribute_ruler", "aromanian_pos_lookup"):
+        nlp = make_nlp(args.model, component)
+        docs, seconds = bench(nlp, component, texts, repeat=args.repeat)
+        n_tokens = sum(len(doc) for doc in docs)
+        results[component] = [[(token.pos_, token.tag_) for token in doc] for doc in docs]
+        print(
+            f"  {component:<22} {seconds * 1000:8.1f} ms  "
+            f"{n_tokens / seconds:11.0f} tokens/s"
+        )
+    print(f"Corpus: {args.data} ({len(texts)} docs, {n_tokens} tokens)")
+
+    differences = sum(
+        a != b
+        for ruler_doc, lookup_doc in zip(results["attribute_ruler"], results["aromanian_pos_lookup"])
+        for a, b in zip(ruler_doc, lookup_doc)
+    )
+    print(f"Tokens with a different POS/TAG: {differences}")
@@ -0,0 +1,81 @@
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+MODES = {
+    "load-per-worker": "every worker loads the pipeline itself",
+    "fork": "loaded and warmed in the parent, no gc.freeze()",
+    "fork+freeze": "spacy_rup.prefork.preload (gc.freeze())",
+}
+
+
+def worker(ready, done, components, texts):
+    from spacy_rup import load
+
+    nlp = load(components=components)
+    list(nlp.pipe(texts))
+    gc.collect()  # What a long-running worker does sooner or later
+    ready.put(os.getpid())
+    done.wait()
+
+
+def run_mode(mode, n_workers, components, texts):
+    """Start the workers in this (fresh) process and measure them; prints JSON."""
+    from spacy_rup import load
+    from spacy_rup.prefork import WARMUP_TEXTS, PreforkPool, fork_context, preload, unique_rss
+
+    start = time.perf_counter()
+    if mode == "fork":
+        list(load(components=components).pipe(WARMUP_TEXTS))
+    elif mode == "fork+freeze":
+        preload(components=components)
+    parent = unique_rss()
+    context = fork_context()
+    ready, done = context.Queue(), context.Event()
+    pool = PreforkPool(worker, n_workers, args=(ready, done, components, texts), restart=False)
+    pool.start()
+    for _ in range(n_workers):
+        ready.get()
+    elapsed = time.perf_counter() - start
+    memory = pool.memory()
+    done.set()
+    pool.stop()
+    print(json.dumps({"seconds": elapsed, "parent": parent, "workers": list(memory.values())}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-worker memory of pre-forked workers sharing the loaded pipeline.")
+    parser.add_argument("--data", default=str(Path("data") / "unsplit" / "corpus.rup"))
+    parser.add_argument("--components", default="tagger,aromanian_pos_lookup,ner")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--docs", type=int, default=500, help="Docs each worker annotates before it is measured")
+    parser.add_argument("--mode", choices=list(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()][: args.docs]
+    components = args.components.split(",")
+    if args.mode:
+        run_mode(args.mode, args.workers, components, texts)
+        sys.exit(0)
+
+    print(f"Components: {components}, {args.workers} workers, {len(texts)} docs each, {os.cpu_count()} CPUs")
+    print(f"  {'mode':<16} {'ready s':>7} {'parent MB':>9} {'unique MB/worker':>16} {'PSS MB total':>12}")
+    env = dict(os.environ, PYTHONWARNINGS="ignore")
+    for mode, description in MODES.items():
+        result = subprocess.run(
+            [sys.executable, __file__, *sys.argv[1:], "--mode", mode], capture_output=True, text=True, check=True, env=env
+        )
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        workers = stats["workers"]
+        uss = sum(w["uss"] for w in workers) / len(workers) / 2**20
+        pss = (stats["parent"].get("pss", 0) + sum(w["pss"] for w in workers)) / 2**20
+        print(
+            f"  {mode:<16} {stats['seconds']:7.2f} {stats['parent'].get('uss', 0) / 2**20:9.1f} "
+            f"{uss:16.1f} {pss:12.1f}   ({description})"
+        )
@@ -0,0 +1,67 @@
+import argparse
+import time
+from pathlib import Path
+
+import spacy
+
+from spacy_rup import Aromanian, make_docs, pretokenized
+
+
+def bench(label, run, n_docs, repeat=3):
+    best = None
+    n_tokens = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        n_tokens = sum(len(doc) for doc in run())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  {label:<32} {n_docs / best:10.0f} docs/s {n_tokens / best:10.0f} tokens/s")
+    return best
+
+
+def bench_pipeline(name, nlp, lines, repeat=3, batch_size=256):
+    print(f"{name} ({', '.join(nlp.pipe_names) or 'tokenizer only'})")
+    n_docs = len(lines)
+    tokenizer = bench(
+        "rup tokenizer",
+        lambda: nlp.pipe(lines, batch_size=batch_size),
+        n_docs, repeat,
+    )
+    fast = bench(
+        "make_docs",
+        lambda: nlp.pipe(make_docs(lines, vocab=nlp.vocab), batch_size=batch_size),
+        n_docs, repeat,
+    )
+
+    def run_pretokenized():
+        with pretokenized(nlp):
+            yield from nlp.pipe(lines, batch_size=batch_size)
+
+    bench("pretokenized(nlp)", run_pretokenized, n_docs, repeat)
+    print(f"  Speedup (make_docs):             {tokenizer / fast:10.2f}x")
+
+
+def count_retokenized(nlp, lines):
+    """Lines where the rup tokenizer does not reproduce the given tokens."""
+    return sum(
+        1 for line, doc in zip(lines, nlp.tokenizer.pipe(lines))
+        if [token.text for token in doc] != line.split()
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the rup tokenizer with the pre-tokenized fast path.")
+    parser.add_argument("--data", default=str(Path("data") / "unsplit" / "corpus.rup.tok"))
+    parser.add_argument("--model", default=str(Path("spacy_rup") / "resources" / "pos_model"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    print(f"Corpus: {args.data} ({len(lines)} lines, {sum(len(line.split()) for line in lines)} tokens)")
+
+    nlp = Aromanian()
+    print(f"Lines the rup tokenizer splits differently from the file: {count_retokenized(nlp, lines)}\n")
+    bench_pipeline("Blank Aromanian", nlp, lines, repeat=args.repeat)
+    if Path(args.model).exists():
+        bench_pipeline(args.model, spacy.load(args.model), lines, repeat=args.repeat)
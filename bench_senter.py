@@ -0,0 +1,74 @@
+import argparse
+import time
+from pathlib import Path
+
+from spacy_rup import Aromanian
+
+
+def make_nlp(component):
+    nlp = Aromanian()
+    nlp.add_pipe(component)
+    return nlp
+
+
+def join_lines(lines, lines_per_doc, separator):
+    """Documents of `lines_per_doc` corpus lines, with the character offsets of the line ends."""
+    docs = []
+    for start in range(0, len(lines), lines_per_doc):
+        chunk = lines[start:start + lines_per_doc]
+        offsets = set()
+        position = 0
+        for line in chunk[:-1]:
+            position += len(line) + len(separator)
+            offsets.add(position)
+        docs.append((separator.join(chunk), offsets))
+    return docs
+
+
+def line_recall(nlp, docs):
+    """Share of line ends (all sentence ends) found when the lines are joined with spaces."""
+    found = total = n_sents = 0
+    for doc, (_, offsets) in zip(nlp.pipe(text for text, _ in docs), docs):
+        sent_starts = {sent.start_char for sent in doc.sents}
+        found += len(offsets & sent_starts)
+        total += len(offsets)
+        n_sents += len(sent_starts)
+    return found / total, n_sents
+
+
+def bench(nlp, texts, repeat=3):
+    docs = list(nlp.tokenizer.pipe(texts))
+    n_tokens = sum(len(doc) for doc in docs)
+    component = nlp.get_pipe(nlp.pipe_names[0])
+    best = None
+    for _ in range(repeat):
+        docs = list(nlp.tokenizer.pipe(texts))
+        start = time.perf_counter()
+        for doc in docs:
+            component(doc)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return n_tokens / best, sum(len(list(doc.sents)) for doc in docs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the rule-based Aromanian sentence segmenter.")
+    parser.add_argument("--data", default=str(Path("data") / "unsplit" / "corpus.rup"))
+    parser.add_argument("--lines-per-doc", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    paragraphs = [text for text, _ in join_lines(lines, args.lines_per_doc, "\n")]
+    spaced = join_lines(lines, args.lines_per_doc, " ")
+    print(f"Corpus: {args.data} ({len(lines)} lines, {len(paragraphs)} docs of {args.lines_per_doc} lines)")
+
+    for component in ("aromanian_senter", "sentencizer"):
+        nlp = make_nlp(component)
+        speed, n_sents = bench(nlp, paragraphs, repeat=args.repeat)
+        recall, _ = line_recall(nlp, spaced)
+        print(
+            f"  {component:<18} {speed:10.0f} tokens/s  {n_sents:6d} sentences  "
+            f"line ends found without newlines: {recall:6.1%}"
+        )
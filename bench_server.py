@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, model, max_batch_size, max_latency_ms, queue_depth, workers=1):
+    argv = [
+        sys.executable, "-m", "spacy_rup", "serve", "--port", str(port), "--model", model,
+        "--max-batch-size", str(max_batch_size), "--max-latency-ms", str(max_latency_ms),
+        "--queue-depth", str(queue_depth), "--workers", str(workers),
+    ]
+    env = dict(os.environ, PYTHONWARNINGS="ignore")
+    return subprocess.Popen(argv, env=env, stderr=subprocess.DEVNULL)
+
+
+async def request(reader, writer, method, path, payload=None):
+    """One keep-alive HTTP/1.1 request; returns (status, body)."""
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def get(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        return await request(reader, writer, "GET", path)
+    finally:
+        writer.close()
+
+
+async def wait_ready(port, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status, _ = await get(port, "/health")
+            if status == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+async def client(port, texts, latencies, statuses):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for i, text in texts:
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, "POST", "/annotate", {"id": i, "text": text})
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def load_test(port, lines, n_requests, concurrency):
+    """Closed loop: `concurrency` clients, each sending its next request on a response."""
+    work = [(i, lines[i % len(lines)]) for i in range(n_requests)]
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, work[c::concurrency], latencies, statuses) for c in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    _, stats = await get(port, "/stats")
+    return latencies, statuses, elapsed, json.loads(stats)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator for python -m spacy_rup serve: latency and throughput.")
+    parser.add_argument("--data", default=str(Path("data") / "unsplit" / "corpus.rup"))
+    parser.add_argument("--model", default="pos,ner")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", default="1,16,64", help="Concurrent clients, comma-separated")
+    parser.add_argument("--batch-sizes", default="1,32", help="--max-batch-size values; 1 is one nlp() per request")
+    parser.add_argument("--max-latency-ms", type=float, default=5.0)
+    parser.add_argument("--queue-depth", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=1, help="Pre-forked server processes (mean batch is then one worker's)")
+    parser.add_argument("--port", type=int, help="Load an already running server instead of starting one")
+    args = parser.parse_args()
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    print(f"Corpus: {args.data} ({len(lines)} lines), model {args.model}, {args.requests} requests, {os.cpu_count()} CPUs")
+    print(f"  {'batch':>5} {'clients':>7} {'req/sec':>8} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>10}  statuses")
+    batch_sizes = [None] if args.port else [int(n) for n in args.batch_sizes.split(",")]
+    for max_batch_size in batch_sizes:
+        port = args.port or free_port()
+        server = None if args.port else start_server(
+            port, args.model, max_batch_size, args.max_latency_ms, args.queue_depth, args.workers
+        )
+        try:
+            asyncio.run(wait_ready(port))
+            asyncio.run(load_test(port, lines, 100, 4))  # warm up
+            for concurrency in (int(n) for n in args.concurrency.split(",")):
+                before = json.loads(asyncio.run(get(port, "/stats"))[1])
+                latencies, statuses, elapsed, stats = asyncio.run(load_test(port, lines, args.requests, concurrency))
+                batches = stats["batches"] - before["batches"]
+                mean_batch = (stats["requests"] - before["requests"]) / batches if batches else 0.0
+                print(
+                    f"  {max_batch_size or '-':>5} {concurrency:>7} {len(latencies) / elapsed:8.0f} "
+                    f"{percentile(latencies, 0.5) * 1000:8.1f} {percentile(latencies, 0.99) * 1000:8.1f} "
+                    f"{mean_batch:10.1f}  {statuses}"
+                )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
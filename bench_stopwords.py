@@ -0,0 +1,60 @@
+import argparse
+import time
+from pathlib import Path
+
+from spacy_rup import Aromanian
+from spacy_rup.lex_attrs import _num_word_forms, like_num
+from spacy_rup.orthography import cunia_key
+from spacy_rup.stop_words import STOP_WORDS, _stop_word_forms
+
+
+def read_tokens(path):
+    with open(path, "r", encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+    nlp = Aromanian()
+    return [token.text for doc in nlp.tokenizer.pipe(texts) for token in doc]
+
+
+def time_lookups(words, contains, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for word in words:
+            contains(word)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(words) / best
+
+
+def bench_corpus(path, repeat=3):
+    words = read_tokens(path)
+    print(f"{path} ({len(words)} tokens, {len(set(words))} types)")
+
+    exact = sum(1 for word in words if word.lower() in _stop_word_forms)
+    canonical = sum(1 for word in words if word in STOP_WORDS)
+    print(f"  is_stop  exact forms {exact / len(words):7.2%}   canonical keys {canonical / len(words):7.2%}")
+
+    exact = sum(1 for word in words if word.lower() in _num_word_forms)
+    canonical = sum(1 for word in words if like_num(word))
+    print(f"  like_num exact forms {exact:7d}   canonical keys + grammar {canonical:7d}")
+
+    exact_rate = time_lookups(words, lambda word: word.lower() in _stop_word_forms, repeat)
+    cunia_key.cache_clear()
+    cold_rate = time_lookups(words, STOP_WORDS.__contains__, repeat=1)
+    warm_rate = time_lookups(words, STOP_WORDS.__contains__, repeat)
+    print(
+        f"  lookups  exact {exact_rate:10.0f}/s   canonical cold {cold_rate:10.0f}/s   "
+        f"canonical warm {warm_rate:10.0f}/s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coverage and speed of the canonical stop-word and number sets.")
+    parser.add_argument("--data-dir", default=str(Path("data") / "unsplit"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Stop words: {len(_stop_word_forms)} forms -> {len(STOP_WORDS)} canonical keys")
+    print(f"Number words: {len(_num_word_forms)} forms\n")
+    for name in ("corpus.rup_cun", "corpus.rup_std"):
+        bench_corpus(Path(args.data_dir) / name, repeat=args.repeat)
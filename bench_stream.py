@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+# Runs the CLI in a fresh process and reports its peak memory, workers included.
+RUNNER = """
+import json, resource, sys, time
+from spacy_rup.__main__ import main
+start = time.perf_counter()
+main(sys.argv[1:])
+elapsed = time.perf_counter() - start
+rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+print(json.dumps({"seconds": elapsed, "max_rss_kb": rss}), file=sys.stderr)
+"""
+
+
+def run_cli(input_path, output_path, model, workers, batch_size, queue_size):
+    argv = [
+        "stream", str(input_path), "-o", str(output_path), "--model", model,
+        "--workers", str(workers), "--batch-size", str(batch_size), "--queue-size", str(queue_size),
+    ]
+    env = dict(os.environ, PYTHONWARNINGS="ignore")
+    result = subprocess.run(
+        [sys.executable, "-c", RUNNER, *argv], capture_output=True, text=True, check=True, env=env
+    )
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput, peak memory and ordering of python -m spacy_rup stream.")
+    parser.add_argument("--data", default=str(Path("data") / "unsplit" / "corpus.rup"))
+    parser.add_argument("--model", default="pos,ner,lemma")
+    parser.add_argument("--copies", default="1,4", help="Input sizes, in copies of --data")
+    parser.add_argument("--workers", default="1,2")
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--queue-size", type=int, default=8)
+    args = parser.parse_args()
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    print(f"Corpus: {args.data} ({len(lines)} lines), model {args.model}, {os.cpu_count()} CPUs")
+    print(f"  {'records':>7} {'workers':>7} {'records/sec':>11} {'peak RSS MB':>12} {'ordered':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for copies in (int(n) for n in args.copies.split(",")):
+            input_path = Path(tmp) / f"input-{copies}.jsonl"
+            with open(input_path, "w", encoding="utf-8") as f:
+                for i, line in enumerate(lines * copies):
+                    f.write(json.dumps({"id": i, "text": line.strip()}) + "\n")
+            for workers in (int(n) for n in args.workers.split(",")):
+                output_path = Path(tmp) / f"output-{copies}-{workers}.jsonl"
+                stats = run_cli(input_path, output_path, args.model, workers, args.batch_size, args.queue_size)
+                with open(output_path, "r", encoding="utf-8") as f:
+                    ids = [json.loads(line)["id"] for line in f]
+                n_records = len(lines) * copies
+                print(
+                    f"  {n_records:7d} {workers:7d} {n_records / stats['seconds']:11.0f} "
+                    f"{stats['max_rss_kb'] / 1024:12.1f} {str(ids == list(range(n_records))):>8}"
+                )
@@ -0,0 +1,107 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from spacy_rup import Aromanian
+
+
+def bench_construction(repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        nlp = Aromanian()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  Aromanian() construction: {elapsed * 1000:8.2f} ms")
+    return nlp
+
+
+def regex_sizes(nlp):
+    tokenizer = nlp.tokenizer
+    sizes = {
+        "prefix": len(tokenizer.prefix_search.__self__.pattern),
+        "suffix": len(tokenizer.suffix_search.__self__.pattern),
+        "infix": len(tokenizer.infix_finditer.__self__.pattern),
+    }
+    print("  Regex sizes (chars): " + ", ".join(f"{k}={v}" for k, v in sizes.items()))
+    return sizes
+
+
+def bench_throughput(nlp, texts, repeat=3):
+    n_tokens = 0
+    best = None
+    for _ in range(repeat):
+        # Fresh tokenizer cache each round so the regexes are actually exercised.
+        tokenizer = Aromanian().tokenizer
+        start = time.perf_counter()
+        n_tokens = sum(len(doc) for doc in tokenizer.pipe(texts))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  Tokenizer throughput:     {n_tokens / best:10.0f} tokens/s ({n_tokens} tokens, best of {repeat})")
+    return n_tokens / best
+
+
+def bench_cold_start(runs=5):
+    """Time tokenizer creation in fresh processes, with and without the artifact."""
+    code = (
+        "import time, warnings; warnings.simplefilter('ignore')\n"
+        "import spacy_rup\n"
+        "from spacy.language import create_tokenizer\n"
+        "from spacy_rup.tokenizer import create_aromanian_tokenizer\n"
+        "nlp = spacy_rup.Aromanian(create_tokenizer=lambda nlp: None)\n"
+        "factory = create_aromanian_tokenizer() if sys.argv[1] == 'artifact' else create_tokenizer()\n"
+        "start = time.perf_counter(); factory(nlp); print(time.perf_counter() - start)\n"
+    )
+    results = {"language data": [], "artifact": []}
+    for _ in range(runs):
+        for label, mode in (("language data", "defaults"), ("artifact", "artifact")):
+            out = subprocess.run(
+                [sys.executable, "-c", "import sys\n" + code, mode],
+                capture_output=True, text=True, check=True,
+            )
+            results[label].append(float(out.stdout.strip().splitlines()[-1]))
+    for label, times in results.items():
+        print(f"  Cold tokenizer creation ({label}): {statistics.median(times) * 1000:8.2f} ms (median of {runs})")
+    return results
+
+
+def bench_startup(runs=5):
+    """Time `import spacy_rup`, then `Aromanian()` or `spacy_rup.load()`, in fresh processes."""
+    code = (
+        "import sys, time, warnings; warnings.simplefilter('ignore')\n"
+        "start = time.perf_counter()\n"
+        "import spacy_rup\n"
+        "imported = time.perf_counter()\n"
+        "spacy_rup.Aromanian() if sys.argv[1] == 'Aromanian()' else spacy_rup.load()\n"
+        "print(imported - start, time.perf_counter() - imported)\n"
+    )
+    results = {"import spacy_rup": [], "Aromanian()": [], "spacy_rup.load()": []}
+    for _ in range(runs):
+        for label in ("Aromanian()", "spacy_rup.load()"):
+            out = subprocess.run([sys.executable, "-c", code, label], capture_output=True, text=True, check=True)
+            imported, created = map(float, out.stdout.split()[-2:])
+            results["import spacy_rup"].append(imported)
+            results[label].append(created)
+    for label, times in results.items():
+        print(f"  Cold start, {label + ':':18s} {statistics.median(times) * 1000:8.2f} ms (median of {len(times)})")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark construction and speed of the rup tokenizer.")
+    parser.add_argument("--data", default=str(Path("data") / "unsplit" / "corpus.rup"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cold", action="store_true", help="Also time tokenizer creation in fresh processes")
+    args = parser.parse_args()
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+
+    print(f"Corpus: {args.data} ({len(texts)} lines)")
+    nlp = bench_construction()
+    regex_sizes(nlp)
+    bench_throughput(nlp, texts, repeat=args.repeat)
+    if args.cold:
+        bench_cold_start()
+        bench_startup()
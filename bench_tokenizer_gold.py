@@ -0,0 +1,136 @@
+import argparse
+import difflib
+import resource
+import time
+import tracemalloc
+from pathlib import Path
+
+from spacy_rup import Aromanian
+
+
+CORPORA = [
+    ("rup", "corpus.rup", "corpus.rup.tok"),
+    ("cunia", "corpus.rup_cun", "corpus.rup_cun.tok"),
+    ("std", "corpus.rup_std", "corpus.rup_std.tok"),
+]
+
+
+def read_pairs(raw_path, gold_path):
+    """Yield (raw line, gold tokens) pairs, skipping empty lines."""
+    with open(raw_path, "r", encoding="utf-8") as f:
+        raw_lines = f.read().split("\n")
+    with open(gold_path, "r", encoding="utf-8") as f:
+        gold_lines = f.read().split("\n")
+    assert len(raw_lines) == len(gold_lines), f"{raw_path} and {gold_path} differ in length"
+    for raw, gold in zip(raw_lines, gold_lines):
+        if raw.strip():
+            yield raw.strip(), gold.split()
+
+
+def token_spans(tokens):
+    """Character spans of tokens in their whitespace-free concatenation."""
+    spans = []
+    start = 0
+    for token in tokens:
+        spans.append((start, start + len(token)))
+        start += len(token)
+    return spans
+
+
+def boundary_map(gold_text, pred_text):
+    """Map every boundary position in gold_text to a position in pred_text.
+
+    The gold files sometimes normalize characters (ñ for ń, dz for d̦), so
+    the two strings are aligned with difflib when they differ.
+    """
+    if gold_text == pred_text:
+        return list(range(len(gold_text) + 1))
+    mapping = [0] * (len(gold_text) + 1)
+    matcher = difflib.SequenceMatcher(None, gold_text, pred_text, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        for p in range(i1, i2 + 1):
+            if tag == "equal":
+                mapping[p] = j1 + (p - i1)
+            elif i2 > i1:
+                mapping[p] = j1 + round((p - i1) * (j2 - j1) / (i2 - i1))
+            else:
+                mapping[p] = j1
+    return mapping
+
+
+def score_line(pred_tokens, gold_tokens):
+    """Return (true positives, n_pred, n_gold) for one line."""
+    pred_spans = set(token_spans(pred_tokens))
+    mapping = boundary_map("".join(gold_tokens), "".join(pred_tokens))
+    gold_spans = {(mapping[s], mapping[e]) for s, e in token_spans(gold_tokens)}
+    return len(pred_spans & gold_spans), len(pred_spans), len(gold_tokens)
+
+
+def evaluate(name, raw_path, gold_path):
+    pairs = list(read_pairs(raw_path, gold_path))
+    texts = [raw for raw, _ in pairs]
+
+    # Speed: fresh tokenizer so the cache starts empty.
+    tokenizer = Aromanian().tokenizer
+    start = time.perf_counter()
+    docs = list(tokenizer.pipe(texts))
+    elapsed = time.perf_counter() - start
+    n_tokens = sum(len(doc) for doc in docs)
+
+    # Memory: a second fresh tokenizer under tracemalloc.
+    tokenizer = Aromanian().tokenizer
+    tracemalloc.start()
+    for doc in tokenizer.pipe(texts):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tp = n_pred = n_gold = 0
+    for doc, (_, gold_tokens) in zip(docs, pairs):
+        pred_tokens = [token.text for token in doc if not token.is_space]
+        line_tp, line_pred, line_gold = score_line(pred_tokens, gold_tokens)
+        tp += line_tp
+        n_pred += line_pred
+        n_gold += line_gold
+
+    precision = tp / n_pred if n_pred else 0.0
+    recall = tp / n_gold if n_gold else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "name": name,
+        "lines": len(texts),
+        "tokens": n_tokens,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "tokens_per_sec": n_tokens / elapsed,
+        "peak_kb": peak / 1024,
+    }
+
+
+def bench_gold(data_dir):
+    data_dir = Path(data_dir)
+    results = []
+    print(f"{'corpus':<8} {'lines':>6} {'tokens':>8} {'P':>7} {'R':>7} {'F1':>7} {'tokens/s':>10} {'peak KB':>9}")
+    for name, raw_name, gold_name in CORPORA:
+        raw_path, gold_path = data_dir / raw_name, data_dir / gold_name
+        if not raw_path.exists() or not gold_path.exists():
+            print(f"{name:<8} missing {raw_path} or {gold_path}")
+            continue
+        r = evaluate(name, raw_path, gold_path)
+        results.append(r)
+        print(
+            f"{r['name']:<8} {r['lines']:>6} {r['tokens']:>8} {r['precision']:>7.2%} {r['recall']:>7.2%} "
+            f"{r['f1']:>7.2%} {r['tokens_per_sec']:>10.0f} {r['peak_kb']:>9.0f}"
+        )
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"Process max RSS: {max_rss / 1024:.1f} MB")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score the rup tokenizer against the gold corpus.*.tok files.")
+    parser.add_argument("--data-dir", default=str(Path("data") / "unsplit"))
+    args = parser.parse_args()
+
+    bench_gold(args.data_dir)
@@ -0,0 +1,44 @@
+import argparse
+from pathlib import Path
+
+from spacy_rup import Aromanian
+from spacy_rup.lexeme_table import LEXEME_TABLES, build_lexeme_tables, load_lexeme_tables, write_lexeme_tables
+
+
+def corpus_files(data_dir):
+    """The Aromanian text files under data/, in every orthography."""
+    data_dir = Path(data_dir)
+    patterns = ["Tales.*.rup*", "basma_*.txt", "unsplit/corpus.rup*"]
+    return sorted({path for pattern in patterns for path in data_dir.glob(pattern)})
+
+
+def collect_word_types(paths, nlp):
+    words = set()
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for doc in nlp.tokenizer.pipe(line.strip() for line in f):
+                words.update(token.text for token in doc if not token.is_space)
+    return words
+
+
+def build_lexemes(data_dir, output_path=LEXEME_TABLES):
+    paths = corpus_files(data_dir)
+    # Installed tables are only used when they match the current sources,
+    # so the values are the same as the getters would compute.
+    nlp = Aromanian()
+    words = collect_word_types(paths, nlp)
+    print(f"Collected {len(words)} word types from {len(paths)} files")
+
+    lookups = build_lexeme_tables(words, nlp.vocab)
+    path = write_lexeme_tables(lookups, output_path)
+    print(f"Saved lexeme tables to {path} ({path.stat().st_size / 1024:.1f} KB)")
+
+    assert load_lexeme_tables(path) is not None, "Lexeme tables could not be loaded back"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute lexeme attributes for the corpus word types.")
+    parser.add_argument("--data-dir", default="data")
+    args = parser.parse_args()
+
+    build_lexemes(args.data_dir)
@@ -0,0 +1,39 @@
+import argparse
+import itertools
+from pathlib import Path
+
+from spacy_rup.lemmatizer import VERB_LEMMAS, NOUN_LEMMAS, ADJ_LEMMAS
+from spacy_rup.lexicon import LemmaLexicon, read_tsv_entries, write_lexicon
+
+
+def builtin_entries():
+    """The hard-coded lemma tables as (form, lemma, pos) entries."""
+    for table, pos in ((VERB_LEMMAS, "VERB"), (NOUN_LEMMAS, "NOUN"), (ADJ_LEMMAS, "ADJ")):
+        for form, lemma in table.items():
+            yield (form, lemma, pos)
+
+
+def build_lexicon(inputs, output_path, include_builtin=False):
+    """Compile TSV lexicons (form<TAB>lemma[<TAB>pos]) into one binary lexicon."""
+    sources = [read_tsv_entries(path) for path in inputs]
+    if include_builtin:
+        sources.append(builtin_entries())
+
+    n_records = write_lexicon(output_path, itertools.chain(*sources))
+    size = Path(output_path).stat().st_size
+    lexicon = LemmaLexicon.from_file(output_path)
+    print(f"Wrote {n_records} forms ({size / 1024:.1f} KB, POS labels: {lexicon.pos_labels[1:]}) to {output_path}")
+    lexicon.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a binary lemma lexicon for aromanian_lemmatizer.")
+    parser.add_argument("inputs", nargs="*", help="TSV files with form<TAB>lemma[<TAB>pos] lines")
+    parser.add_argument("-o", "--output", default="rup_lexicon.bin")
+    parser.add_argument("--builtin", action="store_true", help="Also include the built-in lemma tables")
+    args = parser.parse_args()
+
+    if not args.inputs and not args.builtin:
+        parser.error("Give at least one TSV file or --builtin")
+
+    build_lexicon(args.inputs, args.output, include_builtin=args.builtin)
@@ -0,0 +1,18 @@
+from spacy_rup import Aromanian
+from spacy_rup.tokenizer import build_tokenizer_artifact, load_tokenizer
+from spacy_rup.tokenizer_exceptions import write_contraction_variants
+
+
+def build_tokenizer():
+    path = write_contraction_variants()
+    print(f"Saved contraction variants to {path}")
+
+    path = build_tokenizer_artifact(Aromanian.Defaults)
+    print(f"Saved tokenizer artifact to {path} ({path.stat().st_size / 1024:.1f} KB)")
+
+    tokenizer = load_tokenizer(Aromanian())
+    assert tokenizer is not None, "Artifact could not be loaded back"
+
+
+if __name__ == "__main__":
+    build_tokenizer()
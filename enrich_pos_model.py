@@ -4,29 +4,11 @@ from spacy.pipeline import AttributeRuler
 import spacy_rup
 from spacy_rup.lemmatizer import VERB_LEMMAS, NOUN_LEMMAS, ADJ_LEMMAS, VERB_RULES, ADJ_RULES
 
-def enrich_model():
-    model_path = Path("spacy_rup/resources/pos_model")
-    if not model_path.exists():
-        print(f"Error: Model not found at {model_path}")
-        return
+def add_pos_rules(ruler):
+    """Add the POS/TAG rules from the lemmatizer dictionaries and the manual list.
 
-    print(f"Loading model from {model_path}...")
-    try:
-        nlp = spacy.load(model_path)
-    except Exception as e:
-        print(f"Failed to load model: {e}")
-        return
-
-    # Add AttributeRuler
-    # If it exists, remove it to start fresh? Or just get it.
-    if "attribute_ruler" in nlp.pipe_names:
-        ruler = nlp.get_pipe("attribute_ruler")
-    else:
-        # Add after tagger
-        ruler = nlp.add_pipe("attribute_ruler", after="tagger")
-
-    print("Adding rules from lemmatizer dictionaries...")
-    
+    `ruler` is an `aromanian_pos_lookup` or an `attribute_ruler`; both take the same `add()` calls.
+    """
     # Verbs
     # Map both keys (forms) and values (lemmas) to VERB per se? 
     # Usually keys are inflected forms.
@@ -128,8 +110,35 @@ def enrich_model():
         ruler.add(patterns=[[{"LOWER": word}]], attrs={"POS": pos, "TAG": pos})
 
     print(f"Added rules for {len(aux_forms)} AUX, {len(verb_forms)} VERB, {len(adj_forms)} ADJ, {len(noun_forms)} NOUN, and {len(manual_rules)} manual items.")
+
+
+def enrich_model():
+    model_path = Path("spacy_rup/resources/pos_model")
+    if not model_path.exists():
+        print(f"Error: Model not found at {model_path}")
+        return
+
+    print(f"Loading model from {model_path}...")
+    try:
+        nlp = spacy.load(model_path)
+    except Exception as e:
+        print(f"Failed to load model: {e}")
+        return
+
+    # Add the POS lookup. The rules used to go into an attribute_ruler, which
+    # gives the same results through the Matcher at a much higher cost.
+    if "attribute_ruler" in nlp.pipe_names:
+        nlp.remove_pipe("attribute_ruler")
+    if "aromanian_pos_lookup" in nlp.pipe_names:
+        ruler = nlp.get_pipe("aromanian_pos_lookup")
+    else:
+        # Add after tagger
+        ruler = nlp.add_pipe("aromanian_pos_lookup", after="tagger")
+
+    print("Adding rules from lemmatizer dictionaries...")
+    add_pos_rules(ruler)
     
-    nlp.to_disk(model_path)
+    nlp.to_disk(model_path, exclude=["tokenizer"])
     print(f"Saved enriched model to {model_path}")
 
 if __name__ == "__main__":
@@ -1,143 +1,244 @@
-import spacy
-from spacy.tokens import Doc
+"""
+Project Romanian POS tags onto the Aromanian side of the parallel tales.
+
+The Romanian lines are tagged with `ro_core_news_sm` and the Aromanian
+lines tokenized with `Aromanian()`, both with `nlp.pipe` in batches, while
+the files are read line by line. The token alignment (`difflib`) runs in a
+process pool, a chunk of sentences per task, and the CoNLL output
+(`word<TAB>POS`, "_" for tokens without a projected tag, a blank line
+after each sentence) is written in input order.
+
+A `<output>.progress` file records after every chunk how far the output
+is complete; `--resume` truncates the output to that point and continues
+after the last finished line, so an interrupted run or one stopped by
+`--limit` can be picked up again.
+
+Usage:
+    python project_pos_tags.py                        # data/Tales.train.* -> data/train.rup.conll
+    python project_pos_tags.py --limit 500 --workers 4
+    python project_pos_tags.py --resume
+"""
+
+import argparse
+import collections
+import difflib
+import itertools
+import json
+import multiprocessing
+import sys
+import time
 from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import spacy
+
 from spacy_rup import Aromanian
-import difflib
 
-def project_tags():
-    # Load Romanian model for tagging source text
+# Components of the Romanian pipeline that do not affect token.pos_
+RO_UNUSED = ["parser", "lemmatizer", "ner"]
+
+
+def read_pairs(ro_path: Path, rup_path: Path, skip_to: int = 0) -> Iterator[Tuple[int, str, str]]:
+    """Yield (line number, ro, rup) for the lines from `skip_to` on where both sides are non-empty."""
+    with open(ro_path, "r", encoding="utf-8") as ro_f, open(rup_path, "r", encoding="utf-8") as rup_f:
+        for number, (ro_line, rup_line) in enumerate(itertools.zip_longest(ro_f, rup_f)):
+            if ro_line is None or rup_line is None:
+                raise ValueError(f"{ro_path} and {rup_path} must have the same number of lines")
+            if number < skip_to:
+                continue
+            ro_line, rup_line = ro_line.strip(), rup_line.strip()
+            if ro_line and rup_line:
+                yield number, ro_line, rup_line
+
+
+def align_tags(ro_tokens: List[str], ro_pos: List[str], rup_tokens: List[str]) -> List[Optional[str]]:
+    """The projected POS of every Aromanian token, or None where no Romanian token matches.
+
+    Identical tokens (lowercased) found by `SequenceMatcher` take their tag;
+    in a one-to-one replacement, a cognate with a similar enough spelling
+    does too (stricter for short words).
+    """
+    matcher = difflib.SequenceMatcher(None, [t.lower() for t in ro_tokens], [t.lower() for t in rup_tokens])
+    rup_tags = [None] * len(rup_tokens)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            for k in range(i2 - i1):
+                rup_tags[j1 + k] = ro_pos[i1 + k]
+        elif tag == "replace" and (i2 - i1) == (j2 - j1) == 1:
+            rup_word = rup_tokens[j1]
+            similarity = difflib.SequenceMatcher(None, ro_tokens[i1].lower(), rup_word.lower()).ratio()
+            if similarity > (0.75 if len(rup_word) > 3 else 0.8):
+                rup_tags[j1] = ro_pos[i1]
+    return rup_tags
+
+
+def align_chunk(chunk: List[Tuple[int, List[str], List[str], List[str]]]) -> Tuple[int, int, str, int, int]:
+    """Align a chunk of (line number, ro tokens, ro POS, rup tokens).
+
+    Returns the last line number, the number of sentences, the CoNLL text,
+    projected and total Aromanian tokens. A sentence without any projected
+    tag is left out of the text.
+    """
+    blocks = []
+    projected = total = 0
+    for _, ro_tokens, ro_pos, rup_tokens in chunk:
+        rup_tags = align_tags(ro_tokens, ro_pos, rup_tokens)
+        total += len(rup_tokens)
+        if any(pos is not None for pos in rup_tags):
+            blocks.append("".join(f"{text}\t{pos or '_'}\n" for text, pos in zip(rup_tokens, rup_tags)) + "\n")
+            projected += sum(1 for pos in rup_tags if pos)
+    return chunk[-1][0], len(chunk), "".join(blocks), projected, total
+
+
+def _chunks(nlp_ro, nlp_rup, pairs, batch_size: int, chunk_size: int) -> Iterator[List[Tuple]]:
+    # Both pipes keep the input order, so the three streams stay in step.
+    numbers, ro_texts, rup_texts = itertools.tee(pairs, 3)
+    ro_docs = nlp_ro.pipe((ro for _, ro, _ in ro_texts), batch_size=batch_size)
+    rup_docs = nlp_rup.pipe((rup for _, _, rup in rup_texts), batch_size=batch_size)
+    items = (
+        (number, [t.text for t in doc_ro], [t.pos_ for t in doc_ro], [t.text for t in doc_rup])
+        for (number, _, _), doc_ro, doc_rup in zip(numbers, ro_docs, rup_docs)
+    )
+    while True:
+        chunk = list(itertools.islice(items, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _aligned(pool, chunks: Iterator[List[Tuple]], workers: int) -> Iterator[Tuple]:
+    """`align_chunk` results in chunk order, with at most two chunks per worker in flight.
+
+    `Pool.imap` would read `chunks`, and so run both pipelines, as far
+    ahead as it can; this window keeps memory bounded and the pipelines
+    in the main thread.
+    """
+    pending = collections.deque()
+    for chunk in chunks:
+        pending.append(pool.apply_async(align_chunk, (chunk,)))
+        if len(pending) >= 2 * workers:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def read_progress(path: Path) -> dict:
+    """The progress of an earlier run, or that of a new one if there was none."""
+    if not path.exists():
+        return {"next_line": 0, "offset": 0, "docs": 0, "projected": 0, "tokens": 0}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def project_tags(
+    ro_path: Path = Path("data") / "Tales.train.ro",
+    rup_path: Path = Path("data") / "Tales.train.rup",
+    output_path: Path = Path("data") / "train.rup.conll",
+    ro_model: str = "ro_core_news_sm",
+    limit: Optional[int] = None,
+    resume: bool = False,
+    workers: int = 1,
+    batch_size: int = 256,
+    chunk_size: int = 64,
+    report_every: int = 1000,
+) -> Optional[dict]:
+    """Project the tags of `ro_path` onto `rup_path` and write CoNLL to `output_path`.
+
+    Args:
+        limit: Line pairs to project in this run (None: all)
+        resume: Continue after the last finished line of an earlier run
+        workers: Processes for the alignment (1: in this process)
+        batch_size: Docs per `nlp.pipe` batch
+        chunk_size: Sentences per alignment task
+        report_every: Print docs/sec to stderr after about this many docs
+
+    Returns:
+        The totals (docs, projected and total tokens, seconds), or None if
+        the model or corpus is missing
+    """
     try:
-        nlp_ro = spacy.load("ro_core_news_sm")
+        nlp_ro = spacy.load(ro_model)
     except OSError:
-        print("Error: ro_core_news_sm not found.")
-        return
-
-    # Initialize Aromanian nlp for tokenization
-    # Disable other pipes for speed/purity
+        print(f"Error: {ro_model} not found. Please install it with: python -m spacy download {ro_model}")
+        return None
+    nlp_ro.select_pipes(disable=[name for name in RO_UNUSED if name in nlp_ro.pipe_names])
+    # Tokenization only
     nlp_rup = Aromanian()
 
-    data_dir = Path("data")
-    ro_path = data_dir / "Tales.train.ro"
-    rup_path = data_dir / "Tales.train.rup"
-    output_path = data_dir / "train.rup.conll"
-
     if not ro_path.exists() or not rup_path.exists():
-        print(f"Error: Corpus files not found in {data_dir}")
-        return
-
-    print(f"Reading from {ro_path} and {rup_path}...")
-    
-    with open(ro_path, "r", encoding="utf-8") as f:
-        ro_lines = f.readlines()
-    with open(rup_path, "r", encoding="utf-8") as f:
-        rup_lines = f.readlines()
-
-    assert len(ro_lines) == len(rup_lines), "Corpus files must have same number of lines"
-
-    projected_tokens = 0
-    total_tokens_rup = 0
-    
-    with open(output_path, "w", encoding="utf-8") as out_f:
-        for i, (ro_line, rup_line) in enumerate(zip(ro_lines, rup_lines)):
-            ro_line = ro_line.strip()
-            rup_line = rup_line.strip()
-            
-            if not ro_line or not rup_line:
-                continue
+        print(f"Error: Corpus files not found: {ro_path}, {rup_path}")
+        return None
+
+    progress_path = output_path.with_name(output_path.name + ".progress")
+    if not (resume and output_path.exists()) and progress_path.exists():
+        progress_path.unlink()
+    progress = read_progress(progress_path)
+    print(f"Reading from {ro_path} and {rup_path}, from line {progress['next_line']}...")
+
+    pairs = read_pairs(ro_path, rup_path, skip_to=progress["next_line"])
+    if limit is not None:
+        pairs = itertools.islice(pairs, limit)
+    chunks = _chunks(nlp_ro, nlp_rup, pairs, batch_size, chunk_size)
 
-            # Tag Romanian
-            doc_ro = nlp_ro(ro_line)
-            
-            # Tokenize Aromanian
-            doc_rup = nlp_rup(rup_line)
-            
-            ro_tokens = [t.text for t in doc_ro]
-            rup_tokens = [t.text for t in doc_rup]
-            total_tokens_rup += len(rup_tokens)
-
-            # Use SequenceMatcher to align
-            # We match on lowercased text to help with capitalization diffs
-            matcher = difflib.SequenceMatcher(None, 
-                [t.lower() for t in ro_tokens], 
-                [t.lower() for t in rup_tokens]
-            )
-            
-            # Get matching blocks: (ro_start, rup_start, length)
-            # This identifies sub-sequences that match "exactly" (based on the input list)
-            # BUT SequenceMatcher on lists checks equality of elements. 
-            # ro "este" != rup "easte". So basic SequenceMatcher might fail on cognates.
-            # We need a custom scoring or iterative approach.
-            
-            # Better approach for cognates:
-            # 1. Use SequenceMatcher to find the "skeleton" of identical words (punctuation, names, common words)
-            # 2. Fill in gaps?
-            
-            # Actually, let's trust SequenceMatcher to find the longest common subsequences.
-            # Ideally "Ficiorlu a meu easte bun" vs "Feciorul meu este bun"
-            # SequenceMatcher might align "meu", "bun", ".".
-            
-            # Let's try to iterate through opcodes to handle Replace/Equal
-            opcodes = matcher.get_opcodes()
-            
-            # We will build a list of (rup_token, assigned_pos)
-            # Initialize with None
-            rup_tags = [None] * len(rup_tokens)
-            
-            for tag, i1, i2, j1, j2 in opcodes:
-                if tag == 'equal':
-                    # Direct match (identical words/punct)
-                    for k in range(i2-i1):
-                        # ro_tokens[i1+k] == rup_tokens[j1+k]
-                        # Transfer tag
-                        ro_idx = i1 + k
-                        rup_idx = j1 + k
-                        rup_tags[rup_idx] = doc_ro[ro_idx].pos_
-                
-                elif tag == 'replace':
-                    # Block of words replaced by another block.
-                    # e.g. ro: ["este"], rup: ["easte"]
-                    # Check if they are cognates (similar strings)
-                    # If 1-to-1 replacement, compare similarity
-                    if (i2 - i1) == (j2 - j1) == 1:
-                        ro_word = ro_tokens[i1]
-                        rup_word = rup_tokens[j1]
-                        
-                        # Similarity check
-                        sim = difflib.SequenceMatcher(None, ro_word.lower(), rup_word.lower()).ratio()
-                        
-                        # Thresholds:
-                        # > 0.7 for words longer than 3 chars
-                        # Exact match required for very short words if not covered by 'equal' (handled above)
-                        if len(rup_word) > 3 and sim > 0.75:
-                             rup_tags[j1] = doc_ro[i1].pos_
-                        elif len(rup_word) <= 3 and sim > 0.8: # stricter for short words
-                             rup_tags[j1] = doc_ro[i1].pos_
-                    
-            # Write only if we have some tax, but frankly we want sentences.
-            # If we skip tokens, we can't train a sequence model well on that sentence 
-            # unless we treat missing tags as 'X' or split sentences?
-            # spaCy training supports missing tags? No, it expects a full Doc.
-            # WE MUST PRESERVE SENTENCE STRUCTURE.
-            # If we have gaps, we can either:
-            # 1. Skip the whole sentence (Strict)
-            # 2. Use a default tag (e.g. NOUN or X) -> Bad for training.
-            # 3. Only Output sentences where ALL tokens are tagged.
-            
-            # Output even if partial, but maybe filter very sparse ones?
-            # Let's verify we have at least ONE tag.
-            if any(t is not None for t in rup_tags):
-                for token_text, pos in zip(rup_tokens, rup_tags):
-                     # Use '_' for missing tags (standard CoNLL practice for missing)
-                     tag_str = pos if pos else "_"
-                     out_f.write(f"{token_text}\t{tag_str}\n")
-                out_f.write("\n")
-                projected_tokens += len([t for t in rup_tags if t])
-            else:
-                # Optional: Log dropped sentences for debug?
-                pass
-                
-    print(f"Done. Projected {projected_tokens} tokens out of total {total_tokens_rup} ({projected_tokens/total_tokens_rup:.1%} coverage).")
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    results = _aligned(pool, chunks, workers) if pool else map(align_chunk, chunks)
+
+    start = time.perf_counter()
+    n_docs, reported = 0, 0
+    mode = "r+" if resume and output_path.exists() else "w"
+    try:
+        with open(output_path, mode, encoding="utf-8", newline="\n") as out_f:
+            # Drop whatever an interrupted run wrote after its last finished chunk.
+            out_f.seek(progress["offset"])
+            out_f.truncate()
+            for last_line, chunk_docs, text, projected, total in results:
+                out_f.write(text)
+                out_f.flush()
+                n_docs += chunk_docs
+                progress["docs"] += chunk_docs
+                progress["projected"] += projected
+                progress["tokens"] += total
+                progress["next_line"] = last_line + 1
+                progress["offset"] = out_f.tell()
+                progress_path.write_text(json.dumps(progress), encoding="utf-8")
+                if report_every and n_docs - reported >= report_every:
+                    reported = n_docs
+                    elapsed = time.perf_counter() - start
+                    print(f"{n_docs} docs, {n_docs / elapsed:.0f} docs/sec", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.terminate()
+    seconds = time.perf_counter() - start
+
+    coverage = progress["projected"] / progress["tokens"] if progress["tokens"] else 0.0
+    print(
+        f"Done. Projected {progress['projected']} tokens out of total {progress['tokens']} ({coverage:.1%} coverage)."
+    )
+    print(f"{n_docs} docs in {seconds:.1f} s ({n_docs / seconds if seconds else 0:.0f} docs/sec) with {workers} worker(s)")
     print(f"Saved to {output_path}")
+    return {"docs": n_docs, "projected": progress["projected"], "tokens": progress["tokens"], "seconds": seconds}
+
 
 if __name__ == "__main__":
-    project_tags()
+    parser = argparse.ArgumentParser(description="Project Romanian POS tags onto the Aromanian side of a parallel corpus.")
+    parser.add_argument("--ro", default=str(Path("data") / "Tales.train.ro"))
+    parser.add_argument("--rup", default=str(Path("data") / "Tales.train.rup"))
+    parser.add_argument("-o", "--output", default=str(Path("data") / "train.rup.conll"))
+    parser.add_argument("--ro-model", default="ro_core_news_sm")
+    parser.add_argument("--limit", type=int, default=None, help="Line pairs to project in this run")
+    parser.add_argument("--resume", action="store_true", help="Continue after the last finished line of the output")
+    parser.add_argument("--workers", type=int, default=max(1, min(4, multiprocessing.cpu_count() - 1)))
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--chunk-size", type=int, default=64, help="Sentences per alignment task")
+    args = parser.parse_args()
+
+    project_tags(
+        Path(args.ro),
+        Path(args.rup),
+        Path(args.output),
+        ro_model=args.ro_model,
+        limit=args.limit,
+        resume=args.resume,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        chunk_size=args.chunk_size,
+    )
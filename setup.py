@@ -6,6 +6,9 @@ setup(
     description='Aromanian language support for spaCy',
     author='Aromanian NLP Project',
     packages=find_packages(),
+    package_data={
+        'spacy_rup': ['resources/*', 'resources/*/*', 'resources/*/*/*'],
+    },
     install_requires=[
         'spacy>=3.0.0',
         'scikit-learn',
@@ -1,26 +1,64 @@
 ﻿
 
+import gc
+
 import spacy
 from spacy.language import Language
 from spacy.lang.tokenizer_exceptions import BASE_EXCEPTIONS
+from spacy.util import load_config_from_str
 
 from .lex_attrs import LEX_ATTRS
-from .punctuation import TOKENIZER_INFIXES, TOKENIZER_PREFIXES, TOKENIZER_SUFFIXES
+from . import punctuation, tokenizer_exceptions
 from .stop_words import STOP_WORDS
-from .tokenizer_exceptions import TOKENIZER_EXCEPTIONS
+from .lexeme_table import install_lexeme_tables
 
 from . import lemma_component
+from . import clitics
+from . import senter
+from . import pos_lookup
+from . import tokenizer
 
 
 
 from .orthography import detect_orthography, cunia_to_diaro, diaro_to_cunia
+from .pretokenized import make_docs, pretokenized
+from .loader import load, load_timings
+from .instrumentation import instrument
+
+
+DEFAULT_CONFIG = """
+[nlp]
+
+[nlp.tokenizer]
+@tokenizers = "spacy_rup.Tokenizer.v1"
+"""
+
+
+class rule_table:
+    """Class attribute computed on first access, then stored on the class.
+
+    The tokenizer tables are only needed when the tokenizer artifact is
+    missing or stale (see `spacy_rup.tokenizer`).
+    """
+
+    def __init__(self, build):
+        self.build = build
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        value = self.build()
+        setattr(owner, self.name, value)
+        return value
 
 
 class AromanianDefaults(Language.Defaults):
-    tokenizer_exceptions = {**BASE_EXCEPTIONS, **TOKENIZER_EXCEPTIONS}
-    prefixes = TOKENIZER_PREFIXES
-    suffixes = TOKENIZER_SUFFIXES
-    infixes = TOKENIZER_INFIXES
+    config = load_config_from_str(DEFAULT_CONFIG)
+    tokenizer_exceptions = rule_table(lambda: {**BASE_EXCEPTIONS, **tokenizer_exceptions.TOKENIZER_EXCEPTIONS})
+    prefixes = rule_table(lambda: punctuation.TOKENIZER_PREFIXES)
+    suffixes = rule_table(lambda: punctuation.TOKENIZER_SUFFIXES)
+    infixes = rule_table(lambda: punctuation.TOKENIZER_INFIXES)
     lex_attr_getters = LEX_ATTRS
     stop_words = STOP_WORDS
 
@@ -29,6 +67,20 @@ class AromanianDefaults(Language.Defaults):
 class Aromanian(Language):
     lang = 'rup'
     Defaults = AromanianDefaults
+    
+    def __init__(self, *args, **kwargs):
+        # Construction allocates many objects that live as long as the
+        # pipeline (lexemes, special cases, regexes, lexeme tables); the
+        # collections they trigger would each walk the whole heap of
+        # spaCy, sklearn and scipy for nothing.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            super().__init__(*args, **kwargs)
+            install_lexeme_tables(self.vocab)
+        finally:
+            if enabled:
+                gc.enable()
 
 
-__all__ = ['Aromanian', 'detect_orthography', 'cunia_to_diaro', 'diaro_to_cunia']
+__all__ = ['Aromanian', 'detect_orthography', 'cunia_to_diaro', 'diaro_to_cunia', 'make_docs', 'pretokenized', 'load', 'load_timings', 'instrument']
@@ -0,0 +1,171 @@
+"""
+Command line interface:
+
+    python -m spacy_rup annotate --model pos,ner --n-process 4 --batch-size 256 input.txt
+    cat input.jsonl | python -m spacy_rup stream --model pos,ner,lemma --workers 4 > output.jsonl
+    python -m spacy_rup serve --model pos,ner --port 8080 --max-batch-size 32 --max-latency-ms 5 --workers 4
+    python -m spacy_rup serve --model pos,ner --cache-size 50000 --cache-path rup-cache.sqlite
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+from .annotate import MODEL_COMPONENTS, annotate_to_docbin, pipeline_components, read_lines
+from .doc_cache import DocCache
+from .loader import DEFAULT_MODEL, load
+from .prefork import preload, serve_prefork
+from .server import AnnotationServer
+from .stream import annotate_stream
+
+
+def annotate_command(args) -> int:
+    components = pipeline_components(model.strip() for model in args.model.split(",") if model.strip())
+    # With several processes, warm and freeze the pipeline so the forked workers share it.
+    nlp = (preload if args.n_process > 1 else load)(components=components, model=args.pipeline.split(","))
+    if args.output:
+        output_dir = Path(args.output)
+    elif args.input == "-":
+        output_dir = Path("annotated.spacy")
+    else:
+        output_dir = Path(args.input).with_suffix(".spacy")
+    print(f"Annotating {args.input} with {nlp.pipe_names} -> {output_dir}/", file=sys.stderr)
+
+    stats = annotate_to_docbin(
+        nlp,
+        read_lines(args.input),
+        output_dir,
+        shard_size=args.shard_size,
+        n_process=args.n_process,
+        batch_size=args.batch_size,
+        report_every=args.report_every,
+    )
+    seconds = max(stats["seconds"], 1e-9)
+    print(
+        f"{stats['docs']} docs, {stats['tokens']} tokens in {stats['shards']} shards, "
+        f"{seconds:.1f}s: {stats['docs'] / seconds:.0f} docs/sec, {stats['tokens'] / seconds:.0f} tokens/sec",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def stream_command(args) -> int:
+    components = pipeline_components(model.strip() for model in args.model.split(",") if model.strip())
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        annotate_stream(
+            source,
+            sink,
+            components=components,
+            model=args.pipeline.split(","),
+            n_workers=args.workers,
+            batch_size=args.batch_size,
+            queue_size=args.queue_size,
+            input_format=args.format,
+            text_key=args.text_key,
+            keep_text=args.keep_text,
+            # This process only feeds and orders the workers, so its frozen heap does no harm.
+            prefork=True,
+        )
+    except BrokenPipeError:
+        # The consumer stopped reading (e.g. `| head`); silence the final flush.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    return 0
+
+
+def make_cache(nlp, args) -> Optional[DocCache]:
+    if not args.cache_size and not args.cache_path:
+        return None
+    return DocCache(nlp, max_entries=args.cache_size, path=args.cache_path)
+
+
+def serve_command(args) -> int:
+    components = pipeline_components(model.strip() for model in args.model.split(",") if model.strip())
+    if args.workers > 1:
+        nlp = preload(components=components, model=args.pipeline.split(","))
+        cache = make_cache(nlp, args)
+        print(f"Serving {nlp.pipe_names} on http://{args.host}:{args.port}/annotate with {args.workers} workers", file=sys.stderr)
+        serve_prefork(
+            nlp,
+            args.host,
+            args.port,
+            n_workers=args.workers,
+            max_batch_size=args.max_batch_size,
+            max_latency=args.max_latency_ms / 1000,
+            queue_depth=args.queue_depth,
+            cache=cache,
+        )
+        return 0
+    nlp = load(components=components, model=args.pipeline.split(","))
+    server = AnnotationServer(
+        nlp,
+        max_batch_size=args.max_batch_size,
+        max_latency=args.max_latency_ms / 1000,
+        queue_depth=args.queue_depth,
+        cache=make_cache(nlp, args),
+    )
+    print(f"Serving {nlp.pipe_names} on http://{args.host}:{args.port}/annotate", file=sys.stderr)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m spacy_rup", description="Aromanian NLP tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    annotate = commands.add_parser("annotate", help="Annotate a text file (one doc per line) into DocBin shards.")
+    annotate.add_argument("input", help="Input text file, or - for stdin")
+    annotate.add_argument("--model", default="pos,ner", help=f"Comma-separated, from: {', '.join(MODEL_COMPONENTS)}")
+    annotate.add_argument("--pipeline", default=",".join(DEFAULT_MODEL), help="Packaged pipelines or paths to load the models from, comma-separated")
+    annotate.add_argument("--output", "-o", help="Output directory (default: <input>.spacy)")
+    annotate.add_argument("--n-process", type=int, default=1)
+    annotate.add_argument("--batch-size", type=int, default=256)
+    annotate.add_argument("--shard-size", type=int, default=10000, help="Docs per DocBin shard")
+    annotate.add_argument("--report-every", type=int, default=50000, help="Print docs/sec every N docs (0: off)")
+    annotate.set_defaults(func=annotate_command)
+
+    stream = commands.add_parser("stream", help="Annotate plain text or JSONL into JSONL, in input order.")
+    stream.add_argument("input", nargs="?", default="-", help="Input file, or - for stdin (default)")
+    stream.add_argument("--output", "-o", default="-", help="Output file, or - for stdout (default)")
+    stream.add_argument("--model", default="pos,ner,lemma", help=f"Comma-separated, from: {', '.join(MODEL_COMPONENTS)}")
+    stream.add_argument("--pipeline", default=",".join(DEFAULT_MODEL), help="Packaged pipelines or paths to load the models from, comma-separated")
+    stream.add_argument("--format", choices=["auto", "jsonl", "text"], default="auto")
+    stream.add_argument("--text-key", default="text", help="Field holding the text in JSONL input")
+    stream.add_argument("--keep-text", action="store_true", help="Copy the input text to the output")
+    stream.add_argument("--workers", type=int, default=1, help="Worker processes")
+    stream.add_argument("--batch-size", type=int, default=256)
+    stream.add_argument("--queue-size", type=int, default=8, help="Batches read but not yet written, at most")
+    stream.set_defaults(func=stream_command)
+
+    serve = commands.add_parser("serve", help="Serve POST /annotate over HTTP, micro-batching concurrent requests.")
+    serve.add_argument("--model", default="pos,ner,lemma", help=f"Comma-separated, from: {', '.join(MODEL_COMPONENTS)}")
+    serve.add_argument("--pipeline", default=",".join(DEFAULT_MODEL), help="Packaged pipelines or paths to load the models from, comma-separated")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    serve.add_argument("--max-batch-size", type=int, default=32, help="Requests per nlp.pipe batch at most")
+    serve.add_argument("--max-latency-ms", type=float, default=5.0, help="Time a batch waits to fill after its first request")
+    serve.add_argument("--queue-depth", type=int, default=1024, help="Waiting requests at most; more get 503")
+    serve.add_argument("--workers", type=int, default=1, help="Pre-forked server processes sharing the loaded models")
+    serve.add_argument("--cache-size", type=int, default=0, help="Results of repeated texts kept in memory per worker (0: off)")
+    serve.add_argument("--cache-path", help="Shared disk cache: a .sqlite file or a directory")
+    serve.set_defaults(func=serve_command)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Bulk annotation of plain-text files into DocBin shards.
+
+`annotate_to_docbin` streams the input through `nlp.pipe` (optionally across
+processes) and writes every `shard_size` docs to a numbered `.spacy` file,
+so memory stays constant however long the input is. An `index.jsonl` file
+gets one line per shard with the input line numbers it covers:
+
+    {"shard": "shard-00000.spacy", "first_line": 0, "docs": 10000, "tokens": 143211}
+
+The command line front end is `python -m spacy_rup annotate`.
+
+Usage:
+    nlp = spacy_rup.load(components=pipeline_components(["pos", "ner"]))
+    stats = annotate_to_docbin(nlp, read_lines("input.txt"), "input.spacy", n_process=4)
+"""
+
+import itertools
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import srsly
+from spacy.language import Language
+from spacy.tokens import DocBin
+
+
+# --model names and the pipeline components they need
+MODEL_COMPONENTS = {
+    "pos": ["tagger", "aromanian_pos_lookup"],
+    "ner": ["ner"],
+    "senter": ["aromanian_senter"],
+    "lemma": ["aromanian_lemmatizer"],
+    "clitics": ["aromanian_clitic_splitter"],
+}
+
+INDEX_FILE = "index.jsonl"
+
+
+def pipeline_components(models: Iterable[str]) -> List[str]:
+    """The `spacy_rup.load` components for a list of --model names."""
+    components = []
+    for model in models:
+        if model not in MODEL_COMPONENTS:
+            raise ValueError(f"Unknown model '{model}'; choose from {', '.join(MODEL_COMPONENTS)}")
+        components.extend(name for name in MODEL_COMPONENTS[model] if name not in components)
+    return components
+
+
+def read_lines(path: Union[str, Path]) -> Iterator[Tuple[int, str]]:
+    """Yield (line number, text) for the non-empty lines of a file, or stdin for "-"."""
+    f = sys.stdin if str(path) == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for number, line in enumerate(f):
+            line = line.strip()
+            if line:
+                yield number, line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def annotate_to_docbin(
+    nlp: Language,
+    lines: Iterable[Tuple[int, str]],
+    output_dir: Union[str, Path],
+    shard_size: int = 10000,
+    n_process: int = 1,
+    batch_size: int = 256,
+    report_every: Optional[int] = 50000,
+) -> Dict:
+    """Annotate (line number, text) pairs and write DocBin shards.
+
+    Args:
+        nlp: The pipeline
+        lines: (line number, text) pairs, e.g. from `read_lines`
+        output_dir: Directory for the shards and `index.jsonl`
+        shard_size: Docs per shard
+        n_process: Processes for `nlp.pipe`
+        batch_size: Docs per `nlp.pipe` batch
+        report_every: Print docs/sec to stderr after this many docs
+
+    Returns:
+        Totals: docs, tokens, shards and seconds
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    index_path = output_dir / INDEX_FILE
+    index_path.write_text("", encoding="utf-8")
+
+    # nlp.pipe keeps the input order, so the line numbers can be zipped back.
+    lines, numbers = itertools.tee(lines)
+    numbers = (number for number, _ in numbers)
+    docs = nlp.pipe((text for _, text in lines), n_process=n_process, batch_size=batch_size)
+
+    start = time.perf_counter()
+    n_docs = n_tokens = n_shards = 0
+    shard, shard_tokens, first_line = DocBin(), 0, None
+    for number, doc in zip(numbers, docs):
+        if first_line is None:
+            first_line = number
+        shard.add(doc)
+        shard_tokens += len(doc)
+        n_docs += 1
+        if len(shard) == shard_size:
+            _write_shard(shard, output_dir, index_path, n_shards, first_line, shard_tokens)
+            n_tokens += shard_tokens
+            n_shards += 1
+            shard, shard_tokens, first_line = DocBin(), 0, None
+        if report_every and n_docs % report_every == 0:
+            elapsed = time.perf_counter() - start
+            print(f"{n_docs} docs, {n_docs / elapsed:.0f} docs/sec", file=sys.stderr)
+    if len(shard):
+        _write_shard(shard, output_dir, index_path, n_shards, first_line, shard_tokens)
+        n_tokens += shard_tokens
+        n_shards += 1
+    return {"docs": n_docs, "tokens": n_tokens, "shards": n_shards, "seconds": time.perf_counter() - start}
+
+
+def _write_shard(shard: DocBin, output_dir: Path, index_path: Path, number: int, first_line: int, tokens: int):
+    name = f"shard-{number:05d}.spacy"
+    shard.to_disk(output_dir / name)
+    entry = {"shard": name, "first_line": first_line, "docs": len(shard), "tokens": tokens}
+    with open(index_path, "a", encoding="utf-8") as f:
+        f.write(srsly.json_dumps(entry) + "\n")
+
+
+def read_index(output_dir: Union[str, Path]) -> List[Dict]:
+    """The shard entries of an annotation directory."""
+    return list(srsly.read_jsonl(Path(output_dir) / INDEX_FILE))
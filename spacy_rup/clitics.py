@@ -0,0 +1,189 @@
+"""
+Generic clitic splitting for Aromanian.
+
+The tokenizer splits clitics through special cases: every full string
+(`s-veadã`, `shi-lji`, ...) is listed in `_contractions`. That only covers
+the listed verbs. The `aromanian_clitic_splitter` component applies the same
+conventions to any `<clitic>-<host>` or `<host>-<clitic>` word:
+
+- proclitics that keep the hyphen (`s-`, `sh-`, `d-`, `n-`, `dintr-`):
+  `s-featsirã` -> `s-` `featsirã`
+- hosts and enclitics separated from the hyphen (`shi`, `nu`, `-lji`, ...):
+  `nu-avu` -> `nu` `-` `avu`
+- words listed whole in the tokenizer exceptions (`mã-sa`, `d-lu`) and
+  all other hyphenated words are left alone.
+
+The clitic sets are expanded to every orthographic variant once, at import
+(the words kept whole on first use, from the tokenizer exceptions), so each
+word is decided by set lookups in a single scan over its hyphens.
+Decisions are cached per word.
+
+Usage:
+    nlp = Aromanian()
+    nlp.add_pipe("aromanian_clitic_splitter", first=True)
+"""
+
+import re
+from functools import lru_cache
+from typing import FrozenSet, Tuple
+
+from spacy.attrs import ORTH, SPACY
+from spacy.language import Language
+from spacy.tokens import Doc
+
+from . import tokenizer_exceptions
+from .tokenizer_exceptions import _orth_variants
+
+
+# Proclitics that keep the hyphen: s-veadã -> s- veadã
+_PROCLITICS = ["s", "sh", "d", "n", "dintr"]
+
+# Hosts split from a following hyphen: shi-lji -> shi - lji
+_HOSTS = ["shi", "si", "nu", "lji", "va", "tse", "de", "du"]
+
+# Pronominal enclitics split from a preceding hyphen: du-te -> du - te
+_ENCLITICS = ["lji", "li", "lu", "l", "u", "a", "i", "nji", "mi", "ti", "te", "shi", "nã", "vã", "lã"]
+
+
+def _variant_set(words):
+    return frozenset(variant.lower() for word in words for variant in _orth_variants(word))
+
+
+PROCLITICS = _variant_set(_PROCLITICS)
+HOSTS = _variant_set(_HOSTS)
+ENCLITICS = _variant_set(_ENCLITICS)
+
+
+@lru_cache(maxsize=None)
+def keep_whole() -> FrozenSet[str]:
+    """Hyphenated words the tokenizer keeps as one token (mã-sa, d-lu, 1-a)."""
+    return frozenset(
+        orth.lower()
+        for orth, pieces in tokenizer_exceptions.TOKENIZER_EXCEPTIONS.items()
+        if "-" in orth and len(pieces) == 1
+    )
+
+
+_WORDLIKE = re.compile(r"[\w'’-]+").fullmatch
+
+
+@lru_cache(maxsize=65536)
+def split_clitics(tokens: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Resplit the tokens of one hyphenated word at its clitic boundaries.
+
+    Args:
+        tokens: The tokens the tokenizer produced for the word (no
+            whitespace between them), e.g. ("shi-", "avea")
+
+    Returns:
+        The new tokens. Boundaries at hyphens that no clitic rule covers
+        are kept as the tokenizer produced them.
+    """
+    word = "".join(tokens)
+    if word.lower() in keep_whole():
+        return (word,)
+    if word[0].isdigit():
+        return tokens
+
+    boundaries = set()
+    position = 0
+    for token in tokens[:-1]:
+        position += len(token)
+        boundaries.add(position)
+
+    segments = word.split("-")
+    position = 0
+    for left, right in zip(segments, segments[1:]):
+        hyphen = position + len(left)
+        position = hyphen + 1
+        if not left or not right:
+            continue
+        split_at = None
+        if left.lower() in PROCLITICS:
+            split_at = {hyphen + 1}
+            boundaries.discard(hyphen)
+        elif left.lower() in HOSTS or right.lower() in ENCLITICS:
+            split_at = {hyphen, hyphen + 1}
+        if split_at:
+            # Clitic and host stay whole (s-l'ea -> s- l'ea, not s- l ' ea).
+            segment_start = hyphen - len(left)
+            boundaries.difference_update(range(segment_start + 1, hyphen))
+            boundaries.difference_update(range(hyphen + 2, position + len(right)))
+            boundaries.update(split_at)
+
+    cuts = [0] + sorted(boundaries) + [len(word)]
+    return tuple(word[start:end] for start, end in zip(cuts, cuts[1:]))
+
+
+@Language.factory("aromanian_clitic_splitter", assigns=["token.orth"])
+def create_clitic_splitter(nlp: Language, name: str):
+    """Create a component that splits clitics off hyphenated words."""
+    return CliticSplitter(name=name)
+
+
+class CliticSplitter:
+    """Retokenize `<clitic>-<host>` and `<host>-<clitic>` words.
+
+    Runs right after the tokenizer. A word is a run of word-like tokens
+    with no whitespace between them that contains a hyphen.
+    """
+
+    def __init__(self, name: str = "aromanian_clitic_splitter"):
+        self.name = name
+        # ORTH ID -> 0 (not word-like), 1 (word-like) or 2 (word-like with a hyphen)
+        self._kinds = {}
+
+    def __call__(self, doc: Doc) -> Doc:
+        changes = []
+        for tokens, start, end in self._hyphenated_words(doc):
+            pieces = split_clitics(tokens)
+            if pieces != tokens:
+                changes.append((start, end, pieces))
+        if not changes:
+            return doc
+
+        # Merge each word into one token, then split it at the new boundaries.
+        with doc.retokenize() as retokenizer:
+            for start, end, _ in changes:
+                if end - start > 1:
+                    retokenizer.merge(doc[start:end])
+        with doc.retokenize() as retokenizer:
+            shift = 0
+            for start, end, pieces in changes:
+                token = doc[start - shift]
+                shift += end - start - 1
+                if len(pieces) > 1:
+                    retokenizer.split(token, list(pieces), heads=[(token, 0)] * len(pieces))
+        return doc
+
+    def _hyphenated_words(self, doc: Doc):
+        """Yield (tokens, start, end) for each word that contains a hyphen.
+
+        Scans the ORTH and SPACY columns instead of creating Token objects;
+        whether a string is word-like or hyphenated is cached per ORTH ID.
+        """
+        array = doc.to_array([ORTH, SPACY]).tolist()
+        strings = doc.vocab.strings
+        kinds = self._kinds
+        kind_of = []
+        for orth, _ in array:
+            kind = kinds.get(orth)
+            if kind is None:
+                text = strings[orth]
+                kind = kinds[orth] = (2 if "-" in text else 1) if _WORDLIKE(text) else 0
+            kind_of.append(kind)
+
+        n_tokens = len(array)
+        i = 0
+        while i < n_tokens:
+            if kind_of[i] != 2:
+                i += 1
+                continue
+            start = end = i
+            while start > 0 and kind_of[start - 1] and not array[start - 1][1]:
+                start -= 1
+            while end + 1 < n_tokens and kind_of[end + 1] and not array[end][1]:
+                end += 1
+            end += 1
+            yield tuple(strings[array[j][0]] for j in range(start, end)), start, end
+            i = end
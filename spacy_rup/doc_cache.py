@@ -0,0 +1,389 @@
+"""
+Result cache for repeated texts.
+
+`DocCache` wraps a pipeline and remembers the serialized `Doc` of every
+text it annotated, keyed by a hash of the text and a fingerprint of the
+pipeline (its config, component names and weights, tokenizer, the
+spacy_rup version, rule modules and data files, and any lemma lexicon), so
+a retrained or reconfigured pipeline, or one with edited rules, never gets
+another one's results. A repeated text
+then costs a `Doc.from_bytes` instead of a forward pass.
+
+Two tiers:
+
+- memory: an LRU of the last `max_entries` results, per process;
+- disk (optional): a SQLite file (`path` ending in `.sqlite`/`.db`) or a
+  directory with one file per result. Both can be shared by several
+  processes, e.g. pre-forked server workers: SQLite locks its writes, and
+  files are written to a temporary name and renamed into place.
+
+Hits on either tier return a fresh `Doc` every time, so callers can change
+it freely. Tensors are not stored; see `encode_doc` for the format.
+
+Usage:
+    cache = DocCache(spacy_rup.load(), max_entries=50000, path="rup-cache.sqlite")
+    docs = list(cache.pipe(texts))
+    cache.stats()  # {"memory_hits": ..., "disk_hits": ..., "misses": ..., "hit_ratio": ...}
+"""
+
+import functools
+import hashlib
+import importlib
+import os
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+import numpy
+import srsly
+from spacy.language import Language
+from spacy.tokens import Doc
+from spacy.vocab import Vocab
+
+from .loader import resource_path
+
+try:
+    from importlib.metadata import PackageNotFoundError, version
+except ImportError:  # Python 3.7
+    version = None
+
+# What is left out of the stored docs
+EXCLUDE = ["tensor"]
+
+# Token columns of the compact format: those of DocBin
+ATTRS = ("ORTH", "NORM", "TAG", "HEAD", "DEP", "ENT_IOB", "ENT_TYPE", "ENT_KB_ID", "ENT_ID", "LEMMA", "MORPH", "POS", "SENT_START")
+
+# First byte of a stored result
+COMPACT = b"A"
+FULL = b"D"
+
+# Modules whose rules decide tokens and annotations without being
+# serialized by any component
+RULE_MODULES = (
+    "clitics",
+    "lemma_component",
+    "lemmatizer",
+    "lex_attrs",
+    "lexeme_table",
+    "numbers",
+    "orthography",
+    "pos_lookup",
+    "punctuation",
+    "senter",
+    "stop_words",
+    "tokenizer",
+    "tokenizer_exceptions",
+)
+
+def encode_doc(doc: Doc) -> bytes:
+    """Serialize `doc` for the cache.
+
+    Docs without user data, categories or span groups, which is what the
+    rup pipelines produce, are stored as one token array plus the strings
+    it refers to, as in a DocBin. `Doc.to_bytes` goes through
+    `srsly.msgpack_loads`, which looks up the registered decoders on
+    every call; for short docs that takes longer than the rest of the
+    deserialization. Other docs are stored with `Doc.to_bytes`.
+    """
+    if doc.user_data or doc.cats or doc.spans or doc.has_unknown_spaces:
+        return FULL + doc.to_bytes(exclude=EXCLUDE)
+    array = doc.to_array(ATTRS)
+    strings = set()
+    for token in doc:
+        strings.update((token.text, token.norm_, token.tag_, token.dep_, token.ent_type_, token.ent_kb_id_, token.ent_id_, token.lemma_, str(token.morph)))
+    spaces = bytes(bool(token.whitespace_) for token in doc)
+    return COMPACT + srsly.msgpack.packb([len(doc), array.tobytes(), spaces, sorted(strings)], use_bin_type=True)
+
+
+def decode_doc(vocab: Vocab, data: bytes) -> Doc:
+    """A new `Doc` from `encode_doc` output."""
+    if data[:1] == FULL:
+        return Doc(vocab).from_bytes(data[1:])
+    # An object_pairs_hook skips the decoder registry lookup of srsly.
+    n_tokens, body, spaces, strings = srsly.msgpack.unpackb(data[1:], raw=False, object_pairs_hook=dict)
+    for string in strings:
+        vocab.strings.add(string)
+    if not n_tokens:
+        return Doc(vocab, words=[])
+    array = numpy.frombuffer(body, dtype="uint64").reshape(n_tokens, len(ATTRS)).copy()
+    doc = Doc(vocab, words=[vocab.strings[orth] for orth in array[:, 0]], spaces=[bool(space) for space in spaces])
+    return doc.from_array(ATTRS, array)
+
+
+def package_version() -> str:
+    """Installed version of spacy-rup ("unknown" when run from a source tree)."""
+    if version is None:
+        return "unknown"
+    try:
+        return version("spacy-rup")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+@functools.lru_cache(maxsize=None)
+def rules_fingerprint() -> str:
+    """Hash of the rule modules and the data files in `resources/`.
+
+    The rule components (lemmatizer, senter, clitic splitter) and the
+    lexeme tables serialize nothing, so their code and data are hashed
+    instead. Computed once per process.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for name in RULE_MODULES:
+        module = importlib.import_module(f"{__package__}.{name}")
+        digest.update(name.encode("utf-8"))
+        digest.update(Path(module.__file__).read_bytes())
+    for path in sorted(resource_path().iterdir()):
+        if path.is_file():
+            digest.update(path.name.encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _file_digest(path: Path) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def pipeline_fingerprint(nlp: Language) -> str:
+    """Hash of everything that decides the annotations of `nlp`.
+
+    That is the config, the component names, the serialized tokenizer and
+    components, the spacy_rup version, the rule modules and data files
+    (`rules_fingerprint`) and the lexicon file of a lemmatizer that has one.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(nlp.config.to_str().encode("utf-8"))
+    digest.update(repr(nlp.pipe_names).encode("utf-8"))
+    digest.update(package_version().encode("utf-8"))
+    digest.update(rules_fingerprint().encode("ascii"))
+    digest.update(nlp.tokenizer.to_bytes(exclude=["vocab"]))
+    for name, component in nlp.pipeline:
+        if hasattr(component, "to_bytes"):
+            try:
+                digest.update(component.to_bytes(exclude=["vocab"]))
+            except Exception:
+                # Unserializable components are covered by the config only.
+                digest.update(name.encode("utf-8"))
+        lexicon = getattr(component, "lexicon_path", None)
+        if lexicon is not None:
+            digest.update(_file_digest(lexicon))
+    return digest.hexdigest()
+
+
+class SqliteTier:
+    """Disk tier in one SQLite file, shared between processes."""
+
+    def __init__(self, path: Union[str, Path], timeout: float = 30.0):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._connection = None
+        self._pid = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection must not cross a fork: reopen in every process.
+        if self._connection is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.path), timeout=self.timeout, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS docs (key TEXT PRIMARY KEY, data BLOB NOT NULL)")
+            connection.commit()
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        connection = self._connect()
+        found = {}
+        # SQLite allows 999 parameters per statement in older versions.
+        for start in range(0, len(keys), 900):
+            chunk = keys[start:start + 900]
+            rows = connection.execute(
+                f"SELECT key, data FROM docs WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update(rows)
+        return found
+
+    def put_many(self, items: Dict[str, bytes]) -> None:
+        if not items:
+            return
+        connection = self._connect()
+        with connection:
+            connection.executemany("INSERT OR IGNORE INTO docs (key, data) VALUES (?, ?)", items.items())
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def close(self) -> None:
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+
+class DirectoryTier:
+    """Disk tier with one file per result, `<path>/<key[:2]>/<key>.doc`."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    def _file(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}.doc"
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        found = {}
+        for key in keys:
+            try:
+                found[key] = self._file(key).read_bytes()
+            except FileNotFoundError:
+                pass
+        return found
+
+    def put_many(self, items: Dict[str, bytes]) -> None:
+        for key, data in items.items():
+            path = self._file(key)
+            if path.exists():
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Readers in other processes see the whole file or none.
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.path.glob("*/*.doc"))
+
+    def close(self) -> None:
+        pass
+
+
+def open_tier(path: Union[str, Path]):
+    """SQLite tier for `.sqlite`/`.db` paths, directory tier otherwise."""
+    if Path(path).suffix in (".sqlite", ".sqlite3", ".db"):
+        return SqliteTier(path)
+    return DirectoryTier(path)
+
+
+class DocCache:
+    """Annotate through `nlp`, reusing the results of texts seen before.
+
+    Args:
+        nlp: The pipeline
+        max_entries: Results kept in memory (0: no memory tier)
+        path: Disk tier, see `open_tier` (None: no disk tier)
+    """
+
+    def __init__(self, nlp: Language, max_entries: int = 10000, path: Optional[Union[str, Path]] = None):
+        self.nlp = nlp
+        self.max_entries = max_entries
+        self.disk = open_tier(path) if path is not None else None
+        self.fingerprint = pipeline_fingerprint(nlp)
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    @property
+    def pipe_names(self) -> List[str]:
+        return self.nlp.pipe_names
+
+    def key(self, text: str) -> str:
+        digest = hashlib.blake2b(self.fingerprint.encode("ascii"), digest_size=16)
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, keys: Iterable[str]) -> Tuple[Dict[str, bytes], Set[str]]:
+        """Stored results of `keys`, memory first, then disk; and the keys found on disk."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                data = self._memory.get(key)
+                if data is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = data
+        from_disk = {}
+        if self.disk is not None:
+            missing = [key for key in keys if key not in found]
+            if missing:
+                from_disk = self.disk.get_many(missing)
+                for key, data in from_disk.items():
+                    self._remember(key, data)
+                found.update(from_disk)
+        return found, set(from_disk)
+
+    def __call__(self, text: str) -> Doc:
+        return next(self.pipe([text]))
+
+    def pipe(self, texts: Iterable[str], batch_size: int = 256) -> Iterator[Doc]:
+        """Docs for `texts`, in order; only texts without a stored result go through `nlp`."""
+        texts = iter(texts)
+        while True:
+            batch = [text for _, text in zip(range(batch_size), texts)]
+            if not batch:
+                return
+            yield from self._pipe_batch(batch, batch_size)
+
+    def _pipe_batch(self, texts: List[str], batch_size: int) -> List[Doc]:
+        keys = [self.key(text) for text in texts]
+        found, on_disk = self._lookup(dict.fromkeys(keys))
+        # Duplicates inside the batch are annotated once.
+        todo = {key: text for key, text in zip(keys, texts) if key not in found}
+        # Per text: its first occurrence is a disk hit or a miss if it
+        # was not in memory; any repeat is served from memory.
+        disk_hits = len(on_disk)
+        with self._lock:
+            self.counts["misses"] += len(todo)
+            self.counts["disk_hits"] += disk_hits
+            self.counts["memory_hits"] += len(keys) - len(todo) - disk_hits
+        docs, new = {}, {}
+        if todo:
+            for key, doc in zip(todo, self.nlp.pipe(todo.values(), batch_size=batch_size)):
+                data = encode_doc(doc)
+                new[key] = data
+                docs[key] = doc
+                self._remember(key, data)
+            if self.disk is not None:
+                self.disk.put_many(new)
+        vocab = self.nlp.vocab
+        result = []
+        for key in keys:
+            doc = docs.pop(key, None)
+            if doc is None:
+                # Stored before, or a repeat of a text annotated in this batch
+                data = found[key] if key in found else new[key]
+                doc = decode_doc(vocab, data)
+            result.append(doc)
+        return result
+
+    def stats(self) -> Dict:
+        """Hit counts and ratios since the cache was created."""
+        counts = dict(self.counts)
+        total = counts["memory_hits"] + counts["disk_hits"] + counts["misses"]
+        counts["lookups"] = total
+        counts["hit_ratio"] = (counts["memory_hits"] + counts["disk_hits"]) / total if total else 0.0
+        counts["memory_hit_ratio"] = counts["memory_hits"] / total if total else 0.0
+        counts["memory_entries"] = len(self._memory)
+        return counts
+
+    def clear(self) -> None:
+        """Empty the memory tier (the disk tier is left alone)."""
+        with self._lock:
+            self._memory.clear()
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
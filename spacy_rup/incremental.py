@@ -0,0 +1,313 @@
+"""
+Incremental re-annotation of edited documents.
+
+An editor saves a long text again and again with small changes; running
+the whole text through the pipeline each time costs the same for a typo
+as for a new document. `IncrementalAnnotator` keeps the token annotations
+of the last text it saw and, for the next version, redoes only the part
+around what changed:
+
+- the text is cut into blocks after each run of whitespace that holds a
+  newline. `aromanian_senter` always starts a sentence after a newline,
+  and the tokenizer never joins whitespace with the text after it, so
+  blocks tokenize and segment the same alone as in the whole text;
+- the new text is compared with the old one (common prefix and suffix),
+  and only the blocks around the changed characters are split again
+  into sentences, by `aromanian_senter`;
+- sentences are keyed by a stable hash of their text; only those not
+  annotated before go through `nlp.pipe`;
+- their token rows replace those of the old blocks in the stored token
+  array.
+
+`update` does just that, in time that grows with the edit (plus a memcmp
+of the two texts and a memcpy of the token array). `to_doc` builds a
+spaCy Doc from the stored array, with character offsets, entities and
+sentence boundaries matching the new text; that costs time linear in the
+tokens it covers, so an editor that only needs the changed part can ask
+for the rows in `last_update["changed_tokens"]`. `annotate` does both.
+
+Each sentence is annotated as its own Doc, so the tok2vec and NER of the
+pipeline do not see across sentence boundaries; near a boundary the
+result can differ from annotating the whole text in one Doc.
+
+The merged Doc carries the DocBin token columns (tags, POS, lemmas, morph,
+entities, sentence starts); user data, cats, span groups and tensors of
+the sentence Docs are not kept.
+
+Usage:
+    annotator = IncrementalAnnotator(spacy_rup.load())
+    doc = annotator.annotate(text)
+    doc = annotator.annotate(edited_text)  # only the changed sentences are annotated
+    annotator.last_update  # {"blocks": 3, "sentences": 9, "annotated": 1, "changed_tokens": (812, 1040), ...}
+    changed = annotator.to_doc(*annotator.last_update["changed_tokens"])
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy
+from spacy.language import Language
+from spacy.tokens import Doc
+
+from .doc_cache import ATTRS
+from .senter import AromanianSenter
+
+# A block ends after whitespace that contains a newline, before the next non-space.
+_BLOCK_END = re.compile(r"\s*\n\s*(?=\S)")
+
+_SENT_START = ATTRS.index("SENT_START")
+
+
+def sentence_hash(text: str) -> bytes:
+    """Stable hash of a sentence or block text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def split_blocks(text: str) -> List[str]:
+    """Cut `text` after every whitespace run with a newline; the blocks join back to `text`."""
+    if not text:
+        return []
+    bounds = [0] + [match.end() for match in _BLOCK_END.finditer(text)]
+    return [text[start:end] for start, end in zip(bounds, bounds[1:] + [len(text)])]
+
+
+def common_prefix(a: str, b: str, chunk: int = 4096) -> int:
+    """Length of the common prefix of `a` and `b`, compared a chunk at a time."""
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i:i + chunk] == b[i:i + chunk]:
+        i += chunk
+    if i >= n:
+        return n
+    low, high = i, min(i + chunk, n)
+    # a[:low] == b[:low] and the chunk at `i` differs: bisect inside it.
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def common_suffix(a: str, b: str, limit: int, chunk: int = 4096) -> int:
+    """Length of the common suffix of `a` and `b`, at most `limit`."""
+    n = min(len(a), len(b), limit)
+    i = 0
+    while i < n and a[len(a) - min(i + chunk, n):len(a) - i] == b[len(b) - min(i + chunk, n):len(b) - i]:
+        i = min(i + chunk, n)
+    if i >= n:
+        return n
+    low, high = i, min(i + chunk, n)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:len(a) - low] == b[len(b) - middle:len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class IncrementalAnnotator:
+    """Annotate successive versions of a text, redoing only the changed part.
+
+    The annotator follows one document: each `update` is compared with the
+    previous one. Switching between documents works, but then most blocks
+    count as changed (their sentences still come from the cache).
+
+    Args:
+        nlp: The pipeline
+        max_sentences: Block splits and annotated sentences kept (LRU)
+    """
+
+    def __init__(self, nlp: Language, max_sentences: int = 100000):
+        self.nlp = nlp
+        self.max_sentences = max_sentences
+        self.senter = AromanianSenter()
+        # block hash -> [(sentence hash, sentence length)]
+        self._blocks: "OrderedDict[bytes, List[Tuple[bytes, int]]]" = OrderedDict()
+        # sentence hash -> (token array with the ATTRS columns, spaces)
+        self._sentences: "OrderedDict[bytes, Tuple[numpy.ndarray, numpy.ndarray]]" = OrderedDict()
+        self.last_update: Dict = {}
+        self._reset()
+
+    def _reset(self) -> None:
+        # The current text, its blocks (start offset, token count) and tokens
+        self.text = ""
+        self._block_starts = numpy.zeros(0, dtype="int64")
+        self._block_tokens = numpy.zeros(0, dtype="int64")
+        self._array = numpy.zeros((0, len(ATTRS)), dtype="uint64")
+        self._spaces = numpy.zeros(0, dtype=bool)
+
+    def _remember(self, table: OrderedDict, key: bytes, value) -> None:
+        table[key] = value
+        while len(table) > self.max_sentences:
+            table.popitem(last=False)
+
+    def split(self, block: str) -> List[Tuple[bytes, str]]:
+        """(hash, text) of the sentences of a block, in order; they join back to `block`."""
+        key = sentence_hash(block)
+        split = self._blocks.get(key)
+        if split is None:
+            doc = self.nlp.make_doc(block)
+            offsets = [doc[i].idx for i in self.senter.sentence_starts(doc)] if len(doc) else []
+            if not offsets or offsets[0] != 0:
+                offsets.insert(0, 0)
+            pieces = [block[start:end] for start, end in zip(offsets, offsets[1:] + [len(block)])]
+            split = [(sentence_hash(piece), len(piece)) for piece in pieces]
+            self._remember(self._blocks, key, split)
+        else:
+            self._blocks.move_to_end(key)
+        sentences = []
+        position = 0
+        for sentence_key, length in split:
+            sentences.append((sentence_key, block[position:position + length]))
+            position += length
+        return sentences
+
+    def _annotate(self, sentences: Dict[bytes, str]) -> Dict[bytes, Tuple[numpy.ndarray, numpy.ndarray]]:
+        """Annotate sentences not seen before; returns their token arrays and spaces."""
+        annotated = {}
+        for key, doc in zip(sentences, self.nlp.pipe(sentences.values())):
+            array = doc.to_array(ATTRS)
+            if len(doc):
+                # Each piece is one sentence, whatever the pipeline set.
+                array[:, _SENT_START] = numpy.array(-1, dtype="int64").view("uint64")
+                array[0, _SENT_START] = 1
+            spaces = numpy.array([bool(token.whitespace_) for token in doc], dtype=bool)
+            annotated[key] = (array, spaces)
+            self._remember(self._sentences, key, annotated[key])
+        return annotated
+
+    def _changed_blocks(self, text: str) -> Tuple[int, int, int, int]:
+        """Old blocks [first, last) to redo, and the new text range that replaces them.
+
+        The range starts at a block start before the first changed
+        character, so that boundary cannot move. It ends at the end of the
+        block after the one holding the first unchanged character after
+        the change: that block and the whitespace before its end are
+        untouched, so the boundary after it stays too.
+        """
+        old = self.text
+        n_blocks = len(self._block_starts)
+        if not n_blocks:
+            return 0, 0, 0, len(text)
+        prefix = common_prefix(old, text)
+        if prefix == len(old) == len(text):
+            return 0, 0, 0, 0
+        suffix = common_suffix(old, text, min(len(old), len(text)) - prefix)
+        old_end = len(old) - suffix
+        starts = self._block_starts
+        first = int(numpy.searchsorted(starts, max(prefix - 1, 0), side="right")) - 1
+        last = int(numpy.searchsorted(starts, min(old_end, len(old) - 1), side="right")) + 1
+        last = min(last, n_blocks)
+        start = int(starts[first])
+        end = int(starts[last]) if last < n_blocks else len(old)
+        return first, last, start, end + len(text) - len(old)
+
+    def update(self, text: str) -> Tuple[int, int]:
+        """Make `text` the current text, annotating only sentences not seen before.
+
+        Returns the token range of the current text that changed.
+        """
+        self.last_update = {}
+        start = time.perf_counter()
+        first, last, region_start, region_end = self._changed_blocks(text)
+        blocks = split_blocks(text[region_start:region_end])
+        sentences = [self.split(block) for block in blocks]
+        split_seconds = time.perf_counter() - start
+
+        step = time.perf_counter()
+        todo = {}
+        found = {}
+        n_sentences = 0
+        for block in sentences:
+            n_sentences += len(block)
+            for key, sentence in block:
+                part = self._sentences.get(key)
+                if part is not None:
+                    self._sentences.move_to_end(key)
+                    found[key] = part
+                else:
+                    todo[key] = sentence
+        if todo:
+            found.update(self._annotate(todo))
+        annotate_seconds = time.perf_counter() - step
+
+        step = time.perf_counter()
+        # Token rows of the new blocks
+        parts = [found[key] for block in sentences for key, _ in block]
+        if parts:
+            rows = numpy.concatenate([part[0] for part in parts])
+            spaces = numpy.concatenate([part[1] for part in parts])
+        else:
+            rows, spaces = self._array[:0], self._spaces[:0]
+        block_tokens = numpy.array(
+            [sum(len(found[key][0]) for key, _ in block) for block in sentences], dtype="int64"
+        )
+        block_starts = numpy.cumsum([region_start] + [len(block) for block in blocks[:-1]], dtype="int64")[:len(blocks)]
+        # Splice them in place of the old blocks [first, last)
+        token_start = int(self._block_tokens[:first].sum())
+        token_end = token_start + int(self._block_tokens[first:last].sum())
+        shift = len(text) - len(self.text)
+        self._array = numpy.concatenate([self._array[:token_start], rows, self._array[token_end:]])
+        self._spaces = numpy.concatenate([self._spaces[:token_start], spaces, self._spaces[token_end:]])
+        self._block_starts = numpy.concatenate(
+            [self._block_starts[:first], block_starts, self._block_starts[last:] + shift]
+        )
+        self._block_tokens = numpy.concatenate([self._block_tokens[:first], block_tokens, self._block_tokens[last:]])
+        self.text = text
+        splice_seconds = time.perf_counter() - step
+
+        changed = (token_start, token_start + len(rows))
+        self.last_update.update(
+            blocks=len(blocks),
+            sentences=n_sentences,
+            reused=n_sentences - len(todo),
+            annotated=len(todo),
+            annotated_tokens=sum(len(found[key][0]) for key in todo),
+            tokens=len(self._array),
+            changed_chars=(region_start, region_end),
+            changed_tokens=changed,
+            seconds={"split": split_seconds, "annotate": annotate_seconds, "splice": splice_seconds},
+        )
+        return changed
+
+    def to_doc(self, start: int = 0, end: Optional[int] = None) -> Doc:
+        """A Doc of the tokens [start, end) of the current text (all by default).
+
+        Takes time linear in the tokens it covers. Offsets of a part start
+        at 0; add `last_update["changed_chars"][0]` for the changed part.
+        """
+        array = self._array[start:end]
+        if not len(array):
+            return Doc(self.nlp.vocab, words=[])
+        if start:
+            # A part starts a sentence, whatever its first token was.
+            array = array.copy()
+            array[0, _SENT_START] = 1
+        doc = Doc(self.nlp.vocab, words=array[:, 0], spaces=self._spaces[start:end].tolist())
+        # Columns no component set (HEAD and DEP without a parser) cost
+        # time in from_array for nothing.
+        used = array.any(axis=0)
+        used[0] = False
+        if used.any():
+            doc.from_array([attr for attr, keep in zip(ATTRS, used) if keep], array[:, used])
+        return doc
+
+    def annotate(self, text: str) -> Doc:
+        """`update` to `text`, then the Doc of the whole text."""
+        self.update(text)
+        step = time.perf_counter()
+        doc = self.to_doc()
+        self.last_update["seconds"]["doc"] = time.perf_counter() - step
+        return doc
+
+    def clear(self) -> None:
+        """Forget the current text and every cached split and sentence."""
+        self._blocks.clear()
+        self._sentences.clear()
+        self._reset()
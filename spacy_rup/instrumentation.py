@@ -0,0 +1,269 @@
+"""
+Opt-in latency and throughput metrics for the pipeline components.
+
+`instrument(nlp)` wraps the tokenizer and every component of `nlp` so that
+each call and each `pipe` pass is counted and timed; the wrappers delegate
+everything else to the component, so `nlp` runs as before.
+`spacy_rup.load` instruments every pipeline it creates when the
+`SPACY_RUP_INSTRUMENT` environment variable is set (to anything but "" or
+"0"); `stream` and the HTTP server also time orthography detection.
+
+Per stage the metrics are calls, docs, tokens, seconds and a latency
+histogram. A `__call__` is one observation of one doc. In `pipe`, the time
+a component spends producing each doc is observed, without the time spent
+waiting for the components before it; a batched component does its work
+while producing the first doc of a batch, so its histogram shows a few
+slow observations and many near zero. Docs annotated with `n_process > 1`
+are counted in the worker processes, not here.
+
+Usage:
+    nlp = spacy_rup.load()
+    metrics = spacy_rup.instrument(nlp)
+    docs = list(nlp.pipe(texts))
+    metrics.snapshot()        # {"tagger": {"calls": 0, "docs": 2115, "tokens": ..., "seconds": ...}, ...}
+    print(metrics.to_prometheus())
+"""
+
+import bisect
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional
+
+import srsly
+from spacy.language import Language
+
+ENV_VAR = "SPACY_RUP_INSTRUMENT"
+
+# Upper bounds of the latency histogram buckets, in seconds
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_metrics: "weakref.WeakKeyDictionary[Language, Metrics]" = weakref.WeakKeyDictionary()
+
+
+def enabled_by_env() -> bool:
+    return os.environ.get(ENV_VAR, "") not in ("", "0")
+
+
+class StageStats:
+    """Counters and latency histogram of one stage."""
+
+    __slots__ = ("calls", "docs", "tokens", "seconds", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.docs = 0
+        self.tokens = 0
+        self.seconds = 0.0
+        # One count per bucket plus one for slower observations
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds: float, docs: int = 1, tokens: int = 0) -> None:
+        self.docs += docs
+        self.tokens += tokens
+        self.seconds += seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def to_dict(self) -> Dict:
+        seconds = self.seconds
+        return {
+            "calls": self.calls,
+            "docs": self.docs,
+            "tokens": self.tokens,
+            "seconds": seconds,
+            "docs_per_second": self.docs / seconds if seconds else 0.0,
+            "tokens_per_second": self.tokens / seconds if seconds else 0.0,
+            "histogram": dict(zip([*map(str, BUCKETS), "+Inf"], self.buckets)),
+        }
+
+
+class Metrics:
+    """The stage statistics of one instrumented pipeline, by stage name."""
+
+    def __init__(self):
+        self.stages: Dict[str, StageStats] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def stage(self, name: str) -> StageStats:
+        stats = self.stages.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self.stages.setdefault(name, StageStats())
+        return stats
+
+    @contextmanager
+    def timed(self, name: str, docs: int = 1, tokens: int = 0):
+        """Time a block of code as one observation of stage `name`."""
+        stats = self.stage(name)
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.calls += 1
+            stats.observe(time.perf_counter() - start, docs, tokens)
+
+    def reset(self) -> None:
+        # In place: the wrappers keep references to their StageStats.
+        with self._lock:
+            for stats in self.stages.values():
+                stats.__init__()
+            self.started = time.time()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Stage statistics as plain dicts, in pipeline order."""
+        return {name: stats.to_dict() for name, stats in list(self.stages.items())}
+
+    def to_json(self) -> str:
+        return srsly.json_dumps({"since": self.started, "stages": self.snapshot()})
+
+    def to_prometheus(self, prefix: str = "spacy_rup") -> str:
+        """The snapshot in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for metric, key, help_text in (
+            ("calls_total", "calls", "Component __call__ invocations"),
+            ("docs_total", "docs", "Docs processed"),
+            ("tokens_total", "tokens", "Tokens processed"),
+            ("seconds_total", "seconds", "Time spent in the component"),
+        ):
+            name = f"{prefix}_component_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for stage, stats in snapshot.items():
+                lines.append(f'{name}{{component="{stage}"}} {stats[key]}')
+        name = f"{prefix}_component_latency_seconds"
+        lines.append(f"# HELP {name} Latency per doc (per produced doc in pipe)")
+        lines.append(f"# TYPE {name} histogram")
+        for stage, stats in snapshot.items():
+            total = 0
+            for bound, count in stats["histogram"].items():
+                total += count
+                lines.append(f'{name}_bucket{{component="{stage}",le="{bound}"}} {total}')
+            lines.append(f'{name}_sum{{component="{stage}"}} {stats["seconds"]}')
+            lines.append(f'{name}_count{{component="{stage}"}} {total}')
+        return "\n".join(lines) + "\n"
+
+
+class _TimedStream:
+    """Iterator that adds up the time spent getting items from `stream`."""
+
+    __slots__ = ("stream", "seconds")
+
+    def __init__(self, stream: Iterable):
+        self.stream = iter(stream)
+        self.seconds = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            return next(self.stream)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+def _unwrapped(component):
+    return component
+
+
+class InstrumentedComponent:
+    """Wraps a tokenizer or component; timing `__call__` and `pipe`, delegating the rest.
+
+    Pickling or copying gives the wrapped component itself, uninstrumented.
+    """
+
+    def __init__(self, component, stats: StageStats):
+        self.__dict__["_component"] = component
+        self.__dict__["_stats"] = stats
+
+    def __call__(self, doc, *args, **kwargs):
+        stats = self._stats
+        start = time.perf_counter()
+        doc = self._component(doc, *args, **kwargs)
+        stats.calls += 1
+        stats.observe(time.perf_counter() - start, 1, len(doc))
+        return doc
+
+    def pipe(self, stream, *args, **kwargs) -> Iterator:
+        stats = self._stats
+        component = self._component
+        if not hasattr(component, "pipe"):
+            for doc in stream:
+                yield self(doc)
+            return
+        upstream = _TimedStream(stream)
+        docs = component.pipe(upstream, *args, **kwargs)
+        while True:
+            start = time.perf_counter()
+            waited = upstream.seconds
+            try:
+                doc = next(docs)
+            except StopIteration:
+                return
+            stats.observe(time.perf_counter() - start - (upstream.seconds - waited), 1, len(doc))
+            yield doc
+
+    def __getattr__(self, name):
+        if name in ("_component", "_stats"):
+            # Not set yet (an instance being unpickled or copied)
+            raise AttributeError(name)
+        return getattr(self._component, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._component, name, value)
+
+    def __reduce__(self):
+        return _unwrapped, (self._component,)
+
+    def __repr__(self):
+        return f"<instrumented {self._component!r}>"
+
+
+def instrument(nlp: Language) -> Metrics:
+    """Wrap the tokenizer and components of `nlp` to record their metrics.
+
+    Instrumenting a pipeline twice returns its existing `Metrics`. Components
+    added later are not wrapped; call `instrument` again after adding them.
+    `nlp.get_pipe` returns the wrappers, which forward attribute access, but
+    `isinstance` checks on them fail; `uninstrument` restores the originals.
+    """
+    metrics = _metrics.get(nlp)
+    if metrics is None:
+        metrics = _metrics[nlp] = Metrics()
+    if not isinstance(nlp.tokenizer, InstrumentedComponent):
+        nlp.tokenizer = InstrumentedComponent(nlp.tokenizer, metrics.stage("tokenizer"))
+    for i, (name, component) in enumerate(nlp._components):
+        if not isinstance(component, InstrumentedComponent):
+            nlp._components[i] = (name, InstrumentedComponent(component, metrics.stage(name)))
+    return metrics
+
+
+def uninstrument(nlp: Language) -> None:
+    """Put the original tokenizer and components back."""
+    if isinstance(nlp.tokenizer, InstrumentedComponent):
+        nlp.tokenizer = nlp.tokenizer._component
+    for i, (name, component) in enumerate(nlp._components):
+        if isinstance(component, InstrumentedComponent):
+            nlp._components[i] = (name, component._component)
+    _metrics.pop(nlp, None)
+
+
+def get_metrics(nlp: Language) -> Optional[Metrics]:
+    """The `Metrics` of an instrumented pipeline, or None."""
+    return _metrics.get(nlp)
+
+
+@contextmanager
+def timed(nlp: Language, name: str, docs: int = 1, tokens: int = 0):
+    """`Metrics.timed` for an instrumented `nlp`; does nothing otherwise."""
+    metrics = _metrics.get(nlp)
+    if metrics is None:
+        yield None
+    else:
+        with metrics.timed(name, docs, tokens) as stats:
+            yield stats
@@ -1,9 +1,20 @@
 ﻿
 
+import shutil
+from pathlib import Path
+from typing import List, Optional
+
+import numpy
+import srsly
+from spacy.attrs import LEMMA, LOWER, POS
 from spacy.language import Language
 from spacy.tokens import Doc, Token
+from spacy.util import minibatch
 
 from .lemmatizer import lemmatize, VERB_LEMMAS, NOUN_LEMMAS, ADJ_LEMMAS
+from .lexeme_table import load_lexeme_tables
+from .lexicon import LemmaLexicon
+from .orthography import cunia_key
 
 if not Token.has_extension('lemma_'):
     pass
@@ -11,11 +22,16 @@ if not Token.has_extension('lemma_'):
 @Language.factory(
     'aromanian_lemmatizer',
     assigns=['token.lemma'],
-    default_config={'overwrite': False}
+    default_config={'overwrite': False, 'lexicon': None}
 )
-def create_aromanian_lemmatizer(nlp: Language, name: str, overwrite: bool):
-    '''Create an Aromanian lemmatizer component.'''
-    return AromanianLemmatizer(nlp, overwrite=overwrite)
+def create_aromanian_lemmatizer(nlp: Language, name: str, overwrite: bool, lexicon: Optional[str]):
+    '''Create an Aromanian lemmatizer component.
+    
+    `lexicon` is an optional path to a binary full-form lexicon written
+    with `spacy_rup.lexicon.write_lexicon`. It is memory-mapped on first
+    use and saved with the pipeline.
+    '''
+    return AromanianLemmatizer(nlp, overwrite=overwrite, lexicon=lexicon)
 
 
 class AromanianLemmatizer:
@@ -26,29 +42,116 @@ class AromanianLemmatizer:
     1. Direct lookup in pre-defined tables (for common irregular forms)
     2. Suffix-based rules for regular morphology
     3. POS-informed lemmatization when POS tags are available
+    
+    An external full-form lexicon, when configured, is consulted before
+    the built-in tables.
     '''
     
-    def __init__(self, nlp: Language, overwrite: bool = False):
+    def __init__(self, nlp: Language, overwrite: bool = False, lexicon: Optional[str] = None):
         self.nlp = nlp
         self.overwrite = overwrite
         self.name = 'aromanian_lemmatizer'
+        self.lexicon_path = Path(lexicon) if lexicon else None
+        self._lexicon = None
+    
+    @property
+    def lexicon(self) -> Optional[LemmaLexicon]:
+        '''The external lexicon, memory-mapped on first access.'''
+        if self._lexicon is None and self.lexicon_path is not None:
+            self._lexicon = LemmaLexicon.from_file(self.lexicon_path)
+        return self._lexicon
     
     def __call__(self, doc: Doc) -> Doc:
         '''Process a document, assigning lemmas to tokens.'''
-        for token in doc:
-            if token.lemma != 0 and not self.overwrite:
-                continue
-            
-            pos = token.pos_ if token.pos_ else None
-            lemma = lemmatize(token.text, pos)
-            token.lemma_ = lemma
-        
+        self._assign_lemmas([doc])
         return doc
     
+    def pipe(self, stream, batch_size: int = 128):
+        '''
+        Process a stream of documents in batches.
+        
+        The unique (lowercase form, POS) pairs of a whole batch are
+        lemmatized once and written back to every Doc in bulk.
+        '''
+        for docs in minibatch(stream, size=batch_size):
+            self._assign_lemmas(docs)
+            yield from docs
+    
+    def _assign_lemmas(self, docs: List[Doc]) -> None:
+        '''
+        Lemmatize a batch of documents.
+        
+        Lemmas are computed once per unique (lowercase form, POS) pair and
+        written back with one `doc.from_array` call per Doc, so the
+        StringStore is only touched once per distinct lemma instead of once
+        per token. Tokens that already have a lemma are skipped unless
+        `overwrite` is set.
+        '''
+        docs = [doc for doc in docs if len(doc)]
+        if not docs:
+            return
+        
+        strings = docs[0].vocab.strings
+        array = numpy.concatenate([doc.to_array([LOWER, POS, LEMMA]) for doc in docs])
+        lemmas = array[:, 2].copy()
+        if self.overwrite:
+            todo = numpy.ones(len(lemmas), dtype=bool)
+        else:
+            todo = lemmas == 0
+        if not todo.any():
+            return
+        
+        lexicon = self.lexicon
+        # Precomputed POS-less lemmas, see spacy_rup.lexeme_table
+        tables = load_lexeme_tables()
+        lemma_table = tables.lemma if tables is not None else {}
+        cache = {}
+        values = []
+        for key in zip(array[todo, 0].tolist(), array[todo, 1].tolist()):
+            lemma_id = cache.get(key)
+            if lemma_id is None:
+                lower, pos = key
+                lower = strings[lower]
+                pos = strings[pos] if pos else None
+                lemma = None
+                if lexicon is not None:
+                    lemma = lexicon.get(lower, pos)
+                    if lemma is None and cunia_key(lower) != lower:
+                        lemma = lexicon.get(cunia_key(lower), pos)
+                if lemma is None and pos is None:
+                    lemma = lemma_table.get(lower)
+                if lemma is None:
+                    lemma = lemmatize(lower, pos)
+                lemma_id = cache[key] = strings.add(lemma)
+            values.append(lemma_id)
+        lemmas[todo] = values
+        
+        start = 0
+        for doc in docs:
+            end = start + len(doc)
+            doc.from_array([LEMMA], lemmas[start:end])
+            start = end
+    
     def to_disk(self, path, exclude=tuple()):
-        pass
+        '''Save the settings and a copy of the external lexicon.'''
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        srsly.write_json(path / 'cfg', {'overwrite': self.overwrite})
+        if self.lexicon_path is not None:
+            target = path / 'lexicon.bin'
+            if not target.exists() or not target.samefile(self.lexicon_path):
+                shutil.copyfile(self.lexicon_path, target)
     
     def from_disk(self, path, exclude=tuple()):
+        '''Load the settings and memory-map the bundled lexicon, if any.'''
+        path = Path(path)
+        if (path / 'cfg').exists():
+            self.overwrite = srsly.read_json(path / 'cfg')['overwrite']
+        if (path / 'lexicon.bin').exists():
+            if self._lexicon is not None:
+                self._lexicon.close()
+            self.lexicon_path = path / 'lexicon.bin'
+            self._lexicon = None
         return self
 
 
@@ -1,6 +1,8 @@
 
 from typing import Optional
 
+from .orthography import cunia_key
+
 
 VERB_LEMMAS = {
     "hiu": "hiu",
@@ -339,13 +341,14 @@ ADJ_RULES = [
 def lemmatize_noun(word: str) -> str:
     """Lemmatize a noun by removing article suffixes."""
     word_lower = word.lower()
+    key = cunia_key(word_lower)
     
-    if word_lower in NOUN_LEMMAS:
-        return NOUN_LEMMAS[word_lower]
+    if key in NOUN_LEMMAS:
+        return NOUN_LEMMAS[key]
     
     for suffix, replacement in NOUN_ARTICLE_RULES:
-        if word_lower.endswith(suffix) and len(word_lower) > len(suffix) + 1:
-            return word_lower[:-len(suffix)] + replacement
+        if key.endswith(suffix) and len(key) > len(suffix) + 1:
+            return key[:-len(suffix)] + replacement
     
     return word_lower
 
@@ -353,13 +356,14 @@ def lemmatize_noun(word: str) -> str:
 def lemmatize_verb(word: str) -> str:
     """Lemmatize a verb to its dictionary form."""
     word_lower = word.lower()
+    key = cunia_key(word_lower)
     
-    if word_lower in VERB_LEMMAS:
-        return VERB_LEMMAS[word_lower]
+    if key in VERB_LEMMAS:
+        return VERB_LEMMAS[key]
     
     for suffix, replacement, _ in VERB_RULES:
-        if word_lower.endswith(suffix) and len(word_lower) > len(suffix) + 1:
-            stem = word_lower[:-len(suffix)] + replacement
+        if key.endswith(suffix) and len(key) > len(suffix) + 1:
+            stem = key[:-len(suffix)] + replacement
             return stem
     
     return word_lower
@@ -368,13 +372,14 @@ def lemmatize_verb(word: str) -> str:
 def lemmatize_adj(word: str) -> str:
     """Lemmatize an adjective to masculine singular."""
     word_lower = word.lower()
+    key = cunia_key(word_lower)
     
-    if word_lower in ADJ_LEMMAS:
-        return ADJ_LEMMAS[word_lower]
+    if key in ADJ_LEMMAS:
+        return ADJ_LEMMAS[key]
     
     for suffix, replacement, _ in ADJ_RULES:
-        if word_lower.endswith(suffix) and len(word_lower) > len(suffix) + 1:
-            return word_lower[:-len(suffix)] + replacement
+        if key.endswith(suffix) and len(key) > len(suffix) + 1:
+            return key[:-len(suffix)] + replacement
     
     return word_lower
 
@@ -383,6 +388,13 @@ def lemmatize(word: str, pos: Optional[str] = None) -> str:
     """
     Lemmatize an Aromanian word.
     
+    Lookup tables are keyed in Cunia; words in other orthographies are
+    looked up through their canonical Cunia key (see `cunia_key`). The
+    Cunia rules are applied to that key too, so every lemma from a table
+    or a rule is in Cunia spelling (DIARO `dușmanlu` -> `dushman`, like
+    Cunia `dushmanlu`); a word no table or rule covers is returned
+    lowercased, in its own spelling.
+    
     Args:
         word: The word to lemmatize
         pos: Part of speech tag (NOUN, VERB, ADJ, etc.) - optional
@@ -394,6 +406,7 @@ def lemmatize(word: str, pos: Optional[str] = None) -> str:
         return word
     
     word_lower = word.lower()
+    key = cunia_key(word_lower)
     
     if pos == "VERB":
         return lemmatize_verb(word)
@@ -402,17 +415,17 @@ def lemmatize(word: str, pos: Optional[str] = None) -> str:
     elif pos == "ADJ":
         return lemmatize_adj(word)
     
-    if word_lower in VERB_LEMMAS:
-        return VERB_LEMMAS[word_lower]
-    if word_lower in NOUN_LEMMAS:
-        return NOUN_LEMMAS[word_lower]
-    if word_lower in ADJ_LEMMAS:
-        return ADJ_LEMMAS[word_lower]
+    if key in VERB_LEMMAS:
+        return VERB_LEMMAS[key]
+    if key in NOUN_LEMMAS:
+        return NOUN_LEMMAS[key]
+    if key in ADJ_LEMMAS:
+        return ADJ_LEMMAS[key]
     
-    if word_lower.endswith(("lu", "a", "ea", "lji", "lor", "lui")):
+    if key.endswith(("lu", "a", "ea", "lji", "lor", "lui")):
         return lemmatize_noun(word)
     
-    if word_lower.endswith(("irã", "arã", "urã", "ea", "ãndu")):
+    if key.endswith(("irã", "arã", "urã", "ea", "ãndu")):
         return lemmatize_verb(word)
     
     return word_lower
@@ -2,6 +2,9 @@
 
 from spacy.attrs import LIKE_NUM
 
+from .numbers import parse_number
+from .orthography import CanonicalSet
+
 
 _num_words = {
     "un", "una", "unu", "unã",
@@ -37,7 +40,7 @@ _num_words = {
     "sutã", "suta", "sute",
     "njilji", "njilju",
     
-    "dauă", "țintsi", "șase", "șapte", "năuă", "dzăț", "dzățe",
+    "dauă", "țintsi", "șase", "șapte", "năuă", "dzaț", "dzațe",
     "sută", "ńilji", "ńilju",
     
     "protlu", "protã", "prota",
@@ -54,28 +57,23 @@ _num_words.update({
     "zero", "zeru",
 })
 
+# Stored as Cunia keys: one cached canonicalization and one hash probe per
+# lookup, whatever the orthography. DIARO dzăț(e) is Cunia dzãts(e), "says".
+_num_word_forms = frozenset(_num_words)
+_num_words = CanonicalSet(_num_word_forms)
+
 
 def like_num(text):
-    """Check if text represents a number in Aromanian."""
-    text = text.lower().replace(",", "").replace(".", "")
-    
-    if text.isdigit():
-        return True
-    
-    if text.count(",") == 1 or text.count(".") == 1:
-        parts = text.replace(",", ".").split(".")
-        if all(p.isdigit() for p in parts if p):
-            return True
+    """Check if text represents a number in Aromanian.
     
+    Digits are checked with their separators in place (3,5 and 1.000 are
+    numbers, 1,2,3 is not); number words in either orthography, including
+    compounds such as tsintsisprãdzatsi or doi-trei, go through the number
+    grammar in numbers.py.
+    """
     if text in _num_words:
         return True
-    
-    if "-" in text:
-        parts = text.split("-")
-        if all(p in _num_words for p in parts):
-            return True
-    
-    return False
+    return parse_number(text) is not None
 
 
 LEX_ATTRS = {
@@ -0,0 +1,172 @@
+"""
+Precomputed lexeme attributes for Aromanian.
+
+Every new lexeme runs the lexical attribute getters: `like_num` builds new
+strings and splits hyphenated forms, `is_stop` lowercases and probes the
+stop list. `build_lexeme_tables` computes LIKE_NUM, IS_STOP and NORM, plus
+a POS-less lemma, once for every word type of the corpora and stores them
+in `resources/lexeme_tables.msgpack`.
+
+`Aromanian()` installs the tables at startup: the attribute getters answer
+from them and only run their code for unknown words, and the NORM values
+that differ from the lowercase form go into the vocab's `lexeme_norm`
+lookups table, so they are saved with any pipeline built from it. The
+`aromanian_lemmatizer` uses the lemma table for tokens without POS. The
+file is read once per process and skipped if it was built from different
+code or data (`table_sources`): the modules of the attribute getters and
+the lemmatizer (`TABLE_MODULES`), and the Cunia key code of
+`orthography.py` they call. Edits elsewhere in `orthography.py`, e.g. to
+orthography detection, leave the tables valid.
+
+Rebuild the tables after changing those modules or the corpora:
+    python build_lexemes.py
+"""
+
+import hashlib
+import inspect
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import spacy
+import srsly
+from spacy import util
+from spacy.attrs import IS_STOP, LIKE_NUM, NORM
+from spacy.vocab import Vocab
+
+from . import lemmatizer, lex_attrs, numbers, orthography, stop_words
+from .lemmatizer import lemmatize
+
+
+LEXEME_TABLES = Path(__file__).parent / "resources" / "lexeme_tables.msgpack"
+
+# Modules whose code and data the tables are computed from, in full
+TABLE_MODULES = (lex_attrs, numbers, stop_words, lemmatizer)
+
+_loaded = {}
+
+
+def table_sources() -> tuple:
+    """The code and data the tables are computed from, in a stable order.
+
+    The whole source of `TABLE_MODULES`, and of `orthography.py` only the
+    Cunia key the getters canonicalize with.
+    """
+    return tuple(inspect.getsource(module) for module in TABLE_MODULES) + (
+        inspect.getsource(orthography.cunia_key),
+        inspect.getsource(orthography.CanonicalSet),
+        orthography._CUNIA_KEY_MAP,
+        orthography._CUNIA_KEY_RE.pattern,
+    )
+
+
+def lexeme_fingerprint() -> str:
+    """Hash of `table_sources()` and the spaCy version."""
+    digest = hashlib.sha1(spacy.about.__version__.encode("utf-8"))
+    digest.update(repr(table_sources()).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LexemeTables:
+    """Attribute values for a fixed set of word types."""
+
+    def __init__(self, words, like_num, is_stop, norm, lemma):
+        like_num, is_stop = set(like_num), set(is_stop)
+        self.like_num = {word: word in like_num for word in words}
+        self.is_stop = {word: word in is_stop for word in words}
+        self.norm = {word: norm.get(word, word.lower()) for word in words}
+        # Only the norms that differ from the lowercase form are stored.
+        self.special_norms = dict(norm)
+        self.lemma = dict(lemma)
+
+    def __len__(self) -> int:
+        return len(self.like_num)
+
+    @classmethod
+    def build(cls, words: Iterable[str], vocab: Vocab) -> "LexemeTables":
+        """Compute the tables with the attribute getters of `vocab`."""
+        getters = vocab.lex_attr_getters
+        words = sorted(set(words))
+        norm = {}
+        for word in words:
+            value = getters[NORM](word)
+            if value != word.lower():
+                norm[word] = value
+        lemma = {}
+        for word in words:
+            lower = word.lower()
+            if lower not in lemma:
+                lemma[lower] = lemmatize(lower)
+        return cls(
+            words,
+            like_num=[word for word in words if getters[LIKE_NUM](word)],
+            is_stop=[word for word in words if getters[IS_STOP](word)],
+            norm=norm,
+            lemma=lemma,
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "fingerprint": lexeme_fingerprint(),
+            "words": list(self.like_num),
+            "like_num": [word for word, value in self.like_num.items() if value],
+            "is_stop": [word for word, value in self.is_stop.items() if value],
+            "norm": self.special_norms,
+            "lemma": self.lemma,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LexemeTables":
+        return cls(data["words"], data["like_num"], data["is_stop"], data["norm"], data["lemma"])
+
+
+def build_lexeme_tables(words: Iterable[str], vocab: Vocab) -> LexemeTables:
+    """Compute the lexeme tables for a set of word types.
+
+    Args:
+        words: Word types (exact token texts)
+        vocab: A vocab with the Aromanian attribute getters, e.g.
+            `Aromanian().vocab`
+    """
+    return LexemeTables.build(words, vocab)
+
+
+def write_lexeme_tables(tables: LexemeTables, path: Path = LEXEME_TABLES) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    srsly.write_msgpack(path, tables.to_dict())
+    _loaded.pop(path, None)
+    return path
+
+
+def load_lexeme_tables(path: Path = LEXEME_TABLES) -> Optional[LexemeTables]:
+    """Read the lexeme tables, once per process.
+
+    Returns None if the file is missing or was built from different sources.
+    """
+    path = Path(path)
+    if path not in _loaded:
+        tables = None
+        if path.exists():
+            data = srsly.read_msgpack(path)
+            if data.get("fingerprint") == lexeme_fingerprint():
+                tables = LexemeTables.from_dict(data)
+        _loaded[path] = tables
+    return _loaded[path]
+
+
+def install_lexeme_tables(vocab: Vocab, tables: Optional[LexemeTables] = None) -> bool:
+    """Make the attribute getters of a vocab answer from the lexeme tables.
+
+    Returns False if no up-to-date tables are available.
+    """
+    if tables is None:
+        tables = load_lexeme_tables()
+    if tables is None:
+        return False
+    getters = vocab.lex_attr_getters
+    getters[LIKE_NUM] = util.add_lookups(getters[LIKE_NUM], tables.like_num)
+    getters[IS_STOP] = util.add_lookups(getters[IS_STOP], tables.is_stop)
+    getters[NORM] = util.add_lookups(getters[NORM], tables.norm)
+    if tables.special_norms and not vocab.lookups.has_table("lexeme_norm"):
+        vocab.lookups.add_table("lexeme_norm", tables.special_norms)
+    return True
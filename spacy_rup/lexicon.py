@@ -0,0 +1,223 @@
+"""
+Compact full-form lemma lexicons for Aromanian.
+
+A lexicon maps inflected forms to lemmas, optionally per part of speech.
+It is stored as a sorted binary file that is memory-mapped and searched
+with binary search, so even very large lexicons (hundreds of thousands of
+forms) cost almost nothing at startup and are shared between processes
+through the page cache instead of living in Python dicts.
+
+File layout (all integers little-endian):
+
+    magic        8 bytes   b"RUPLEX1\\n"
+    n_records    uint32
+    n_pos        uint32
+    blob_size    uint32
+    pos labels   n_pos x (uint8 length + UTF-8 bytes)
+    records      n_records x (form_off uint32, lemma_off uint32,
+                              form_len uint16, lemma_len uint16, pos uint8)
+    blob         UTF-8 strings referenced by the records
+
+Records are sorted by the UTF-8 bytes of the form. Forms listed several
+times keep the order in which they were written. Lemma strings are stored
+once in the blob, however many forms point to them. POS label 0 is the
+empty string and means "any part of speech".
+
+Usage:
+    from spacy_rup.lexicon import LemmaLexicon, write_lexicon
+
+    write_lexicon("rup.lex", [("featse", "fac", "VERB"), ("caplu", "cap", "NOUN")])
+    lexicon = LemmaLexicon.from_file("rup.lex")
+    lexicon.get("featse")  # "fac"
+"""
+
+import mmap
+import struct
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+
+MAGIC = b"RUPLEX1\n"
+
+_HEADER = struct.Struct("<8sIII")
+_RECORD = struct.Struct("<IIHHB")
+
+
+class LemmaLexicon:
+    """Read-only view over a binary lemma lexicon.
+
+    The lexicon can wrap any buffer (bytes or a memory map). Use
+    `LemmaLexicon.from_file` to memory-map a file on disk.
+    """
+
+    def __init__(self, buffer, path: Optional[Path] = None):
+        magic, n_records, n_pos, blob_size = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not an Aromanian lemma lexicon: {path or 'buffer'}")
+
+        offset = _HEADER.size
+        labels = []
+        for _ in range(n_pos):
+            length = buffer[offset]
+            labels.append(bytes(buffer[offset + 1:offset + 1 + length]).decode("utf-8"))
+            offset += 1 + length
+
+        self.path = path
+        self.pos_labels = labels
+        self._pos_ids = {label: i for i, label in enumerate(labels)}
+        self._buffer = buffer
+        self._n_records = n_records
+        self._records_start = offset
+        self._blob_start = offset + n_records * _RECORD.size
+        if len(buffer) < self._blob_start + blob_size:
+            raise ValueError(f"Truncated lemma lexicon: {path or 'buffer'}")
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "LemmaLexicon":
+        """Memory-map a lexicon file."""
+        path = Path(path)
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, path=path)
+
+    def __len__(self) -> int:
+        return self._n_records
+
+    def __contains__(self, form: str) -> bool:
+        return self._find(form.encode("utf-8")) is not None
+
+    def __iter__(self) -> Iterator[Tuple[str, str, str]]:
+        """Iterate over (form, lemma, pos) triples in file order."""
+        for i in range(self._n_records):
+            form_off, lemma_off, form_len, lemma_len, pos_id = self._record(i)
+            yield (
+                self._string(form_off, form_len).decode("utf-8"),
+                self._string(lemma_off, lemma_len).decode("utf-8"),
+                self.pos_labels[pos_id],
+            )
+
+    def get(self, form: str, pos: Optional[str] = None, default: Optional[str] = None) -> Optional[str]:
+        """Look up the lemma of a form.
+
+        Args:
+            form: The (lowercase) word form
+            pos: Part of speech tag - optional
+            default: Value returned when the form is not in the lexicon
+
+        Returns:
+            The lemma of the first record for `form` whose POS matches.
+            A record without POS matches any tag. If `pos` is None or a
+            tag the lexicon does not use, the first record for the form
+            is returned.
+        """
+        key = form.encode("utf-8")
+        i = self._find(key)
+        if i is None:
+            return default
+
+        pos_id = self._pos_ids.get(pos) if pos else None
+        first = None
+        while i < self._n_records:
+            form_off, lemma_off, form_len, lemma_len, record_pos = self._record(i)
+            if self._string(form_off, form_len) != key:
+                break
+            if first is None:
+                first = (lemma_off, lemma_len)
+            if pos_id is None or record_pos == pos_id or record_pos == 0:
+                return self._string(lemma_off, lemma_len).decode("utf-8")
+            i += 1
+
+        if pos_id is None and first is not None:
+            return self._string(*first).decode("utf-8")
+        return default
+
+    def close(self) -> None:
+        """Release the underlying memory map, if any."""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def _record(self, i: int) -> Tuple[int, int, int, int, int]:
+        return _RECORD.unpack_from(self._buffer, self._records_start + i * _RECORD.size)
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._blob_start + offset
+        return self._buffer[start:start + length]
+
+    def _find(self, key: bytes) -> Optional[int]:
+        """Binary search for the first record of `key`."""
+        lo, hi = 0, self._n_records
+        while lo < hi:
+            mid = (lo + hi) // 2
+            form_off, _, form_len, _, _ = self._record(mid)
+            if self._string(form_off, form_len) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n_records:
+            form_off, _, form_len, _, _ = self._record(lo)
+            if self._string(form_off, form_len) == key:
+                return lo
+        return None
+
+
+def write_lexicon(path: Union[str, Path], entries: Iterable[Tuple[str, ...]]) -> int:
+    """Write a binary lemma lexicon.
+
+    Args:
+        path: Output file
+        entries: (form, lemma) or (form, lemma, pos) tuples. Duplicate
+            (form, pos) pairs keep their first lemma.
+
+    Returns:
+        The number of records written
+    """
+    pos_labels = [""]
+    pos_ids = {"": 0}
+    seen = set()
+    records = []
+    for entry in entries:
+        form, lemma = entry[0], entry[1]
+        pos = entry[2] if len(entry) > 2 and entry[2] else ""
+        if (form, pos) in seen:
+            continue
+        seen.add((form, pos))
+        if pos not in pos_ids:
+            pos_ids[pos] = len(pos_labels)
+            pos_labels.append(pos)
+        records.append((form.encode("utf-8"), lemma.encode("utf-8"), pos_ids[pos]))
+
+    if len(pos_labels) > 255:
+        raise ValueError("A lemma lexicon supports at most 254 POS labels")
+
+    # Stable sort: records for the same form keep their input order.
+    records.sort(key=lambda record: record[0])
+
+    blob = bytearray()
+    lemma_offsets = {}
+    packed = bytearray()
+    for form, lemma, pos_id in records:
+        form_off = len(blob)
+        blob += form
+        if lemma not in lemma_offsets:
+            lemma_offsets[lemma] = len(blob)
+            blob += lemma
+        packed += _RECORD.pack(form_off, lemma_offsets[lemma], len(form), len(lemma), pos_id)
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(records), len(pos_labels), len(blob)))
+        for label in pos_labels:
+            encoded = label.encode("utf-8")
+            f.write(bytes([len(encoded)]) + encoded)
+        f.write(packed)
+        f.write(blob)
+
+    return len(records)
+
+
+def read_tsv_entries(path: Union[str, Path]) -> Iterator[Tuple[str, ...]]:
+    """Read `form<TAB>lemma[<TAB>pos]` lines from a text file."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) >= 2 and parts[0] and parts[1]:
+                yield tuple(parts[:3])
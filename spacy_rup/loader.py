@@ -0,0 +1,309 @@
+"""
+Cached loading of the packaged Aromanian pipelines.
+
+`spacy_rup.load()` resolves the pipelines shipped in `spacy_rup/resources`
+through `importlib.resources`, so it works from any working directory, and
+keeps one pipeline object per configuration for the whole process: every
+module that asks for the same components gets the same object, loaded once.
+
+`model` can be a list of pipelines, whose pipes are put together in one
+`Language` object (the first pipeline gives the vocab). The default is
+`pos_model` + `ner_model`; `combined_model`, with a shared tok2vec, is
+faster but has not reached their accuracy (see `bench_combined.py`). The
+tokenizer of an Aromanian pipeline is always the packaged one, from its
+artifact (`spacy_rup.tokenizer`), not a copy saved with the model.
+
+Only the requested components are created, and their weights are read
+from disk the first time they are used (called, piped, or an attribute
+read), not by `load()`: a pipeline loaded for its NER never reads the
+tagger weights, and a tagger-only configuration never touches the NER
+weights. The rule-based components of
+this package (`aromanian_senter`, `aromanian_clitic_splitter`,
+`aromanian_lemmatizer`) can be requested by name as well. How long each
+step took is recorded and returned by `load_timings()`; the weights of a
+component appear there once it has been used. With
+`SPACY_RUP_INSTRUMENT=1` in the environment every loaded pipeline is
+instrumented (see `spacy_rup.instrumentation`).
+
+Usage:
+    import spacy_rup
+    nlp = spacy_rup.load(components=["tagger", "aromanian_lemmatizer"])
+    ner = spacy_rup.load(model="ner_model")
+    spacy_rup.load_timings(nlp)
+    # {'create': 0.01, 'vocab': 0.02, 'tok2vec': 0.01, 'tagger': 0.002, ...}
+"""
+
+import inspect
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import srsly
+from spacy import util
+from spacy.language import Language
+
+from .instrumentation import enabled_by_env, instrument
+
+try:
+    from importlib.resources import files
+except ImportError:  # Python 3.8
+    files = None
+
+
+DEFAULT_MODEL = ("pos_model", "ner_model")
+
+# Package components, in pipeline order, and whether they go before or
+# after the model's pipes.
+PACKAGE_COMPONENTS = {
+    "aromanian_clitic_splitter": "first",
+    "aromanian_senter": "first",
+    "aromanian_lemmatizer": "last",
+}
+
+_cache = {}
+# load() arguments -> cache key, to skip reading the config on repeated calls
+_keys = {}
+_timings = {}
+_lock = threading.Lock()
+
+
+def resource_path(*parts: str) -> Path:
+    """Path of a file or directory in the packaged `resources/`."""
+    if files is None:
+        return Path(__file__).parent.joinpath("resources", *parts)
+    return Path(str(files(__package__).joinpath("resources", *parts)))
+
+
+def _model_paths(model: Union[str, Path, Sequence[Union[str, Path]]]) -> List[Path]:
+    """Paths of one pipeline, or of a list of them."""
+    if isinstance(model, (str, Path)):
+        return [_model_path(model)]
+    return [_model_path(name) for name in model]
+
+
+def _model_path(model: Union[str, Path]) -> Path:
+    path = Path(model)
+    if len(path.parts) == 1 and not path.exists():
+        path = resource_path(str(model))
+    if not (path / "config.cfg").exists():
+        raise ValueError(f"No spaCy pipeline found for model '{model}' (looked in {path})")
+    return path
+
+
+def _listeners(config) -> Dict[str, str]:
+    """Components whose model reads a shared tok2vec, mapped to its name."""
+    listeners = {}
+    for name, component in config["components"].items():
+        tok2vec = component.get("model", {}).get("tok2vec", {})
+        if "Listener" in str(tok2vec.get("@architectures", "")):
+            listeners[name] = "tok2vec" if tok2vec.get("upstream") in (None, "*") else tok2vec["upstream"]
+    return listeners
+
+
+def _select(configs: list, components: Optional[Iterable[str]], exclude: Iterable[str]) -> Tuple[list, list]:
+    """Split the requested names into the pipes of each model and package components.
+
+    A pipe name found in several models is taken from the first.
+    """
+    owners = {}
+    for i, config in enumerate(configs):
+        for name in config["nlp"]["pipeline"]:
+            owners.setdefault(name, i)
+    available = list(owners)
+    requested = available if components is None else list(components)
+    exclude = set(exclude)
+    unknown = [name for name in list(requested) + list(exclude) if name not in available and name not in PACKAGE_COMPONENTS]
+    if unknown:
+        raise ValueError(
+            f"Unknown component(s) {unknown}; available: {available + list(PACKAGE_COMPONENTS)}"
+        )
+    wanted = {name for name in requested if name not in exclude}
+    for i, config in enumerate(configs):
+        for listener, upstream in _listeners(config).items():
+            if listener in wanted and owners[listener] == i:
+                if upstream in exclude:
+                    raise ValueError(f"'{listener}' needs '{upstream}', which is excluded")
+                wanted.add(upstream)
+    pipes = [[name for name in available if name in wanted and owners[name] == i] for i in range(len(configs))]
+    extras = [name for name in PACKAGE_COMPONENTS if name in wanted]
+    return pipes, extras
+
+
+_MISSING = object()
+
+
+def _identity(component):
+    return component
+
+
+class LazyComponent:
+    """A model component whose weights are read from `path` on first use.
+
+    Calls, `pipe` and attribute access go to the component, after loading
+    it. Its `name`, and attributes it does not have before loading, are
+    answered without loading, so the `hasattr` checks spaCy runs on every
+    `add_pipe` (for shared tok2vecs) do not read the weights. Pickling
+    gives the loaded component itself.
+    """
+
+    def __init__(self, component, name: str, path: Path, timings: Dict[str, float]):
+        self.__dict__.update(_component=component, _name=name, _path=path, _timings=timings, _loaded=False)
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _ensure(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    start = time.perf_counter()
+                    self._component.from_disk(self._path, exclude=["vocab"])
+                    self._timings[self._name] = time.perf_counter() - start
+                    self.__dict__["_loaded"] = True
+        return self._component
+
+    def __call__(self, doc, *args, **kwargs):
+        return self._ensure()(doc, *args, **kwargs)
+
+    def pipe(self, stream, *args, **kwargs):
+        return self._ensure().pipe(stream, *args, **kwargs)
+
+    def __getattr__(self, name):
+        if not self._loaded:
+            if name == "name":
+                return self._component.name
+            if inspect.getattr_static(self._component, name, _MISSING) is _MISSING:
+                raise AttributeError(name)
+        return getattr(self._ensure(), name)
+
+    def __setattr__(self, name, value):
+        if name == "name" and not self._loaded:
+            self._component.name = value
+        else:
+            setattr(self._ensure(), name, value)
+
+    def __reduce__(self):
+        return _identity, (self._ensure(),)
+
+    def __repr__(self):
+        return f"<lazy {self._component!r}{'' if self._loaded else ', not loaded'}>"
+
+
+def _make_lazy(nlp: Language, names: Iterable[str], path: Path, timings: Dict[str, float]) -> None:
+    names = set(names)
+    for i, (name, component) in enumerate(nlp._components):
+        if name in names:
+            nlp._components[i] = (name, LazyComponent(component, name, path / name, timings))
+
+
+def _load(paths: List[Path], pipes: List[list], extras: list) -> Tuple[Language, Dict[str, float]]:
+    """Create the pipeline with only `pipes` (one list per path), timing each step.
+
+    The model components are wrapped in `LazyComponent`s; the `timings`
+    dict gets their load times when they are first used.
+    """
+    timings = {}
+    start = time.perf_counter()
+    path = paths[0]
+    config = util.load_config(path / "config.cfg")
+    if config["nlp"]["lang"] == "rup":
+        # The packaged tokenizer, from its artifact, instead of a saved copy
+        config["nlp"]["tokenizer"] = {"@tokenizers": "spacy_rup.Tokenizer.v1"}
+    skipped = [name for name in config["nlp"]["pipeline"] if name not in pipes[0]]
+    nlp = util.load_model_from_config(config, exclude=skipped, meta=util.get_model_meta(path))
+    timings["create"] = time.perf_counter() - start
+
+    # Config, meta and vocab (and the saved tokenizer of other languages);
+    # this also links listeners to their tok2vec, which needs the unwrapped
+    # components.
+    step = time.perf_counter()
+    saved = ["tokenizer"] if config["nlp"]["lang"] == "rup" else []
+    nlp.from_disk(path, exclude=nlp.component_names + saved)
+    timings["vocab"] = time.perf_counter() - step
+    _make_lazy(nlp, nlp.component_names, path, timings)
+    # Pipes of the other models join with their own config and weights.
+    for path, names in zip(paths[1:], pipes[1:]):
+        if not names:
+            continue
+        config = util.load_config(path / "config.cfg", interpolate=True)
+        for string in srsly.read_json(path / "vocab" / "strings.json"):
+            nlp.vocab.strings.add(string)
+        for name in names:
+            settings = dict(config["components"][name])
+            factory = settings.pop("factory")
+            nlp.add_pipe(factory, name=name, config=settings)
+        _make_lazy(nlp, names, path, timings)
+    first = [name for name in extras if PACKAGE_COMPONENTS[name] == "first"]
+    last = [name for name in extras if PACKAGE_COMPONENTS[name] == "last"]
+    for name in reversed(first):
+        step = time.perf_counter()
+        nlp.add_pipe(name, first=True)
+        timings[name] = time.perf_counter() - step
+    for name in last:
+        step = time.perf_counter()
+        nlp.add_pipe(name, last=True)
+        timings[name] = time.perf_counter() - step
+    timings["total"] = time.perf_counter() - start
+    return nlp, timings
+
+
+def load(
+    components: Optional[Iterable[str]] = None,
+    exclude: Iterable[str] = (),
+    model: Union[str, Path, Sequence[Union[str, Path]]] = DEFAULT_MODEL,
+) -> Language:
+    """Load a packaged pipeline, once per process and configuration.
+
+    Args:
+        components: Pipes of the model and/or package components to
+            include. Defaults to all pipes of the model. A pipe that
+            listens to a shared `tok2vec` brings it in.
+        exclude: Names to leave out
+        model: Name of a pipeline in `spacy_rup/resources`
+            (`pos_model`, `ner_model`, `combined_model`) or a path, or a
+            list of them to take the pipes from
+
+    Returns:
+        The cached `Language` object for this configuration. It is shared;
+        do not add or remove components on it.
+    """
+    exclude = tuple(sorted(exclude))
+    names = (str(model),) if isinstance(model, (str, Path)) else tuple(map(str, model))
+    arguments = (names, None if components is None else tuple(components), exclude)
+    with _lock:
+        key = _keys.get(arguments)
+        if key is None:
+            paths = _model_paths(model)
+            pipes, extras = _select([util.load_config(path / "config.cfg") for path in paths], components, exclude)
+            key = (tuple(str(path.resolve()) for path in paths), tuple(map(tuple, pipes)), tuple(extras))
+        if key not in _cache:
+            paths, pipes, extras = key
+            nlp, timings = _load([Path(path) for path in paths], [list(names) for names in pipes], list(extras))
+            if enabled_by_env():
+                instrument(nlp)
+            _cache[key] = nlp
+            _timings[key] = timings
+        # Only once the pipeline exists: a failed load is tried again in full.
+        _keys[arguments] = key
+        return _cache[key]
+
+
+def load_timings(nlp: Optional[Language] = None) -> Dict:
+    """Seconds spent loading, per step and component.
+
+    Returns the timings of `nlp`, or of every cached configuration,
+    keyed by (model paths, pipes per model, package components).
+    """
+    if nlp is None:
+        return {key: dict(timings) for key, timings in _timings.items()}
+    for key, cached in _cache.items():
+        if cached is nlp:
+            return dict(_timings[key])
+    raise ValueError("This pipeline was not created by spacy_rup.load()")
+
+
+def clear_cache() -> None:
+    """Forget all cached pipelines."""
+    with _lock:
+        _cache.clear()
+        _keys.clear()
+        _timings.clear()
@@ -0,0 +1,241 @@
+"""
+Numeric values of Aromanian number words.
+
+`parse_number` turns a token into its value, in either orthography:
+
+    tsintsisprãdzatsi, țisprădzațe  -> 15
+    doauãsprats                     -> 12
+    tsisprãyinyits                  -> 25
+    patrudzãts                      -> 40
+    treilea, 2-lea                  -> 3, 2
+    3,5 / 1.000                     -> 3.5 / 1000
+    yinghits-shi-doi                -> 22
+    doi-trei                        -> 2 (a range; the lower bound)
+
+Words are first reduced to their Cunia key, then segmented into morphemes
+with a character trie (units, `sprã`, tens, hundreds, ordinal endings) and
+the morpheme sequence is valued by a handful of composition rules. Results
+are cached per word form and exposed as `token._.num_value`.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from spacy.tokens import Token
+
+from .orthography import cunia_key
+
+
+Number = Union[int, float]
+
+# Morpheme kinds
+UNIT = "unit"         # 1-9, possibly only as part of a longer word
+WORD = "word"         # a complete number word: zero, giumãtati, protlu
+TEN = "ten"           # dzatsi: 10 alone, x10 after a unit
+BOUND_TEN = "dzãts"   # dzãts(i): only after a unit, alone it is "says"
+SHORT_TEN = "ts"      # the clipped ten of doauãsprats
+TWENTY = "twenty"     # yinghits: 20 alone, +20 after sprã
+SPRA = "sprã"         # "over": unit + sprã + ten
+MULT = "mult"         # sutã, njilji: x100, x1000 after a unit
+ORD = "ord"           # ordinal endings: doi-lea, trei-a
+
+# Contexts in which a unit stem may appear
+ALONE, TEEN, TENS, TIMES, ORDINAL = "alone", "teen", "tens", "times", "ordinal"
+_ALL = (ALONE, TEEN, TENS, TIMES, ORDINAL)
+
+# (forms, value, contexts), in Cunia spelling
+_UNITS = [
+    (["un", "unu", "una", "unã"], 1, (ALONE, TEEN, TIMES)),
+    (["doi", "doauã", "dauã", "doaua"], 2, _ALL),
+    (["do"], 2, (TEEN,)),
+    (["trei"], 3, _ALL),
+    (["treis"], 3, (TEEN,)),
+    (["patru"], 4, _ALL),
+    (["pa", "pai"], 4, (TEEN,)),
+    (["patr"], 4, (ORDINAL,)),
+    (["tsintsi"], 5, (ALONE, TEEN, TIMES, ORDINAL)),
+    (["tsi"], 5, (TEEN,)),
+    (["tsin"], 5, (TENS,)),
+    (["shase", "shasi"], 6, (ALONE, TEEN, TIMES, ORDINAL)),
+    (["shea"], 6, (TEEN,)),
+    (["shai"], 6, (TENS,)),
+    (["shapte", "shapti"], 7, _ALL),
+    (["optu"], 8, _ALL),
+    (["opt"], 8, (TENS, ORDINAL)),
+    (["noauã", "nauã", "noaua", "nãuã"], 9, _ALL),
+]
+
+_MORPHEMES = [
+    (TEN, ["dzatsi", "dzatse", "dzats"], 10),
+    (BOUND_TEN, ["dzãtsi", "dzãtse", "dzãts"], 10),
+    (SHORT_TEN, ["ts", "tse", "tsi"], 10),
+    (TWENTY, ["yinghits", "yinghitsi", "yinyits", "yinyitsi"], 20),
+    (MULT, ["sutã", "suta", "sute", "suti"], 100),
+    (MULT, ["njilji", "njilju", "njilje"], 1000),
+    (MULT, ["miliunã", "njiliunã", "miliuni", "njiliuni"], 1000000),
+    (WORD, ["zero", "zeru"], 0),
+    (WORD, ["giumãtati", "giumãtate"], 0.5),
+    (WORD, ["sfãrtu"], 0.25),
+    (WORD, ["protlu", "protã", "prota"], 1),
+    (SPRA, ["sprã", "spra"], None),
+    (ORD, ["lea", "a"], None),
+]
+
+# Kinds that are a number on their own
+_STANDALONE = frozenset([TEN, TWENTY, MULT, WORD])
+
+_MULTIPLIERS = frozenset(value for kind, _, value in _MORPHEMES if kind == MULT)
+
+# The longest sequence `_compose` values: unit + sprã + ten
+_MAX_MORPHEMES = 3
+
+# Hyphenated parts that join the parts of a compound (yinghits-shi-doi)
+_JOINERS = frozenset(["shi", "si"])
+
+_DIGITS_RE = re.compile(r"[+-]?\d+")
+_DECIMAL_COMMA_RE = re.compile(r"[+-]?\d+,\d+")
+_DECIMAL_POINT_RE = re.compile(r"[+-]?\d+\.\d{1,2}|[+-]?\d+\.\d{4,}")
+_THOUSANDS_RE = re.compile(r"[+-]?\d{1,3}(?:\.\d{3})+(?:,\d+)?")
+
+
+def _build_trie() -> Dict:
+    trie = {}
+    entries = [(UNIT, forms, value, contexts) for forms, value, contexts in _UNITS]
+    entries += [(kind, forms, value, ()) for kind, forms, value in _MORPHEMES]
+    for kind, forms, value, contexts in entries:
+        for form in forms:
+            node = trie
+            for char in form:
+                node = node.setdefault(char, {})
+            node.setdefault(None, []).append((kind, value, frozenset(contexts)))
+    return trie
+
+
+_TRIE = _build_trie()
+
+
+def _segmentations(word: str, start: int = 0, limit: int = _MAX_MORPHEMES) -> Iterator[List[Tuple]]:
+    """Ways to cover word[start:] with at most `limit` morphemes from the trie.
+
+    Generated lazily, so `_parse_word` stops at the first one that composes;
+    the limit keeps long words (unaunauna...) from branching without end.
+    """
+    if start == len(word):
+        yield []
+        return
+    if limit == 0:
+        return
+    node = _TRIE
+    for end in range(start, len(word)):
+        node = node.get(word[end])
+        if node is None:
+            break
+        for morpheme in node.get(None, ()):
+            for rest in _segmentations(word, end + 1, limit - 1):
+                yield [morpheme] + rest
+
+
+def _compose(morphemes: List[Tuple]) -> Optional[Number]:
+    """Value of a morpheme sequence under the composition rules."""
+    kinds = [kind for kind, _, _ in morphemes]
+    values = [value for _, value, _ in morphemes]
+    if len(morphemes) == 1:
+        kind, value, contexts = morphemes[0]
+        if kind == UNIT:
+            return value if ALONE in contexts else None
+        return value if kind in _STANDALONE else None
+
+    if kinds[0] != UNIT:
+        return None
+    unit, contexts = values[0], morphemes[0][2]
+    if kinds[1:] in ([SPRA, TEN], [SPRA, BOUND_TEN], [SPRA, SHORT_TEN]) and TEEN in contexts:
+        return unit + 10
+    if kinds[1:] == [SPRA, TWENTY] and TEEN in contexts:
+        return unit + 20
+    if kinds[1:] in ([TEN], [BOUND_TEN]) and TENS in contexts:
+        return unit * 10
+    if kinds[1:] == [MULT] and TIMES in contexts:
+        return unit * values[1]
+    if kinds[1:] == [ORD] and ORDINAL in contexts:
+        return unit
+    return None
+
+
+def _parse_digits(text: str) -> Optional[Number]:
+    if _DIGITS_RE.fullmatch(text):
+        return int(text)
+    if _THOUSANDS_RE.fullmatch(text):
+        value = text.replace(".", "").replace(",", ".")
+        return float(value) if "." in value else int(value)
+    if _DECIMAL_COMMA_RE.fullmatch(text):
+        return float(text.replace(",", "."))
+    if _DECIMAL_POINT_RE.fullmatch(text):
+        return float(text)
+    return None
+
+
+def _parse_word(word: str) -> Optional[Number]:
+    value = _parse_digits(word)
+    if value is not None:
+        return value
+    for morphemes in _segmentations(cunia_key(word)):
+        value = _compose(morphemes)
+        if value is not None:
+            return value
+    return None
+
+
+@lru_cache(maxsize=65536)
+def parse_number(text: str) -> Optional[Number]:
+    """Numeric value of a token, or None if it is not a number.
+
+    Args:
+        text: A token in any Aromanian orthography
+
+    Returns:
+        An int or float. Ordinals give their number, repetitions such as
+        `trei-trei` the repeated number and ranges such as `doi-trei`
+        their lower bound.
+    """
+    if not text:
+        return None
+    value = _parse_word(text)
+    if value is not None or "-" not in text:
+        return value
+
+    parts = text.split("-")
+    if not all(parts):
+        return None
+    # Digit ordinals: 2-lea, 1-a
+    if len(parts) == 2 and _parse_digits(parts[0]) is not None and cunia_key(parts[1]) in ("lea", "a", "lu"):
+        return _parse_digits(parts[0])
+
+    # Compounds joined by shi: yinghits-shi-doi, from the largest part down
+    if len(parts) > 2 and all(cunia_key(part) in _JOINERS for part in parts[1::2]):
+        values = [_parse_word(part) for part in parts[::2]]
+        if None not in values and all(a > b for a, b in zip(values, values[1:])):
+            return sum(values)
+        return None
+
+    if len(parts) != 2:
+        return None
+    first, second = _parse_word(parts[0]), _parse_word(parts[1])
+    if first is None or second is None:
+        return None
+    # Repetition (trei-trei), hyphenated multiples (doauã-sute), ranges (doi-trei)
+    if first == second:
+        return first
+    if second in _MULTIPLIERS and 1 <= first < 10:
+        return first * second
+    if first < second:
+        return first
+    return None
+
+
+def token_num_value(token: Token) -> Optional[Number]:
+    return parse_number(token.text)
+
+
+if not Token.has_extension("num_value"):
+    Token.set_extension("num_value", getter=token_num_value)
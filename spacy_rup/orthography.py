@@ -36,6 +36,8 @@ Based on conversion scripts from:
 import re
 import json
 import pickle
+import unicodedata
+from functools import lru_cache
 from pathlib import Path
 
 # Try to import sklearn components needed for unpickling
@@ -174,7 +176,53 @@ def to_cunia(text: str) -> str:
     return text
 
 
-from typing import Optional
+_CUNIA_KEY_MAP = {
+    k.lower(): v.lower()
+    for mapping in (DIARO_TO_CUNIA_CONSONANTS, VOWELS_TO_CUNIA, OTHER_CHARS)
+    for k, v in mapping.items()
+}
+_CUNIA_KEY_RE = re.compile(
+    "|".join(re.escape(k) for k in sorted(_CUNIA_KEY_MAP, key=len, reverse=True))
+)
+
+
+@lru_cache(maxsize=65536)
+def cunia_key(word: str) -> str:
+    """Canonical lowercase Cunia key of a single word, for table lookups.
+    
+    Equivalent to `to_cunia(word.lower())`, but done in one pass with a
+    precompiled pattern and cached per word form, so DIARO and Cunia
+    spellings of the same word (`știu`, `shtiu`) hit the same entry.
+    
+    Args:
+        word: A word in any Aromanian orthography
+        
+    Returns:
+        The lowercase Cunia spelling of the word
+    """
+    word = unicodedata.normalize("NFC", word.lower())
+    return _CUNIA_KEY_RE.sub(lambda m: _CUNIA_KEY_MAP[m.group()], word)
+
+
+class CanonicalSet(frozenset):
+    """Frozen set of Cunia keys that canonicalizes the words it is probed with.
+    
+    `word in s` is `cunia_key(word) in s`: one cached key lookup and one
+    hash probe, whatever the orthography or case of `word`. Iterating
+    yields the Cunia keys.
+    """
+    
+    def __new__(cls, words=()):
+        return super().__new__(cls, (cunia_key(word) for word in words))
+    
+    def __contains__(self, word) -> bool:
+        return isinstance(word, str) and frozenset.__contains__(self, cunia_key(word))
+    
+    def __reduce__(self):
+        return (self.__class__, (list(frozenset.__iter__(self)),))
+
+
+from typing import List, Optional
 
 
 def resolve_central_vowel_to_diaro(word: str, position: int, fah: Optional[dict] = None, fuh: Optional[dict] = None) -> str:
@@ -334,17 +382,7 @@ def detect_orthography(text: str) -> str:
     Returns:
         'cunia', 'diaro', 'mixed', or 'unknown'
     """
-    # 1. Try generic heuristics first for obvious cases
-    diaro_chars = set("șțăâîľńȘȚĂÂÎĽŃ")
-    cunia_patterns = ["sh", "ts", "lj", "nj", "dz"]
-    cunia_chars = set("ãÃ")
-    
-    has_diaro = any(c in diaro_chars for c in text) or "d̦" in text or "D̦" in text
-    has_cunia_char = any(c in cunia_chars for c in text)
-    has_cunia_pattern = any(p in text.lower() for p in cunia_patterns)
-    has_cunia = has_cunia_char or has_cunia_pattern
-    
-    # 2. Use ML Model if available and text is long enough to be ambiguous
+    # 1. Use ML Model if available and text is long enough to be ambiguous
     # Heuristics are better for short strings with definitive markers
     if ORTHOGRAPHY_MODEL:
         try:
@@ -359,15 +397,43 @@ def detect_orthography(text: str) -> str:
         except Exception:
             pass
 
-    # 3. Fallback to heuristics
+    # 2. Fallback to heuristics
+    return _heuristic_orthography(text)
+
+
+def _heuristic_orthography(text: str) -> str:
+    """Orthography from marker characters and digraphs alone."""
+    diaro_chars = set("șțăâîľńȘȚĂÂÎĽŃ")
+    has_diaro = any(c in diaro_chars for c in text) or "d̦" in text or "D̦" in text
+    has_cunia = any(c in "ãÃ" for c in text) or any(p in text.lower() for p in ["sh", "ts", "lj", "nj", "dz"])
     if has_diaro and has_cunia:
         return "mixed"
     elif has_diaro:
         return "diaro"
     elif has_cunia:
         return "cunia"
-    else:
-        return "unknown"
+    return "unknown"
+
+
+def detect_orthographies(texts: List[str]) -> List[str]:
+    """`detect_orthography` for a batch of texts.
+    
+    Gives the same answers, but runs the classifier once for the whole
+    batch instead of twice per text.
+    """
+    texts = list(texts)
+    results = [None] * len(texts)
+    if ORTHOGRAPHY_MODEL and texts:
+        try:
+            probabilities = ORTHOGRAPHY_MODEL.predict_proba(texts)
+            classes = ORTHOGRAPHY_MODEL.classes_
+            for i, row in enumerate(probabilities):
+                best = row.argmax()
+                if row[best] > 0.8:
+                    results[i] = str(classes[best])
+        except Exception:
+            pass
+    return [result if result is not None else _heuristic_orthography(text) for result, text in zip(results, texts)]
 
 
 def normalize_text(text: str, target: str = "cunia") -> str:
@@ -0,0 +1,129 @@
+"""
+Word-list POS overrides as a hash lookup.
+
+`enrich_pos_model.py` used to add one `[{"LOWER": word}]` pattern per listed
+word to an `attribute_ruler`, which then runs the Matcher over every token.
+All those patterns are single lowercase words, so `aromanian_pos_lookup`
+keeps them as a table from the LOWER hash to (POS, TAG) and applies it to a
+whole Doc with one `to_array` / `from_array` round trip: the token hashes
+are looked up with a binary search over the sorted table keys.
+
+`add()` takes the same arguments as `AttributeRuler.add` for these patterns,
+and a later rule for a word replaces an earlier one, as in the ruler, so
+the results are the same as the attribute_ruler's.
+
+Usage:
+    nlp = spacy.load("spacy_rup/resources/pos_model")
+    lookup = nlp.add_pipe("aromanian_pos_lookup", after="tagger")
+    lookup.add(patterns=[[{"LOWER": "va"}]], attrs={"POS": "AUX", "TAG": "AUX"})
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy
+import srsly
+from spacy.attrs import LOWER, POS, TAG
+from spacy.language import Language
+from spacy.parts_of_speech import IDS as POS_IDS
+from spacy.tokens import Doc
+from spacy.vocab import Vocab
+
+
+@Language.factory("aromanian_pos_lookup", assigns=["token.pos", "token.tag"])
+def create_pos_lookup(nlp: Language, name: str):
+    """Create a component that sets POS and TAG from a word list."""
+    return PosLookup(nlp.vocab, name=name)
+
+
+class PosLookup:
+    """Set POS and TAG of listed lowercase words.
+
+    The rules are kept in insertion order as {lowercase word: (POS, TAG)};
+    a `None` value leaves that attribute as it is.
+    """
+
+    def __init__(self, vocab: Vocab, name: str = "aromanian_pos_lookup"):
+        self.vocab = vocab
+        self.name = name
+        self.rules: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._arrays = None
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def add(self, patterns: Iterable[List[Dict]], attrs: Dict, index: int = 0) -> None:
+        """Add rules in the form `AttributeRuler.add` takes them.
+
+        Args:
+            patterns: Single-token patterns, `[[{"LOWER": word}], ...]`
+            attrs: `POS` and/or `TAG` to set
+            index: Must be 0 (the token the attrs apply to)
+        """
+        unsupported = set(attrs) - {"POS", "TAG"}
+        if unsupported or index != 0:
+            raise ValueError(f"aromanian_pos_lookup only sets POS and TAG of one token, not {sorted(unsupported) or index}")
+        pos, tag = attrs.get("POS"), attrs.get("TAG")
+        if pos is not None and pos not in POS_IDS:
+            raise ValueError(f"Unknown POS '{pos}'")
+        for pattern in patterns:
+            if len(pattern) != 1 or list(pattern[0]) != ["LOWER"] or not isinstance(pattern[0]["LOWER"], str):
+                raise ValueError(f"aromanian_pos_lookup only supports [{{'LOWER': word}}] patterns, not {pattern}")
+            word = pattern[0]["LOWER"]
+            # Later rules win, as with the attribute_ruler.
+            self.rules.pop(word, None)
+            self.rules[word] = (pos, tag)
+        self._arrays = None
+
+    def _lookup_arrays(self):
+        """Sorted LOWER hashes with the POS IDs and TAG hashes to write (0: keep)."""
+        if self._arrays is None:
+            strings = self.vocab.strings
+            entries = sorted(
+                (strings.add(word), POS_IDS[pos] if pos else 0, strings.add(tag) if tag else 0)
+                for word, (pos, tag) in self.rules.items()
+            )
+            table = numpy.array(entries, dtype="uint64").reshape(-1, 3)
+            self._arrays = table[:, 0].copy(), table[:, 1].copy(), table[:, 2].copy()
+        return self._arrays
+
+    def __call__(self, doc: Doc) -> Doc:
+        keys, pos_values, tag_values = self._lookup_arrays()
+        if not len(doc) or not len(keys):
+            return doc
+        array = doc.to_array([LOWER, POS, TAG])
+        positions = numpy.searchsorted(keys, array[:, 0])
+        positions[positions == len(keys)] = 0
+        found = keys[positions] == array[:, 0]
+        if not found.any():
+            return doc
+        rows = positions[found]
+        pos = array[found, 1]
+        tag = array[found, 2]
+        array[found, 1] = numpy.where(pos_values[rows] != 0, pos_values[rows], pos)
+        array[found, 2] = numpy.where(tag_values[rows] != 0, tag_values[rows], tag)
+        doc.from_array([POS, TAG], array[:, 1:])
+        return doc
+
+    def pipe(self, stream, batch_size: int = 128):
+        for doc in stream:
+            yield self(doc)
+
+    def to_bytes(self, exclude=tuple()) -> bytes:
+        return srsly.msgpack_dumps({"rules": [[word, pos, tag] for word, (pos, tag) in self.rules.items()]})
+
+    def from_bytes(self, data: bytes, exclude=tuple()) -> "PosLookup":
+        self.rules = {word: (pos, tag) for word, pos, tag in srsly.msgpack_loads(data)["rules"]}
+        self._arrays = None
+        return self
+
+    def to_disk(self, path, exclude=tuple()) -> None:
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        srsly.write_json(path / "rules.json", [[word, pos, tag] for word, (pos, tag) in self.rules.items()])
+
+    def from_disk(self, path, exclude=tuple()) -> "PosLookup":
+        path = Path(path)
+        self.rules = {word: (pos, tag) for word, pos, tag in srsly.read_json(path / "rules.json")}
+        self._arrays = None
+        return self
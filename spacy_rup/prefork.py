@@ -0,0 +1,233 @@
+"""
+Pre-fork worker pools that share the loaded models copy-on-write.
+
+A worker process that loads the pipelines itself pays the load time and
+its own copy of every weight array, vocab entry and the orthography
+model. `preload` loads and warms a pipeline once in the parent instead;
+workers forked afterwards inherit it, and its pages stay shared as long
+as nobody writes to them.
+
+Reading objects still writes to them in CPython: every new reference
+updates a refcount, and the cyclic GC writes to the header of every
+object it visits. `preload` therefore finishes with `gc.freeze()`, which
+moves everything allocated so far into a permanent generation that the
+collector no longer walks, so a collection in a worker leaves the shared
+pages alone. Refcount updates of the objects a worker actually uses still
+copy their pages; `unique_rss` shows how much each worker ended up owning.
+
+`PreforkPool` forks, supervises and restarts the workers. The HTTP server
+(`serve_prefork`, `python -m spacy_rup serve --workers N`) shares one
+listening socket between them, and the `stream` and `annotate` commands
+(`annotate_stream(prefork=True)`) preload in the parent before their
+workers start.
+
+Needs the `fork` start method (Linux, macOS); elsewhere workers load the
+models themselves as before.
+
+Usage:
+    nlp = preload(components=["tagger", "aromanian_pos_lookup", "ner"])
+    pool = PreforkPool(work, n_workers=4, args=(nlp,))
+    pool.start()
+    print(pool.memory())  # {pid: {"rss": ..., "pss": ..., "uss": ...}}
+    pool.join()
+"""
+
+import gc
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from spacy.language import Language
+
+from .loader import DEFAULT_MODEL, load
+from .orthography import detect_orthographies
+
+# Exercised once before forking, so that lazily built state (lookup
+# arrays, lexemes, thinc buffers) is created in the parent and shared.
+WARMUP_TEXTS = [
+    "Eara un lup shi va s-yinã acasã.",
+    "Tu hoara a noastrã bãnã un om cu trei hiljii, „ma cari?“ dzãsi el.",
+    "Nveastã-sa ishi tu ubor — ș-fitsiorlji s-dusirã tu pade.",
+]
+
+
+def can_fork() -> bool:
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def fork_context():
+    """The `fork` multiprocessing context, or the default one where fork is missing."""
+    return multiprocessing.get_context("fork" if can_fork() else None)
+
+
+def freeze() -> None:
+    """Collect once, then exempt every object allocated so far from the cyclic GC."""
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+
+
+def preload(
+    components: Optional[Iterable[str]] = None,
+    model: Union[str, Path, Sequence[Union[str, Path]]] = DEFAULT_MODEL,
+    texts: Sequence[str] = WARMUP_TEXTS,
+) -> Language:
+    """Load a pipeline through `spacy_rup.load`, warm it on `texts` and freeze the heap.
+
+    Workers that call `spacy_rup.load` with the same arguments after a fork
+    get this pipeline from the inherited cache.
+    """
+    nlp = load(components=components, model=model)
+    list(nlp.pipe(texts))
+    detect_orthographies(list(texts))
+    freeze()
+    return nlp
+
+
+def unique_rss(pid: Optional[int] = None) -> Dict[str, int]:
+    """Resident, proportional and unique set size of a process, in bytes.
+
+    `uss` counts the pages only this process maps (what it would free on
+    exit); `pss` splits the shared pages between their processes. Read from
+    `/proc/<pid>/smaps_rollup`; empty where that does not exist.
+    """
+    path = Path(f"/proc/{pid or os.getpid()}/smaps_rollup")
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return {}
+    fields = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        parts = value.split()
+        if parts and parts[0].isdigit():
+            fields[name] = int(parts[0]) * 1024
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+class PreforkPool:
+    """Fork `n_workers` processes running `target(*args)` and keep them running.
+
+    A worker that exits with an error is replaced (with `restart`), one
+    that exits cleanly is not. SIGTERM or SIGINT to the supervisor in
+    `join()` stops every worker.
+    """
+
+    def __init__(self, target: Callable, n_workers: int, args: tuple = (), restart: bool = True):
+        self.target = target
+        self.n_workers = n_workers
+        self.args = args
+        self.restart = restart
+        self.context = fork_context()
+        self.workers: List[multiprocessing.Process] = []
+        self._stopping = False
+
+    def _spawn(self) -> multiprocessing.Process:
+        worker = self.context.Process(target=self.target, args=self.args, daemon=True)
+        worker.start()
+        return worker
+
+    def start(self) -> "PreforkPool":
+        self.workers = [self._spawn() for _ in range(self.n_workers)]
+        return self
+
+    def memory(self) -> Dict[int, Dict[str, int]]:
+        """`unique_rss` of every live worker, by pid."""
+        return {worker.pid: unique_rss(worker.pid) for worker in self.workers if worker.is_alive()}
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping = True
+        for worker in self.workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in self.workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.kill()
+
+    def join(self, poll: float = 0.5) -> None:
+        """Supervise until every worker has exited cleanly or a signal stops the pool."""
+        def handle(signum, frame):
+            self._stopping = True
+
+        previous = {sig: signal.signal(sig, handle) for sig in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            while not self._stopping and any(worker.is_alive() or worker.exitcode for worker in self.workers):
+                for i, worker in enumerate(self.workers):
+                    if not worker.is_alive() and worker.exitcode:
+                        if not self.restart:
+                            raise RuntimeError(f"Worker {worker.pid} exited with {worker.exitcode}")
+                        print(f"Worker {worker.pid} exited with {worker.exitcode}; restarting", file=sys.stderr)
+                        worker.join()
+                        self.workers[i] = self._spawn()
+                time.sleep(poll)
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            self.stop()
+
+
+def _serve_worker(nlp: Language, sock: socket.socket, max_batch_size: int, max_latency: float, queue_depth: int, cache=None):
+    import asyncio
+
+    from .server import AnnotationServer
+
+    # The parent's handlers would stop the supervisor loop, not this worker.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    server = AnnotationServer(
+        nlp, max_batch_size=max_batch_size, max_latency=max_latency, queue_depth=queue_depth, cache=cache
+    )
+    asyncio.run(server.serve(sock=sock))
+
+
+def serve_prefork(
+    nlp: Language,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    n_workers: int = 2,
+    max_batch_size: int = 32,
+    max_latency: float = 0.005,
+    queue_depth: int = 1024,
+    report_memory: float = 5.0,
+    cache=None,
+) -> None:
+    """Run `n_workers` `AnnotationServer`s on one listening socket.
+
+    `nlp` should come from `preload`. The kernel hands each new connection
+    to one of the workers; each worker batches its own requests.
+
+    Args:
+        report_memory: Print the workers' `unique_rss` to stderr this many
+            seconds after they start (0: never)
+        cache: A `DocCache` for `nlp`; each worker has its own memory tier,
+            the disk tier is shared
+    """
+    sock = socket.create_server((host, port), backlog=1024)
+    pool = PreforkPool(_serve_worker, n_workers, args=(nlp, sock, max_batch_size, max_latency, queue_depth, cache))
+    pool.start()
+    if report_memory:
+        time.sleep(report_memory)
+        print(format_memory(pool.memory()), file=sys.stderr)
+    try:
+        pool.join()
+    finally:
+        sock.close()
+
+
+def format_memory(memory: Dict[int, Dict[str, int]]) -> str:
+    """One line per worker: RSS, PSS and unique RSS in MB."""
+    return "\n".join(
+        f"worker {pid}: rss {usage.get('rss', 0) / 2**20:.1f} MB, pss {usage.get('pss', 0) / 2**20:.1f} MB, "
+        f"unique {usage.get('uss', 0) / 2**20:.1f} MB"
+        for pid, usage in memory.items()
+    )
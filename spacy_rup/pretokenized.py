@@ -0,0 +1,104 @@
+"""
+Fast path for text that is already tokenized.
+
+The `*.tok` corpora and the CoNLL training files already give one token
+list per sentence. Running the rup tokenizer on them again is wasted work
+and can even split the gold tokens differently. `make_docs` builds `Doc`s
+straight from the token lists, and `pretokenized(nlp)` makes `nlp` and
+`nlp.pipe` treat input strings as whitespace-separated tokens.
+
+Usage:
+    from spacy_rup import make_docs, pretokenized
+
+    with open("data/unsplit/corpus.rup.tok", encoding="utf-8") as f:
+        for doc in nlp.pipe(make_docs(f, vocab=nlp.vocab)):
+            ...
+
+    with pretokenized(nlp):
+        docs = list(nlp.pipe(lines))
+"""
+
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+from spacy.language import Language
+from spacy.tokens import Doc
+from spacy.vocab import Vocab
+
+
+_default_vocab = None
+
+
+def _get_default_vocab() -> Vocab:
+    global _default_vocab
+    if _default_vocab is None:
+        from . import Aromanian
+
+        _default_vocab = Aromanian().vocab
+    return _default_vocab
+
+
+def _default_spaces(n_words: int) -> List[bool]:
+    """One space between tokens and none after the last."""
+    return [True] * (n_words - 1) + [False] if n_words else []
+
+
+def make_docs(
+    words_iter: Iterable[Union[str, Sequence[str]]],
+    spaces: Optional[Iterable[Sequence[bool]]] = None,
+    vocab: Optional[Vocab] = None,
+) -> Iterator[Doc]:
+    """Build Docs from token lists without running the tokenizer.
+
+    Args:
+        words_iter: Token lists, or strings of whitespace-separated tokens
+            (e.g. the lines of a `.tok` file)
+        spaces: Optional per-Doc lists of trailing-space flags, aligned
+            with `words_iter`. By default tokens are separated by one space.
+        vocab: The vocab of the pipeline the Docs are meant for. Defaults
+            to a shared blank Aromanian vocab.
+
+    Returns:
+        A generator of Docs, suitable as input for `nlp.pipe`
+    """
+    if vocab is None:
+        vocab = _get_default_vocab()
+    spaces_iter = iter(spaces) if spaces is not None else None
+    for words in words_iter:
+        if isinstance(words, str):
+            words = words.split()
+        else:
+            words = list(words)
+        doc_spaces = next(spaces_iter) if spaces_iter is not None else _default_spaces(len(words))
+        yield Doc(vocab, words=words, spaces=list(doc_spaces))
+
+
+class WhitespaceTokenizer:
+    """Tokenizer that splits on whitespace only, for pre-tokenized text."""
+
+    def __init__(self, vocab: Vocab):
+        self.vocab = vocab
+
+    def __call__(self, text: str) -> Doc:
+        words = text.split()
+        return Doc(self.vocab, words=words, spaces=_default_spaces(len(words)))
+
+    def pipe(self, texts: Iterable[str], batch_size: int = 1000) -> Iterator[Doc]:
+        for text in texts:
+            yield self(text)
+
+
+@contextmanager
+def pretokenized(nlp: Language):
+    """Temporarily make `nlp` treat its input as whitespace-tokenized text.
+
+    Inside the block, `nlp(text)` and `nlp.pipe(texts)` build their Docs
+    with `WhitespaceTokenizer` instead of the rup tokenizer. The original
+    tokenizer is restored on exit.
+    """
+    tokenizer = nlp.tokenizer
+    nlp.tokenizer = WhitespaceTokenizer(nlp.vocab)
+    try:
+        yield nlp
+    finally:
+        nlp.tokenizer = tokenizer
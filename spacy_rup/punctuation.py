@@ -1,6 +1,16 @@
 ﻿
 
+"""
+Prefix, suffix and infix patterns of the Aromanian tokenizer.
+
+The pattern lists are built on first access of `TOKENIZER_PREFIXES`,
+`TOKENIZER_SUFFIXES` or `TOKENIZER_INFIXES`: `Aromanian()` reads its
+tokenizer from the prebuilt artifact (see `spacy_rup.tokenizer`) and only
+needs them when that is missing or stale.
+"""
+
 import itertools
+import re
 
 from spacy.lang.char_classes import (
     ALPHA,
@@ -32,6 +42,45 @@ _rup_variants = {
 }
 
 
+def _rup_char_variants(token):
+    """Split a token into positions, each with its orthographic variants.
+    
+    Digraphs (sh, ts, lj, nj, dz) count as one position.
+    """
+    char_variants = []
+    i = 0
+    while i < len(token):
+        char = token[i].upper()
+        if char in _rup_variants:
+            variants = _rup_variants[char]
+            if token[i].islower():
+                variants = [v.lower() for v in variants]
+            char_variants.append(variants)
+        elif i + 1 < len(token):
+            digraph = token[i:i+2].lower()
+            if digraph == "sh":
+                char_variants.append([token[i:i+2], "ș", "ş"])
+                i += 1
+            elif digraph == "ts":
+                char_variants.append([token[i:i+2], "ț", "ţ"])
+                i += 1
+            elif digraph == "lj":
+                char_variants.append([token[i:i+2], "ľ", "l'"])
+                i += 1
+            elif digraph == "nj":
+                char_variants.append([token[i:i+2], "ń", "ñ", "n'"])
+                i += 1
+            elif digraph == "dz":
+                char_variants.append([token[i:i+2], "d̦"])
+                i += 1
+            else:
+                char_variants.append([token[i]])
+        else:
+            char_variants.append([token[i]])
+        i += 1
+    return char_variants
+
+
 def _make_rup_variants(tokens):
     """Generate orthographic variants for Aromanian tokens.
     
@@ -43,44 +92,42 @@ def _make_rup_variants(tokens):
     """
     all_tokens = []
     for token in tokens:
-        char_variants = []
-        i = 0
-        while i < len(token):
-            char = token[i].upper()
-            if char in _rup_variants:
-                variants = _rup_variants[char]
-                if token[i].islower():
-                    variants = [v.lower() for v in variants]
-                char_variants.append(variants)
-            elif i + 1 < len(token):
-                digraph = token[i:i+2].lower()
-                if digraph == "sh":
-                    char_variants.append([token[i:i+2], "ș", "ş"])
-                    i += 1
-                elif digraph == "ts":
-                    char_variants.append([token[i:i+2], "ț", "ţ"])
-                    i += 1
-                elif digraph == "lj":
-                    char_variants.append([token[i:i+2], "ľ", "l'"])
-                    i += 1
-                elif digraph == "nj":
-                    char_variants.append([token[i:i+2], "ń", "ñ", "n'"])
-                    i += 1
-                elif digraph == "dz":
-                    char_variants.append([token[i:i+2], "d̦"])
-                    i += 1
-                else:
-                    char_variants.append([token[i]])
-            else:
-                char_variants.append([token[i]])
-            i += 1
-        
-        for combo in itertools.product(*char_variants):
+        for combo in itertools.product(*_rup_char_variants(token)):
             all_tokens.append("".join(combo))
     
     return list(set(all_tokens))
 
 
+_REGEX_SPECIAL = re.compile(r"([.^$*+?{}\[\]\\|()])")
+
+
+def _regex_literal(text):
+    """Escape regex metacharacters, leaving hyphens and apostrophes readable."""
+    return _REGEX_SPECIAL.sub(r"\\\1", text)
+
+
+def _compile_rup_variants(tokens):
+    """Compile one regex per token matching all its orthographic variants.
+    
+    Matches exactly the strings produced by `_make_rup_variants`, but
+    with character classes (`[șşs]`) and grouped alternations
+    (`(?:sh|ș|ş)`) instead of one alternative per combination.
+    """
+    patterns = []
+    for token in dict.fromkeys(tokens):
+        parts = []
+        for variants in _rup_char_variants(token):
+            variants = [_regex_literal(v) for v in dict.fromkeys(variants)]
+            if len(variants) == 1:
+                parts.append(variants[0])
+            elif all(len(v) == 1 for v in variants):
+                parts.append("[" + "".join(variants) + "]")
+            else:
+                parts.append("(?:" + "|".join(variants) + ")")
+        patterns.append("".join(parts))
+    return patterns
+
+
 _rup_prefixes = [
     "a-",
     "c-",
@@ -123,7 +170,6 @@ _rup_prefixes = [
     "ts-",
     "ț-",
 ]
-_rup_prefix_variants = _make_rup_variants(_rup_prefixes)
 
 
 _rup_suffixes = [
@@ -173,56 +219,68 @@ _rup_suffixes = [
     "-ľ",
     "-ń",
 ]
-_rup_suffix_variants = _make_rup_variants(_rup_suffixes)
 
 
-_prefixes = (
-    ["§", "%", "=", "—", "–", r"\+(?![0-9])"]
-    + _rup_prefix_variants
-    + LIST_PUNCT
-    + LIST_ELLIPSES
-    + LIST_QUOTES
-    + LIST_CURRENCY
-    + LIST_ICONS
-)
+def _build_prefixes():
+    return (
+        ["§", "%", "=", "—", "–", r"\+(?![0-9])"]
+        + _compile_rup_variants(_rup_prefixes)
+        + LIST_PUNCT
+        + LIST_ELLIPSES
+        + LIST_QUOTES
+        + LIST_CURRENCY
+        + LIST_ICONS
+    )
 
 
-_suffixes = (
-    _rup_suffix_variants
-    + LIST_PUNCT
-    + LIST_ELLIPSES
-    + LIST_QUOTES
-    + _list_icons
-    + ["'s", "'S", "'s", "'S"]
-    + [
-        r"(?<=[0-9])\+",
-        r"(?<=°[FfCcKk])\.",
-        r"(?<=[0-9])(?:{c})".format(c=CURRENCY),
-        r"(?<=[0-9])(?:{u})".format(u="|".join(LIST_CURRENCY)),
-        r"(?<=[0-9{al}{e}{q}])\.".format(
-            al=ALPHA_LOWER,
-            e=r"%²³",
-            q=CONCAT_QUOTES,
-        ),
-    ]
-)
+def _build_suffixes():
+    return (
+        _compile_rup_variants(_rup_suffixes)
+        + LIST_PUNCT
+        + LIST_ELLIPSES
+        + LIST_QUOTES
+        + _list_icons
+        + ["'s", "'S", "'s", "'S"]
+        + [
+            r"(?<=[0-9])\+",
+            r"(?<=°[FfCcKk])\.",
+            r"(?<=[0-9])(?:{c})".format(c=CURRENCY),
+            r"(?<=[0-9])(?:{u})".format(u="|".join(LIST_CURRENCY)),
+            r"(?<=[0-9{al}{e}{q}])\.".format(
+                al=ALPHA_LOWER,
+                e=r"%²³",
+                q=CONCAT_QUOTES,
+            ),
+        ]
+    )
 
 
-_infixes = (
-    LIST_ELLIPSES
-    + _list_icons
-    + [
-        r"(?<=[0-9])[+\*^](?=[0-9-])",
-        r"(?<=[{al}{q}])\.(?=[{au}{q}])".format(
-            al=ALPHA_LOWER, au=ALPHA_UPPER, q=CONCAT_QUOTES
-        ),
-        r"(?<=[{a}]),(?=[{a}])".format(a=ALPHA),
-        r"(?<=[{a}0-9])[:<>=](?=[{a}])".format(a=ALPHA),
-        r"(?<=[{a}])'(?=[{a}])".format(a=ALPHA),
-    ]
-)
+def _build_infixes():
+    return (
+        LIST_ELLIPSES
+        + _list_icons
+        + [
+            r"(?<=[0-9])[+\*^](?=[0-9-])",
+            r"(?<=[{al}{q}])\.(?=[{au}{q}])".format(
+                al=ALPHA_LOWER, au=ALPHA_UPPER, q=CONCAT_QUOTES
+            ),
+            r"(?<=[{a}]),(?=[{a}])".format(a=ALPHA),
+            r"(?<=[{a}0-9])[:<>=](?=[{a}])".format(a=ALPHA),
+            r"(?<=[{a}])'(?=[{a}])".format(a=ALPHA),
+        ]
+    )
+
+
+_TABLES = {
+    "TOKENIZER_PREFIXES": _build_prefixes,
+    "TOKENIZER_SUFFIXES": _build_suffixes,
+    "TOKENIZER_INFIXES": _build_infixes,
+}
 
-TOKENIZER_PREFIXES = _prefixes
-TOKENIZER_SUFFIXES = _suffixes
-TOKENIZER_INFIXES = _infixes
 
+def __getattr__(name):
+    # Module attributes built on first access, then stored (PEP 562)
+    if name in _TABLES:
+        value = globals()[name] = _TABLES[name]()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
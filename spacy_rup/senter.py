@@ -0,0 +1,204 @@
+"""
+Rule-based sentence segmentation for Aromanian.
+
+The shipped pipelines have no parser or senter, so without this component
+a long text is one sentence. `aromanian_senter` sets `token.is_sent_start`
+in a single pass over the tokens, without a model:
+
+- a sentence ends at `.`, `!`, `?`, `...` and their combinations (`?!`),
+  together with any closing quotes that follow;
+- the next sentence starts at a capitalized word, a digit, an opening quote
+  or a dialogue dash (`- Ha!`); a lowercase word or a comma continues the
+  sentence (`- Ha!, s-aurñi luplu`, `Nu... ia`);
+- a dash after a sentence end followed by a lowercase word is a speech tag
+  and stays in the sentence (`- Cum știi, Mară! - gri luplu.`);
+- abbreviations from the tokenizer exceptions (`Dr.`, `nr.`, `cap.`) do not
+  end a sentence, `etc.` does when a capitalized word follows; a capitalized
+  abbreviation after a sentence end starts the next one (`Ion vine. Dr.
+  Popescu`);
+- quoted speech (`„va u mîc!“`) is kept inside its sentence; boundaries in
+  a quote that is never closed are restored at the end of the paragraph;
+- a newline always starts a new sentence.
+
+Token classes are cached per ORTH ID and the boundaries are written with
+one `Doc.from_array` call.
+
+Usage:
+    nlp = spacy.load("spacy_rup/resources/pos_model")
+    nlp.add_pipe("aromanian_senter", first=True)
+    for sent in nlp(text).sents:
+        ...
+"""
+
+import numpy
+from spacy.attrs import ORTH, SENT_START, SPACY
+from spacy.language import Language
+from spacy.tokens import Doc
+
+from .tokenizer_exceptions import _aromanian_abbrevs
+
+
+# Token classes
+WORD = 0        # lowercase word or other punctuation: continues a sentence
+START = 1       # capitalized word or number: may start a sentence
+TERMINAL = 2    # . ! ? ... and combinations
+FINAL_ABBREV = 3  # etc.: ends a sentence if a capitalized word follows
+ABBREV_STEM = 4   # Dr, nr: a following "." is part of the abbreviation
+OPEN = 5        # opening quote
+CLOSE = 6       # closing quote
+STRAIGHT = 7    # ", opens or closes
+CURLY = 8       # “, closes „ or opens “...”
+DASH = 9        # dialogue dash
+SPACE = 10      # whitespace without a newline
+NEWLINE = 11    # whitespace with a newline
+
+_TERMINAL_CHARS = frozenset(".!?…")
+_OPEN_QUOTES = frozenset(["„", "«", "‚"])
+_CLOSE_QUOTES = frozenset(["”", "»", "‘"])
+_DASHES = frozenset(["-", "–", "—", "--"])
+
+ABBREVIATIONS = frozenset(abbrev.lower() for abbrev in _aromanian_abbrevs if abbrev.endswith("."))
+FINAL_ABBREVIATIONS = frozenset(["etc."])
+
+
+def token_class(text: str) -> int:
+    """The class of a token string for the segmentation rules."""
+    if text.isspace():
+        return NEWLINE if "\n" in text else SPACE
+    lower = text.lower()
+    if lower in FINAL_ABBREVIATIONS:
+        return FINAL_ABBREV
+    if lower in ABBREVIATIONS:
+        return START if text[0].isupper() else WORD
+    if lower + "." in ABBREVIATIONS:
+        return ABBREV_STEM
+    if all(char in _TERMINAL_CHARS for char in text):
+        return TERMINAL
+    if text in _OPEN_QUOTES:
+        return OPEN
+    if text in _CLOSE_QUOTES:
+        return CLOSE
+    if text == '"':
+        return STRAIGHT
+    if text == "“":
+        return CURLY
+    if text in _DASHES:
+        return DASH
+    if text[0].isupper() or text[0].isdigit():
+        return START
+    return WORD
+
+
+@Language.factory(
+    "aromanian_senter",
+    assigns=["token.is_sent_start"],
+    default_config={"overwrite": False},
+)
+def create_senter(nlp: Language, name: str, overwrite: bool):
+    """Create a rule-based sentence segmenter."""
+    return AromanianSenter(name=name, overwrite=overwrite)
+
+
+class AromanianSenter:
+    """Set sentence boundaries with punctuation, quote and dash rules.
+
+    Args:
+        overwrite: Replace boundaries set by an earlier component. By
+            default only tokens without a decision are set, as spaCy's
+            `sentencizer` does.
+    """
+
+    def __init__(self, name: str = "aromanian_senter", overwrite: bool = False):
+        self.name = name
+        self.overwrite = overwrite
+        # ORTH ID -> token class
+        self._classes = {}
+
+    def __call__(self, doc: Doc) -> Doc:
+        if not len(doc):
+            return doc
+        starts = self.sentence_starts(doc)
+        values = numpy.full(len(doc), -1, dtype="int64")
+        values[starts] = 1
+        if not self.overwrite:
+            existing = doc.to_array(SENT_START).view("int64")
+            values = numpy.where(existing != 0, existing, values)
+        doc.from_array([SENT_START], values.view("uint64"))
+        return doc
+
+    def pipe(self, stream, batch_size: int = 128):
+        for doc in stream:
+            yield self(doc)
+
+    def sentence_starts(self, doc: Doc):
+        """Indices of the tokens that start a sentence, in one pass."""
+        array = doc.to_array([ORTH, SPACY]).tolist()
+        strings = doc.vocab.strings
+        cache = self._classes
+        classes = []
+        for orth, _ in array:
+            cls = cache.get(orth)
+            if cls is None:
+                cls = cache[orth] = token_class(strings[orth])
+            classes.append(cls)
+        n_tokens = len(classes)
+
+        starts = [0]
+        quotes = []       # open quote classes, innermost last
+        pending = []      # boundaries inside open quotes
+        ending = False    # a sentence end was seen, the next word decides
+        final = False     # the sentence end was an abbreviation (etc.)
+        newline = False
+        previous = WORD
+        for i, cls in enumerate(classes):
+            if cls == NEWLINE:
+                newline = True
+                continue
+            if newline:
+                newline = False
+                if i:
+                    starts.extend(pending)
+                    starts.append(i)
+                pending = []
+                quotes = []
+                ending = False
+            elif ending and cls not in (TERMINAL, CLOSE, SPACE) and not (cls == CURLY and quotes):
+                capitalized_stem = cls == ABBREV_STEM and strings[array[i][0]][0].isupper()
+                if cls == START or capitalized_stem or (not final and self._opens_sentence(cls, i, classes, array, quotes)):
+                    (pending if quotes else starts).append(i)
+                ending = False
+
+            if cls == TERMINAL:
+                # Dr . as two tokens is still an abbreviation.
+                if not (previous == ABBREV_STEM and array[i - 1][1] == 0 and strings[array[i][0]] == "."):
+                    ending = True
+                    final = False
+            elif cls == FINAL_ABBREV:
+                ending = True
+                final = True
+            elif cls == OPEN or (cls == STRAIGHT and not (quotes and quotes[-1] == STRAIGHT)):
+                quotes.append(cls)
+            elif cls == CURLY and not quotes:
+                quotes.append(cls)
+            elif cls in (CLOSE, STRAIGHT, CURLY) and quotes:
+                quotes.pop()
+                if not quotes:
+                    # Sentence ends inside the quote belong to the quoted speech.
+                    pending = []
+                    ending = previous == TERMINAL
+                    final = False
+            if cls != SPACE:
+                previous = cls
+        if pending:
+            starts.extend(pending)
+            starts.sort()
+        return starts
+
+    @staticmethod
+    def _opens_sentence(cls, i, classes, array, quotes):
+        if cls in (OPEN, STRAIGHT) or (cls == CURLY and not quotes):
+            return True
+        if cls == DASH and array[i][1]:
+            # A dialogue dash, unless a lowercase speech tag follows (- gri luplu).
+            return i + 1 < len(classes) and classes[i + 1] != WORD
+        return False
@@ -0,0 +1,290 @@
+"""
+Micro-batching HTTP annotation server.
+
+Each request carries one short text, and `nlp(text)` per request leaves the
+models' batching unused. `AnnotationServer` puts the requests on a bounded
+queue; one batching task takes the first waiting request, collects more
+until `max_batch_size` requests are together or `max_latency` seconds have
+passed, and runs the batch through `nlp.pipe` in a single-thread executor,
+so the event loop keeps accepting requests meanwhile. Requests that arrive
+while a batch runs form the next one. When `queue_depth` requests are
+already waiting, new ones are answered with 503 instead of queueing without
+bound.
+
+The HTTP side is plain `asyncio` (HTTP/1.1 with keep-alive, no extra
+dependency):
+
+    POST /annotate   {"text": "...", "id": 7}   -> the `stream` output record
+    GET  /health                                -> {"status": "ok", ...}
+    GET  /stats                                 -> request, batch, rejection and cache counts
+    GET  /metrics                               -> component metrics, Prometheus text
+                                                   (?format=json for JSON) when instrumented
+
+The command line front end is `python -m spacy_rup serve`; with `--workers`
+several pre-forked servers share the port (see `spacy_rup.prefork`), and
+`/stats` describes the worker that answered.
+
+Usage:
+    nlp = spacy_rup.load(components=["tagger", "aromanian_pos_lookup", "ner"])
+    asyncio.run(AnnotationServer(nlp, max_batch_size=32, max_latency=0.005).serve("127.0.0.1", 8080))
+"""
+
+import asyncio
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import srsly
+from spacy.language import Language
+
+from .doc_cache import DocCache
+from .instrumentation import get_metrics
+from .stream import annotate_records
+
+MAX_BODY = 1 << 20
+
+JSON = "application/json; charset=utf-8"
+PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class QueueFull(Exception):
+    """The request queue holds `queue_depth` requests already."""
+
+
+class MicroBatcher:
+    """Collect concurrent records into batches for `nlp.pipe`.
+
+    Args:
+        nlp: The pipeline
+        max_batch_size: Records per batch at most
+        max_latency: Seconds to wait for a batch to fill after its first record
+        queue_depth: Records waiting at most; `submit` raises `QueueFull` beyond
+        cache: Reuse the results of repeated texts (see `spacy_rup.doc_cache`)
+    """
+
+    def __init__(
+        self,
+        nlp: Language,
+        max_batch_size: int = 32,
+        max_latency: float = 0.005,
+        queue_depth: int = 1024,
+        cache: Optional[DocCache] = None,
+    ):
+        self.nlp = nlp
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.cache = cache
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_depth)
+        # nlp is not thread-safe: one thread runs every batch.
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spacy_rup-batch")
+        self.stats = {"requests": 0, "batches": 0, "rejected": 0, "errors": 0, "pipe_seconds": 0.0}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.executor.shutdown(wait=True)
+
+    async def submit(self, record: Dict) -> str:
+        """Annotate one record (a dict with a `text` key); returns its JSON line."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((record, future))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise QueueFull() from None
+        return await future
+
+    async def _collect(self) -> List[Tuple[Dict, asyncio.Future]]:
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            # Take what is already waiting without a timer first.
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _annotate(self, records: List[Dict]) -> Tuple[List[str], float]:
+        start = time.perf_counter()
+        lines = annotate_records(self.nlp, records, batch_size=len(records), cache=self.cache)
+        return lines, time.perf_counter() - start
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Clients that went away while waiting need no annotation.
+            batch = [(record, future) for record, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            try:
+                lines, seconds = await loop.run_in_executor(self.executor, self._annotate, [record for record, _ in batch])
+            except Exception as e:
+                self.stats["errors"] += len(batch)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["pipe_seconds"] += seconds
+            for (_, future), line in zip(batch, lines):
+                if not future.done():
+                    future.set_result(line)
+
+
+class AnnotationServer:
+    """HTTP front end of a `MicroBatcher`; see the module docstring for the routes."""
+
+    def __init__(
+        self,
+        nlp: Language,
+        max_batch_size: int = 32,
+        max_latency: float = 0.005,
+        queue_depth: int = 1024,
+        cache: Optional[DocCache] = None,
+    ):
+        self.nlp = nlp
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.queue_depth = queue_depth
+        self.cache = cache
+        self.batcher: Optional[MicroBatcher] = None
+        self.started = time.time()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080, sock: Optional[socket.socket] = None) -> asyncio.AbstractServer:
+        """Start batching and listening, on `sock` if given (e.g. one shared by pre-forked workers)."""
+        self.batcher = MicroBatcher(self.nlp, self.max_batch_size, self.max_latency, self.queue_depth, self.cache)
+        self.batcher.start()
+        if sock is not None:
+            return await asyncio.start_server(self._handle, sock=sock)
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080, sock: Optional[socket.socket] = None) -> None:
+        server = await self.start(host, port, sock)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+    def stats(self) -> Dict:
+        stats = dict(self.batcher.stats)
+        stats["queued"] = self.batcher.queue.qsize()
+        stats["mean_batch_size"] = stats["requests"] / stats["batches"] if stats["batches"] else 0.0
+        stats["uptime"] = time.time() - self.started
+        stats["pid"] = os.getpid()
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, str, str]:
+        path, _, query = path.partition("?")
+        if path == "/annotate":
+            if method != "POST":
+                return 405, _error("POST a JSON object with a 'text' field"), JSON
+            try:
+                record = srsly.json_loads(body)
+            except ValueError:
+                return 400, _error("Request body is not JSON"), JSON
+            if not isinstance(record, dict) or not isinstance(record.get("text"), str):
+                return 400, _error("Expected a JSON object with a 'text' string"), JSON
+            try:
+                return 200, await self.batcher.submit(record), JSON
+            except QueueFull:
+                return 503, _error("Queue full, retry later"), JSON
+        if path == "/health" and method == "GET":
+            return 200, srsly.json_dumps({"status": "ok", "pipeline": self.nlp.pipe_names, "pid": os.getpid()}), JSON
+        if path == "/stats" and method == "GET":
+            return 200, srsly.json_dumps(self.stats()), JSON
+        if path == "/metrics" and method == "GET":
+            metrics = get_metrics(self.nlp)
+            if metrics is None:
+                return 404, _error("The pipeline is not instrumented; set SPACY_RUP_INSTRUMENT=1"), JSON
+            if "format=json" in query:
+                return 200, metrics.to_json(), JSON
+            return 200, metrics.to_prometheus(), PROMETHEUS
+        return 404, _error(f"No route {method} {path}"), JSON
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                if body is None:
+                    status, payload, content_type = 413, _error(f"Body larger than {MAX_BODY} bytes"), JSON
+                else:
+                    try:
+                        status, payload, content_type = await self._route(method, path, body)
+                    except Exception as e:
+                        status, payload, content_type = 500, _error(str(e)), JSON
+                keep_alive = headers.get("connection", "").lower() != "close" and body is not None
+                _write_response(writer, status, payload, content_type, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def _error(message: str) -> str:
+    return srsly.json_dumps({"error": message})
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], Optional[bytes]]]:
+    """(method, path, headers, body) of the next request; None at end of connection.
+
+    The body is None when it is larger than MAX_BODY.
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    method, path, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY:
+        return method, path, headers, None
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def _write_response(writer: asyncio.StreamWriter, status: int, payload: str, content_type: str, keep_alive: bool) -> None:
+    body = payload.encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
@@ -1,3 +1,5 @@
+from .orthography import CanonicalSet
+
 
 STOP_WORDS = set(
     """
@@ -209,4 +211,6 @@ _romanian_common = [
     "când", "unde", "cum", "cât", "până", "prin", "spre", "între",
 ]
 
-STOP_WORDS = STOP_WORDS.union(_romanian_common)
+# Stored as Cunia keys: `word in STOP_WORDS` matches every orthography.
+_stop_word_forms = frozenset(STOP_WORDS.union(_romanian_common))
+STOP_WORDS = CanonicalSet(_stop_word_forms)
@@ -0,0 +1,250 @@
+"""
+Streaming JSONL annotation.
+
+`annotate_stream` reads plain text or JSONL records, annotates them with a
+packaged pipeline and writes one compact JSON object per input record, in
+input order:
+
+    {"id": 7, "tokens": ["Eara", "un", "lup"], "lemma": ["hiu", "un", "lup"],
+     "pos": ["AUX", "DET", "NOUN"], "ents": [[8, 11, "PERSON"]], "orthography": "diaro"}
+
+Input records are JSON objects with a `text` field (other fields are copied
+to the output) or plain lines; `ents` are character offsets. With workers,
+batches are annotated in separate processes and re-ordered before
+writing; a worker that dies before finishing (killed, out of memory) is
+reported with a RuntimeError instead of waited for. With `prefork=True`,
+as in the command line front end, the pipeline is loaded before the
+workers are forked, so they share it; that ends with `gc.freeze()` on
+the whole heap of the calling process, so library callers have to ask
+for it. Back-pressure comes from a bound on the batches in flight: the
+reader waits once `queue_size` batches are read but not yet written, so
+memory does not depend on the input length or on a slow worker.
+
+The command line front end is `python -m spacy_rup stream`.
+
+Usage:
+    with open("in.jsonl") as src, open("out.jsonl", "w") as dst:
+        annotate_stream(src, dst, components=["tagger", "aromanian_pos_lookup", "ner"], n_workers=4)
+"""
+
+import itertools
+import multiprocessing
+import queue
+import threading
+import traceback
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Union
+
+import srsly
+from spacy.language import Language
+from spacy.tokens import Doc
+
+from .doc_cache import DocCache
+from .instrumentation import timed
+from .loader import DEFAULT_MODEL, load
+from .orthography import detect_orthographies
+from .prefork import can_fork, fork_context, preload
+
+# Seconds between checks that the workers are still alive
+WORKER_POLL = 0.5
+
+def read_records(lines: Iterable[str], input_format: str = "auto", text_key: str = "text") -> Iterator[Dict]:
+    """Yield input records as dicts with a `text` key.
+
+    Args:
+        lines: Input lines
+        input_format: "jsonl", "text", or "auto" (a line starting with "{"
+            is a JSON object)
+        text_key: Field holding the text in JSONL input
+
+    Raises:
+        ValueError: A JSONL line is not an object with `text_key`; the
+            message gives its line number
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if input_format == "jsonl" or (input_format == "auto" and line.startswith("{")):
+            try:
+                record = srsly.json_loads(line)
+            except ValueError as error:
+                raise ValueError(f"Line {number}: invalid JSON ({error})") from None
+            if not isinstance(record, dict) or text_key not in record:
+                raise ValueError(f"Line {number}: no '{text_key}' field in {line[:80]}")
+            text = record.pop(text_key)
+            yield {"text": text, **record}
+        else:
+            yield {"text": line}
+
+
+def doc_to_record(doc: Doc, orthography: str, fields: Optional[Dict] = None) -> Dict:
+    """Compact output record of an annotated doc.
+
+    `pos` is the coarse POS where it is set, the tagger's tag otherwise.
+    """
+    record = dict(fields or {})
+    record["tokens"] = [token.text for token in doc]
+    record["lemma"] = [token.lemma_ for token in doc]
+    record["pos"] = [token.pos_ or token.tag_ for token in doc]
+    record["ents"] = [[ent.start_char, ent.end_char, ent.label_] for ent in doc.ents]
+    record["orthography"] = orthography
+    return record
+
+
+def annotate_records(
+    nlp: Language, records: List[Dict], batch_size: int = 256, keep_text: bool = False, cache: Optional[DocCache] = None
+) -> List[str]:
+    """Annotate a batch of records into JSON lines, through `cache` if given."""
+    texts = [record["text"] for record in records]
+    with timed(nlp, "orthography", docs=len(texts)):
+        orthographies = detect_orthographies(texts)
+    lines = []
+    for record, doc, orthography in zip(records, (cache or nlp).pipe(texts, batch_size=batch_size), orthographies):
+        fields = {key: value for key, value in record.items() if keep_text or key != "text"}
+        lines.append(srsly.json_dumps(doc_to_record(doc, orthography, fields)))
+    return lines
+
+
+def _batches(records: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    records = iter(records)
+    while True:
+        batch = list(itertools.islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _worker(in_queue, out_queue, components, model, batch_size, keep_text):
+    try:
+        nlp = load(components=components, model=model)
+        for index, records in iter(in_queue.get, None):
+            out_queue.put((index, annotate_records(nlp, records, batch_size, keep_text)))
+    except Exception:
+        out_queue.put((None, traceback.format_exc()))
+    out_queue.put((None, None))
+
+
+def annotate_stream(
+    source: TextIO,
+    sink: TextIO,
+    components: Optional[List[str]] = None,
+    model: Union[str, Sequence[str]] = DEFAULT_MODEL,
+    n_workers: int = 1,
+    batch_size: int = 256,
+    queue_size: int = 8,
+    input_format: str = "auto",
+    text_key: str = "text",
+    keep_text: bool = False,
+    prefork: bool = False,
+) -> int:
+    """Annotate every record of `source` and write JSON lines to `sink`.
+
+    Args:
+        source: Input lines (plain text or JSONL)
+        sink: Output, one JSON object per input record, in input order
+        components: `spacy_rup.load` components
+        model: `spacy_rup.load` model
+        n_workers: Worker processes; 1 annotates in this process
+        batch_size: Records per batch
+        queue_size: Batches in flight at most (read but not yet written)
+        input_format: "auto", "jsonl" or "text"
+        text_key: Field holding the text in JSONL input
+        keep_text: Copy the input text to the output records
+        prefork: Load the pipeline before forking the workers, which then
+            share it copy-on-write (see `spacy_rup.prefork`). This freezes
+            the heap of the calling process (`gc.freeze()`) for good;
+            otherwise each worker loads the pipeline itself.
+
+    Returns:
+        The number of records written
+
+    Raises:
+        RuntimeError: Reading the input failed, or a worker failed or
+            died (killed, out of memory) before finishing
+    """
+    batches = _batches(read_records(source, input_format, text_key), batch_size)
+    n_written = 0
+    if n_workers <= 1:
+        nlp = load(components=components, model=model)
+        for records in batches:
+            for line in annotate_records(nlp, records, batch_size, keep_text):
+                sink.write(line + "\n")
+            n_written += len(records)
+        return n_written
+
+    if prefork and can_fork():
+        # Load once here; the forked workers find the pipeline in load()'s cache.
+        preload(components=components, model=model)
+    context = fork_context() if prefork else multiprocessing.get_context()
+    in_queue = context.Queue()
+    out_queue = context.Queue()
+    in_flight = threading.BoundedSemaphore(queue_size)
+    stop = threading.Event()
+    read_error = []
+
+    def feed():
+        try:
+            for index, records in enumerate(batches):
+                while not in_flight.acquire(timeout=0.1):
+                    if stop.is_set():
+                        return
+                in_queue.put((index, records))
+        except Exception:
+            read_error.append(traceback.format_exc())
+        finally:
+            for _ in range(n_workers):
+                in_queue.put(None)
+
+    workers = [
+        context.Process(
+            target=_worker,
+            args=(in_queue, out_queue, components, model, batch_size, keep_text),
+            daemon=True,
+        )
+        for _ in range(n_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    reader = threading.Thread(target=feed, daemon=True)
+    reader.start()
+
+    pending = {}
+    next_index = 0
+    n_finished = 0
+    try:
+        while n_finished < n_workers:
+            # Counted before waiting: a worker that exited by then has sent
+            # everything it will send.
+            n_exited = sum(worker.exitcode is not None for worker in workers)
+            try:
+                index, lines = out_queue.get(timeout=WORKER_POLL)
+            except queue.Empty:
+                if n_exited > n_finished:
+                    dead = next((worker for worker in workers if worker.exitcode), None)
+                    exitcode = dead.exitcode if dead else 0
+                    raise RuntimeError(f"An annotation worker exited with {exitcode} before finishing") from None
+                continue
+            if index is None:
+                if lines is not None:
+                    raise RuntimeError(f"Annotation worker failed:\n{lines}")
+                n_finished += 1
+                continue
+            pending[index] = lines
+            # Write every batch that is next in input order.
+            while next_index in pending:
+                lines = pending.pop(next_index)
+                for line in lines:
+                    sink.write(line + "\n")
+                n_written += len(lines)
+                next_index += 1
+                in_flight.release()
+    finally:
+        stop.set()
+        reader.join()
+        for worker in workers:
+            worker.join(timeout=1)
+            if worker.is_alive():
+                worker.terminate()
+    if read_error:
+        raise RuntimeError(f"Reading the input failed:\n{read_error[0]}")
+    return n_written
@@ -0,0 +1,129 @@
+"""
+Precompiled tokenizer artifact for Aromanian.
+
+`Aromanian()` normally rebuilds its tokenizer from the language data on
+every start: the exception table (merged with spaCy's BASE_EXCEPTIONS)
+and the prefix/suffix/infix pattern lists are assembled in Python and
+joined into the tokenizer regexes. `build_tokenizer_artifact` does that
+once and stores the result as a single msgpack file in `resources/`.
+The registered `spacy_rup.Tokenizer.v1` loads it directly, as long as it
+was built from the current `punctuation.py`, `tokenizer_exceptions.py` and
+contraction table with the same spaCy version; otherwise it falls back to
+the language data. Those tables are only built in that case (see
+`AromanianDefaults`), so a start with a fresh artifact never assembles them.
+
+The packaged pipelines ship without a saved `tokenizer` file:
+`spacy_rup.load()` excludes it and installs this tokenizer, and the
+`AromanianTokenizer` that `spacy.load()` gets from the config skips the
+missing file.
+
+Rebuild the artifact after changing the tokenizer rules:
+    python build_tokenizer.py
+"""
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Callable, Optional
+
+import spacy
+import srsly
+from spacy.language import Language
+from spacy.tokenizer import Tokenizer
+from spacy.util import compile_infix_regex, compile_prefix_regex, compile_suffix_regex
+
+
+TOKENIZER_ARTIFACT = Path(__file__).parent / "resources" / "tokenizer.msgpack"
+
+_SOURCES = ("punctuation.py", "tokenizer_exceptions.py", "resources/contraction_variants.json")
+
+
+def tokenizer_fingerprint() -> str:
+    """Hash of the tokenizer rule sources and the spaCy version."""
+    digest = hashlib.sha1(spacy.about.__version__.encode("utf-8"))
+    for name in _SOURCES:
+        path = Path(__file__).parent / name
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class AromanianTokenizer(Tokenizer):
+    """The spaCy tokenizer, for pipelines saved without a `tokenizer` file.
+
+    `from_disk` leaves the tokenizer as it is when the file is missing,
+    instead of failing.
+    """
+
+    def from_disk(self, path, **kwargs):
+        if not Path(path).exists():
+            return self
+        return super().from_disk(path, **kwargs)
+
+
+def tokenizer_settings(defaults) -> dict:
+    """The patterns and special cases of a Language.Defaults class, as strings."""
+    return {
+        "prefix_search": compile_prefix_regex(defaults.prefixes).pattern,
+        "suffix_search": compile_suffix_regex(defaults.suffixes).pattern,
+        "infix_finditer": compile_infix_regex(defaults.infixes).pattern,
+        "rules": dict(sorted(defaults.tokenizer_exceptions.items())),
+    }
+
+
+def build_tokenizer_artifact(defaults, path: Path = TOKENIZER_ARTIFACT) -> Path:
+    """Serialize the tokenizer settings of a Language.Defaults class.
+
+    Args:
+        defaults: The language defaults, e.g. `Aromanian.Defaults`
+        path: Output file
+
+    Returns:
+        The path of the written artifact
+    """
+    data = {"fingerprint": tokenizer_fingerprint(), **tokenizer_settings(defaults)}
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    srsly.write_msgpack(path, data)
+    return path
+
+
+def load_tokenizer(nlp: Language, path: Path = TOKENIZER_ARTIFACT) -> Optional[Tokenizer]:
+    """Create a tokenizer from a prebuilt artifact.
+
+    Returns None if the artifact is missing or was built from different
+    tokenizer rules, so the caller can fall back to the language data.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    data = srsly.read_msgpack(path)
+    if data.get("fingerprint") != tokenizer_fingerprint():
+        return None
+    return make_tokenizer(nlp, data)
+
+
+def make_tokenizer(nlp: Language, settings: dict) -> Tokenizer:
+    """An `AromanianTokenizer` from `tokenizer_settings` or an artifact."""
+    return AromanianTokenizer(
+        nlp.vocab,
+        rules=settings["rules"],
+        prefix_search=re.compile(settings["prefix_search"]).search,
+        suffix_search=re.compile(settings["suffix_search"]).search,
+        infix_finditer=re.compile(settings["infix_finditer"]).finditer,
+        token_match=nlp.Defaults.token_match,
+        url_match=nlp.Defaults.url_match,
+    )
+
+
+@spacy.registry.tokenizers("spacy_rup.Tokenizer.v1")
+def create_aromanian_tokenizer() -> Callable[[Language], Tokenizer]:
+    """Registered tokenizer that prefers the prebuilt artifact."""
+
+    def tokenizer_factory(nlp: Language) -> Tokenizer:
+        tokenizer = load_tokenizer(nlp)
+        if tokenizer is None:
+            tokenizer = make_tokenizer(nlp, tokenizer_settings(nlp.Defaults))
+        return tokenizer
+
+    return tokenizer_factory
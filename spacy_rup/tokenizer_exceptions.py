@@ -1,13 +1,17 @@
 ﻿
 
+import hashlib
+import itertools
+import re
+from pathlib import Path
+
+import srsly
 from spacy.symbols import ORTH, NORM
 from spacy.util import update_exc
 from spacy.lang.tokenizer_exceptions import BASE_EXCEPTIONS
 from .punctuation import _make_rup_variants
 
-_exc = {}
-
-for orth in [
+_ordinals = [
     "1-a",
     "2-a",
     "3-a",
@@ -32,8 +36,7 @@ for orth in [
     "10-lea",
     "11-lea",
     "12-lea",
-]:
-    _exc[orth] = [{ORTH: orth}]
+]
 
 _aromanian_abbrevs = [
     "d-lu",
@@ -61,10 +64,6 @@ _aromanian_abbrevs = [
     "gr.",
 ]
 
-for orth in _aromanian_abbrevs:
-    _exc[orth] = [{ORTH: orth}]
-    _exc[orth.capitalize()] = [{ORTH: orth.capitalize()}]
-
 
 _contractions = [
     ("s-nu", [{ORTH: "s-"}, {ORTH: "nu"}]),
@@ -140,8 +139,76 @@ _contractions = [
     ("dintr-una", [{ORTH: "dintr-"}, {ORTH: "una"}]),
 ]
 
-for orth, expansion in _contractions:
-    _exc[orth] = expansion
+# Orthographic variants of the Cunia units used in `_contractions`, so that
+# DIARO and mixed spellings (și-u, nu-ńi, s-l'i) hit the same special cases.
+_cunia_unit_variants = {
+    "sh": ["ș", "ş"],
+    "ts": ["ț", "ţ"],
+    "lj": ["ľ", "l'"],
+    "nj": ["ń", "ñ"],
+    "dz": ["d̦"],
+    "ã": ["ă", "â", "î"],
+}
+_cunia_unit_re = re.compile("sh|ts|lj|nj|dz|ã", re.IGNORECASE)
+
+CONTRACTION_VARIANTS_PATH = Path(__file__).parent / "resources" / "contraction_variants.json"
+
+
+def _orth_variants(text):
+    """All spellings of `text` obtained by swapping its Cunia units."""
+    parts = []
+    start = 0
+    for match in _cunia_unit_re.finditer(text):
+        parts.append([text[start:match.start()]])
+        unit = match.group()
+        variants = _cunia_unit_variants[unit.lower()]
+        if unit[0].isupper():
+            variants = [v[0].upper() + v[1:] for v in variants]
+        parts.append([unit] + variants)
+        start = match.end()
+    parts.append([text[start:]])
+    return ["".join(combo) for combo in itertools.product(*parts)]
+
+
+def _contractions_fingerprint(contractions):
+    # The variant table decides the expansion as much as the contractions do.
+    return hashlib.sha1(repr((contractions, _cunia_unit_variants)).encode("utf-8")).hexdigest()
+
+
+def generate_contraction_variants(contractions):
+    """Expand contractions to every orthographic variant.
+    
+    Each piece of the expansion is varied independently and the variant
+    key is the concatenation of the pieces, so a split is the same in
+    every orthography. Returns (orth, pieces) pairs, deduplicated, with
+    the listed spelling of each contraction first.
+    """
+    table = {}
+    for orth, expansion in contractions:
+        pieces = [token[ORTH] for token in expansion]
+        for combo in itertools.product(*(_orth_variants(piece) for piece in pieces)):
+            table.setdefault("".join(combo), list(combo))
+    return list(table.items())
+
+
+def write_contraction_variants(path=CONTRACTION_VARIANTS_PATH):
+    """Build step: write the expanded contraction table to resources/."""
+    data = {
+        "fingerprint": _contractions_fingerprint(_contractions),
+        "contractions": generate_contraction_variants(_contractions),
+    }
+    Path(path).write_text(srsly.json_dumps(data), encoding="utf-8")
+    return path
+
+
+def _load_contraction_variants():
+    """Read the shipped table; regenerate only if it is missing or stale."""
+    if CONTRACTION_VARIANTS_PATH.exists():
+        data = srsly.read_json(CONTRACTION_VARIANTS_PATH)
+        if data.get("fingerprint") == _contractions_fingerprint(_contractions):
+            return data["contractions"]
+    return generate_contraction_variants(_contractions)
+
 
 _greek_loans = [
     "efharisto",
@@ -152,9 +219,6 @@ _greek_loans = [
     "thkiavaso",
 ]
 
-for word in _greek_loans:
-    _exc[word] = [{ORTH: word}]
-
 _particles = [
     "cama",
     "mashi",
@@ -172,9 +236,6 @@ _particles = [
     "apoia",
 ]
 
-for particle in _particles:
-    _exc[particle] = [{ORTH: particle}]
-
 _apostrophe_words = [
     "l'i",
     "l'imba",
@@ -184,10 +245,28 @@ _apostrophe_words = [
     "n'i",
 ]
 
-for word in _apostrophe_words:
-    _exc[word] = [{ORTH: word}]
 
-TOKENIZER_EXCEPTIONS = update_exc(BASE_EXCEPTIONS, _exc)
+def _build_exceptions():
+    exc = {}
+    for orth in _ordinals:
+        exc[orth] = [{ORTH: orth}]
+    for orth in _aromanian_abbrevs:
+        exc[orth] = [{ORTH: orth}]
+        exc[orth.capitalize()] = [{ORTH: orth.capitalize()}]
+    for orth, pieces in _load_contraction_variants():
+        exc[orth] = [{ORTH: piece} for piece in pieces]
+    for word in _greek_loans + _particles + _apostrophe_words:
+        exc[word] = [{ORTH: word}]
+    return update_exc(BASE_EXCEPTIONS, exc)
+
+
+def __getattr__(name):
+    # TOKENIZER_EXCEPTIONS is built on first access, then stored (PEP 562):
+    # Aromanian() only needs it when the tokenizer artifact is missing or stale.
+    if name == "TOKENIZER_EXCEPTIONS":
+        value = globals()[name] = _build_exceptions()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 
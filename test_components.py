@@ -0,0 +1,75 @@
+"""
+Teste de regresie pentru componentele pachetului spacy_rup.
+Spre deosebire de test_local.py, acestea importă pachetul instalat.
+"""
+
+import copy
+import io
+import os
+import pickle
+import signal
+import time
+import warnings
+
+import pytest
+import spacy
+
+from spacy_rup import stream
+from spacy_rup.instrumentation import InstrumentedComponent, instrument
+from spacy_rup.numbers import parse_number
+
+
+def test_parse_number_long_word():
+    """Un cuvânt lung din morfeme repetate nu blochează parse_number."""
+    start = time.perf_counter()
+    assert parse_number("una" * 18) is None
+    assert parse_number("doi" * 30) is None
+    assert time.perf_counter() - start < 1.0
+    assert parse_number("tsintsisprãdzatsi") == 15
+
+
+def test_instrumented_pipeline_pickles():
+    """Un pipeline instrumentat se poate copia și serializa cu pickle."""
+    nlp = spacy.blank("rup")
+    nlp.add_pipe("aromanian_lemmatizer")
+    instrument(nlp)
+    pipe = nlp.get_pipe("aromanian_lemmatizer")
+    assert isinstance(pipe, InstrumentedComponent)
+    assert not isinstance(copy.deepcopy(pipe), InstrumentedComponent)
+    restored = pickle.loads(pickle.dumps(nlp))
+    assert [token.lemma_ for token in restored("Eara un lup.")] == [token.lemma_ for token in nlp("Eara un lup.")]
+
+
+def test_senter_no_dtype_warning():
+    """aromanian_senter nu emite W028 la Doc.from_array."""
+    nlp = spacy.blank("rup")
+    nlp.add_pipe("aromanian_senter")
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        nlp("Eara un lup. Shi una vulpe.")
+    assert not [warning for warning in caught if "W028" in str(warning.message)]
+
+
+def test_senter_capitalized_abbreviation_starts_sentence():
+    """O abreviere cu majusculă după punct începe o propoziție nouă."""
+    nlp = spacy.blank("rup")
+    nlp.add_pipe("aromanian_senter")
+    sents = [sent.text for sent in nlp("Ion vine. Dr. Popescu nu vine.").sents]
+    assert sents == ["Ion vine.", "Dr. Popescu nu vine."]
+    sents = [sent.text for sent in nlp("Lucrã. Cap. 3 easte mare.").sents]
+    assert sents == ["Lucrã.", "Cap. 3 easte mare."]
+    sents = [sent.text for sent in nlp("Vine la nr. 3 Ion.").sents]
+    assert sents == ["Vine la nr. 3 Ion."]
+
+
+def _killed_worker(*args):
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def test_stream_worker_killed(monkeypatch):
+    """annotate_stream raportează un worker omorât în loc să-l aștepte."""
+    monkeypatch.setattr(stream, "_worker", _killed_worker)
+    monkeypatch.setattr(stream, "WORKER_POLL", 0.1)
+    source = io.StringIO("Eara un lup.\nShi una vulpe.\n")
+    with pytest.raises(RuntimeError, match="exited with -9"):
+        stream.annotate_stream(source, io.StringIO(), n_workers=2)
@@ -0,0 +1,141 @@
+import spacy
+from spacy.util import minibatch, compounding
+from spacy_rup import Aromanian
+from pathlib import Path
+import argparse
+import random
+
+from enrich_pos_model import add_pos_rules
+from train_ner_model import make_ner_examples, read_ner_data
+from train_pos_model import make_pos_examples, read_pos_data, split_held_out
+
+# One HashEmbedCNN (the same settings as pos_model and ner_model) feeds
+# both the tagger and the NER through listeners.
+TOK2VEC_WIDTH = 96
+
+LISTENER = {
+    "@architectures": "spacy.Tok2VecListener.v1",
+    "width": TOK2VEC_WIDTH,
+    "upstream": "tok2vec",
+}
+
+TOK2VEC_CONFIG = {
+    "model": {
+        "@architectures": "spacy.HashEmbedCNN.v2",
+        "pretrained_vectors": None,
+        "width": TOK2VEC_WIDTH,
+        "depth": 4,
+        "embed_size": 2000,
+        "window_size": 1,
+        "maxout_pieces": 3,
+        "subword_features": True,
+    }
+}
+
+TAGGER_CONFIG = {
+    "model": {
+        "@architectures": "spacy.Tagger.v2",
+        "nO": None,
+        "normalize": False,
+        "tok2vec": LISTENER,
+    }
+}
+
+NER_CONFIG = {
+    "model": {
+        "@architectures": "spacy.TransitionBasedParser.v2",
+        "state_type": "ner",
+        "extra_state_tokens": False,
+        "hidden_width": 64,
+        "maxout_pieces": 2,
+        "use_upper": True,
+        "nO": None,
+        "tok2vec": LISTENER,
+    }
+}
+
+
+def build_combined_pipeline():
+    """Blank `rup` pipeline: tok2vec -> tagger -> aromanian_pos_lookup -> ner."""
+    nlp = Aromanian()
+    nlp.add_pipe("tok2vec", config=TOK2VEC_CONFIG)
+    nlp.add_pipe("tagger", config=TAGGER_CONFIG)
+    nlp.add_pipe("aromanian_pos_lookup")
+    nlp.add_pipe("ner", config=NER_CONFIG)
+    return nlp
+
+
+def train_combined_model(output_dir=Path("spacy_rup/resources/combined_model"), held_out=0.0):
+    """Train the combined pipeline; with `held_out`, on the sentences `split_held_out` does not hold out."""
+    pos_path = Path("data/train.rup.conll")
+    ner_path = Path("data/train.rup.ner.json")
+    output_dir = Path(output_dir)
+
+    for data_path in (pos_path, ner_path):
+        if not data_path.exists():
+            print(f"Error: Training data not found at {data_path}")
+            return
+
+    pos_data, _ = split_held_out(read_pos_data(pos_path), held_out)
+    ner_data, _ = split_held_out(read_ner_data(ner_path), held_out)
+    print(f"Loaded {len(pos_data)} tagged and {len(ner_data)} NER sentences for training.")
+
+    nlp = build_combined_pipeline()
+    tagger = nlp.get_pipe("tagger")
+    ner = nlp.get_pipe("ner")
+
+    # Add labels
+    for _, tags in pos_data:
+        for tag in tags:
+            if tag:
+                tagger.add_label(tag)
+    for _, annotations in ner_data:
+        for ent in annotations.get("entities", []):
+            ner.add_label(ent[2])
+
+    # Tagged sentences have no entity annotation and NER sentences no tags;
+    # missing annotation gives no loss, so both sets train the shared tok2vec.
+    pos_examples = [e for e in make_pos_examples(nlp, pos_data) if any(token.tag for token in e.reference)]
+    ner_examples = make_ner_examples(nlp, ner_data)
+    examples = pos_examples + ner_examples
+
+    if not pos_examples or not ner_examples:
+        print("No valid training examples found!")
+        return
+
+    # Initialize with both kinds so each component sees its labels.
+    optimizer = nlp.initialize(lambda: pos_examples[:500] + ner_examples[:500])
+    add_pos_rules(nlp.get_pipe("aromanian_pos_lookup"))
+
+    print(f"Training on {len(pos_examples)} tagged + {len(ner_examples)} NER examples...")
+    try:
+        for i in range(15):
+            losses = {}  # Reset each epoch
+            random.shuffle(examples)
+            batches = minibatch(examples, size=compounding(4.0, 32.0, 1.001))
+            for batch in batches:
+                nlp.update(batch, drop=0.35, losses=losses, sgd=optimizer)
+            print(
+                f"Epoch {i+1} Loss: tok2vec {losses.get('tok2vec', 0.0):.4f}, "
+                f"tagger {losses.get('tagger', 0.0):.4f}, ner {losses.get('ner', 0.0):.4f}"
+            )
+    except KeyboardInterrupt:
+        print("Training interrupted.")
+    finally:
+        # Save
+        if not output_dir.exists():
+            output_dir.mkdir(parents=True)
+
+        # The tokenizer comes from spacy_rup's artifact, not from the model.
+        nlp.to_disk(output_dir, exclude=["tokenizer"])
+        print(f"Saved model to {output_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the combined tagger + NER pipeline.")
+    parser.add_argument("--output", default="spacy_rup/resources/combined_model")
+    parser.add_argument("--held-out", type=float, default=0.0, help="Fraction of sentences to leave out for evaluation")
+    args = parser.parse_args()
+    random.seed(0)
+    spacy.util.fix_random_seed(0)
+    train_combined_model(Path(args.output), args.held_out)
@@ -3,20 +3,43 @@ from spacy.util import minibatch, compounding
 from spacy.training import Example
 from spacy_rup import Aromanian
 from pathlib import Path
+import argparse
 import random
 import json
 
-def train_ner_model():
+from train_pos_model import split_held_out
+
+def read_ner_data(data_path):
+    """Read (text, {"entities": [...]}) pairs from the NER JSON file."""
+    with open(data_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_ner_examples(nlp, training_data):
+    """Examples with gold entities, tokenized by `nlp`."""
+    examples = []
+    for text, annotations in training_data:
+        try:
+             predicted_doc = nlp.make_doc(text)
+             example = Example.from_dict(predicted_doc, annotations)
+             examples.append(example)
+        except Exception as e:
+             # print(f"Skipping sentence due to error: {e}")
+             continue
+    return examples
+
+
+def train_ner_model(output_dir=Path("spacy_rup/resources/ner_model"), held_out=0.0):
+    """Train the NER; with `held_out`, on the sentences `split_held_out` does not hold out."""
     data_path = Path("data/train.rup.ner.json")
-    output_dir = Path("spacy_rup/resources/ner_model")
+    output_dir = Path(output_dir)
     
     if not data_path.exists():
         print(f"Error: Training data not found at {data_path}")
         return
 
     # Load data
-    with open(data_path, "r", encoding="utf-8") as f:
-        training_data = json.load(f)
+    training_data, _ = split_held_out(read_ner_data(data_path), held_out)
 
     print(f"Loaded {len(training_data)} sentences for training.")
 
@@ -35,15 +58,7 @@ def train_ner_model():
             ner.add_label(ent[2])
 
     # Convert to Examples
-    examples = []
-    for text, annotations in training_data:
-        try:
-             predicted_doc = nlp.make_doc(text)
-             example = Example.from_dict(predicted_doc, annotations)
-             examples.append(example)
-        except Exception as e:
-             # print(f"Skipping sentence due to error: {e}")
-             continue
+    examples = make_ner_examples(nlp, training_data)
     
     if not examples:
         print("No valid training examples found!")
@@ -70,8 +85,13 @@ def train_ner_model():
         if not output_dir.exists():
             output_dir.mkdir(parents=True)
         
-        nlp.to_disk(output_dir)
+        # The tokenizer comes from spacy_rup's artifact, not from the model.
+        nlp.to_disk(output_dir, exclude=["tokenizer"])
         print(f"Saved model to {output_dir}")
 
 if __name__ == "__main__":
-    train_ner_model()
+    parser = argparse.ArgumentParser(description="Train the Aromanian NER.")
+    parser.add_argument("--output", default="spacy_rup/resources/ner_model")
+    parser.add_argument("--held-out", type=float, default=0.0, help="Fraction of sentences to leave out for evaluation")
+    args = parser.parse_args()
+    train_ner_model(Path(args.output), args.held_out)
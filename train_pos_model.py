@@ -2,19 +2,29 @@ import spacy
 from spacy.util import minibatch, compounding
 from spacy.training import Example
 from spacy.tokens import Doc
-from spacy_rup import Aromanian
+from spacy_rup import Aromanian, make_docs
 from pathlib import Path
+import argparse
 import random
 
-def train_pos_model():
-    data_path = Path("data/train.rup.conll")
-    output_dir = Path("spacy_rup/resources/pos_model")
-    
-    if not data_path.exists():
-        print(f"Error: Training data not found at {data_path}")
-        return
 
-    # Load data from CoNLL format (Word \t POS)
+def split_held_out(data, fraction):
+    """(train, held-out) parts of `data`: every n-th item is held out, for n = 1 / fraction.
+
+    Deterministic, so that the POS, NER and combined trainings hold out the
+    same sentences and any of them can be evaluated against the others.
+    """
+    if not fraction:
+        return list(data), []
+    step = max(2, round(1 / fraction))
+    return (
+        [item for i, item in enumerate(data) if i % step != step - 1],
+        [item for i, item in enumerate(data) if i % step == step - 1],
+    )
+
+
+def read_pos_data(data_path):
+    """Read (words, tags) sentences from a CoNLL file (Word \t POS)."""
     train_data = []
     current_words = []
     current_tags = []
@@ -39,7 +49,41 @@ def train_pos_model():
                 
     if current_words:
          train_data.append((current_words, current_tags))
+    return train_data
 
+
+def make_pos_examples(nlp, train_data):
+    """Examples with gold tags; the CoNLL file is already tokenized, so build the Docs directly."""
+    examples = []
+    all_words = [words for words, _ in train_data]
+    predicted_docs = make_docs(all_words, vocab=nlp.vocab)
+    reference_docs = make_docs(all_words, vocab=nlp.vocab)
+    for (words, tags), predicted_doc, reference_doc in zip(train_data, predicted_docs, reference_docs):
+        # Use try-catch block for robust doc creation
+        try:
+             for i, tag in enumerate(tags):
+                 if tag is not None:
+                     reference_doc[i].tag_ = tag
+             example = Example(predicted_doc, reference_doc)
+        except Exception as e:
+             print(f"Skipping sentence due to error: {e}")
+             continue
+             
+        examples.append(example)
+    return examples
+
+
+def train_pos_model(output_dir=Path("spacy_rup/resources/pos_model"), held_out=0.0):
+    """Train the tagger; with `held_out`, on the sentences `split_held_out` does not hold out."""
+    data_path = Path("data/train.rup.conll")
+    output_dir = Path(output_dir)
+    
+    if not data_path.exists():
+        print(f"Error: Training data not found at {data_path}")
+        return
+
+    # Load data from CoNLL format (Word \t POS)
+    train_data, _ = split_held_out(read_pos_data(data_path), held_out)
     print(f"Loaded {len(train_data)} sentences for training.")
 
     # Initialize blank Aromanian model
@@ -58,22 +102,7 @@ def train_pos_model():
                 tagger.add_label(tag)
 
     # Convert to Examples
-    examples = []
-    for words, tags in train_data:
-        # doc = Doc(nlp.vocab, words=list(words))
-        # Use try-catch block for robust doc creation
-        try:
-             predicted_doc = Doc(nlp.vocab, words=list(words))
-             reference_doc = Doc(nlp.vocab, words=list(words))
-             for i, tag in enumerate(tags):
-                 if tag is not None:
-                     reference_doc[i].tag_ = tag
-             example = Example(predicted_doc, reference_doc)
-        except Exception as e:
-             print(f"Skipping sentence due to error: {e}")
-             continue
-             
-        examples.append(example)
+    examples = make_pos_examples(nlp, train_data)
 
     # Train
     # We may need to pass a valid example for initialization (one with tags)
@@ -101,8 +130,13 @@ def train_pos_model():
         if not output_dir.exists():
             output_dir.mkdir(parents=True)
         
-        nlp.to_disk(output_dir)
+        # The tokenizer comes from spacy_rup's artifact, not from the model.
+        nlp.to_disk(output_dir, exclude=["tokenizer"])
         print(f"Saved model to {output_dir}")
 
 if __name__ == "__main__":
-    train_pos_model()
+    parser = argparse.ArgumentParser(description="Train the Aromanian POS tagger.")
+    parser.add_argument("--output", default="spacy_rup/resources/pos_model")
+    parser.add_argument("--held-out", type=float, default=0.0, help="Fraction of sentences to leave out for evaluation")
+    args = parser.parse_args()
+    train_pos_model(Path(args.output), args.held_out)
@@ -47,7 +47,7 @@ def verify_all():
     
     nlp_pos = None
     try:
-        nlp_pos = spacy.load("spacy_rup/resources/pos_model")
+        nlp_pos = spacy_rup.load(model="pos_model")
         print(f"  Loaded model: {nlp_pos.pipe_names}")
         
         pos_passes = 0
@@ -81,7 +81,7 @@ def verify_all():
     ]
 
     try:
-        nlp_ner = spacy.load("spacy_rup/resources/ner_model")
+        nlp_ner = spacy_rup.load(model="ner_model")
         print(f"  Loaded model: {nlp_ner.pipe_names}")
         
         ner_passes = 0
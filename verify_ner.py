@@ -1,11 +1,12 @@
 import spacy
 import spacy_rup  # Register the Aromanian language
+from spacy_rup.loader import resource_path
 from pathlib import Path
 
 def verify_ner():
-    model_path = Path("spacy_rup/resources/ner_model")
+    model_path = resource_path("ner_model")
     print(f"Loading model from {model_path}...")
-    nlp = spacy.load(model_path)
+    nlp = spacy_rup.load(model="ner_model")
     
     # Test sentences - exact matches from training corpus with known entities
     test_sentences = [
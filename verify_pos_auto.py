@@ -1,16 +1,17 @@
 import spacy
 from pathlib import Path
 import spacy_rup
+from spacy_rup.loader import resource_path
 
 def verify_pos_auto():
-    model_path = Path("spacy_rup/resources/pos_model")
+    model_path = resource_path("pos_model")
     if not model_path.exists():
         print(f"Error: Model not found at {model_path}")
         return
 
     print(f"Loading model from {model_path}...")
     try:
-        nlp = spacy.load(model_path)
+        nlp = spacy_rup.load(model="pos_model")
     except Exception as e:
         print(f"Failed to load model: {e}")
         return